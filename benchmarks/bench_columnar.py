@@ -0,0 +1,110 @@
+"""Compares reloading columnar snapshots with parsing the CSV and JSON files they were made from.
+
+Usage:
+    python benchmarks/bench_columnar.py --rows 1000000 --repeat 3
+"""
+import argparse
+import csv
+import json
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "json_csv_practice"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # the common package
+
+from common.columnar import ColumnarFile, read_columnar, write_columnar  # noqa: E402
+from sales_columnar import aggregate_sales_snapshot  # noqa: E402
+from sales_engine import aggregate_sales  # noqa: E402
+from generators import generate_records_json, generate_sales  # noqa: E402
+
+
+def parse_csv(path):
+    with open(path, encoding="utf-8") as file:
+        return list(csv.DictReader(file, skipinitialspace=True))
+
+
+def parse_json(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def sum_column(path):
+    """Zero-copy access: maps the file and sums the Sum column without building rows (None if
+    the column is not numeric, e.g. with invalid rows)."""
+    with ColumnarFile(path) as snapshot:
+        if snapshot.columns["Sum"]["type"] != "int":
+            return None
+        with snapshot.data("Sum") as amounts:
+            return sum(amounts)
+
+
+def aggregate_csv(path):
+    with open(path, encoding="utf-8") as file:
+        return aggregate_sales(csv.DictReader(file, skipinitialspace=True))
+
+
+def best_time(function, path, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = function(path)
+        timings.append(perf_counter() - start)
+    return round(min(timings), 4), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    report = {"rows": args.rows}
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        sales_csv = generate_sales(directory / "sales.csv", args.rows, args.invalid_ratio)
+        sales_col = directory / "sales.col"
+        rows = parse_csv(sales_csv)
+        write_columnar(rows, sales_col)
+        del rows
+        csv_seconds, csv_rows = best_time(parse_csv, sales_csv, args.repeat)
+        col_seconds, col_rows = best_time(read_columnar, sales_col, args.repeat)
+        csv_aggregate_seconds, csv_result = best_time(aggregate_csv, sales_csv, args.repeat)
+        col_aggregate_seconds, col_result = best_time(aggregate_sales_snapshot, sales_col, args.repeat)
+        report["sales"] = {
+            "csv_bytes": sales_csv.stat().st_size,
+            "columnar_bytes": sales_col.stat().st_size,
+            "csv_parse_seconds": csv_seconds,
+            "columnar_read_rows_seconds": col_seconds,
+            "identical_rows": csv_rows == col_rows,
+            "task2_csv_seconds": csv_aggregate_seconds,
+            "task2_columnar_seconds": col_aggregate_seconds,
+            "identical_task2_result": repr(csv_result) == repr(col_result),
+            "columnar_sum_column_seconds": best_time(sum_column, sales_col, args.repeat)[0],
+        }
+        del csv_rows, col_rows
+
+        records_json = generate_records_json(directory / "records.json", args.rows, 0.0)
+        records_col = directory / "records.col"
+        rows = parse_json(records_json)
+        write_columnar(rows, records_col)
+        del rows
+        json_seconds, json_rows = best_time(parse_json, records_json, args.repeat)
+        col_seconds, col_rows = best_time(read_columnar, records_col, args.repeat)
+        report["records"] = {
+            "json_bytes": records_json.stat().st_size,
+            "columnar_bytes": records_col.stat().st_size,
+            "json_parse_seconds": json_seconds,
+            "columnar_read_rows_seconds": col_seconds,
+            "identical_rows": json_rows == col_rows,
+        }
+        del json_rows, col_rows
+
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
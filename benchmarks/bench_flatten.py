@@ -0,0 +1,67 @@
+"""Compares flattening nested records with compiled plans and with a recursive walk.
+
+Usage:
+    python benchmarks/bench_flatten.py --rows 1000000 --repeat 3
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "csv_json_converter"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # the common package
+
+from converter import CsvJsonConverter  # noqa: E402
+from flatten import Flattener, flatten_record  # noqa: E402
+from generators import generate_nested_json  # noqa: E402
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+    return round(min(timings), 4)
+
+
+def convert(source, target):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return CsvJsonConverter(source).convert_to_csv(target, stream=True, flatten=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    report = {"rows": args.rows}
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        source = generate_nested_json(directory / "nested.json", args.rows)
+        with open(source, encoding="utf-8") as file:
+            records = json.load(file)
+
+        flattener = Flattener()
+        report["walk_seconds"] = best_time(lambda: list(map(flatten_record, records)), args.repeat)
+        report["plans_seconds"] = best_time(lambda: list(map(flattener.flatten, records)), args.repeat)
+        report["plans"] = flattener.plan_count
+        # Same columns in the same order.
+        report["identical"] = ([list(flat.items()) for flat in map(flattener.flatten, records)]
+                               == [list(flat.items()) for flat in map(flatten_record, records)])
+        del records
+
+        target = directory / "nested.csv"
+        report["convert_to_csv_seconds"] = best_time(lambda: convert(source, target), args.repeat)
+        report["csv_bytes"] = target.stat().st_size
+
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compares a full task2 aggregation with an incremental refresh after rows are appended.
+
+Usage:
+    python benchmarks/bench_incremental.py --rows 2000000 --append 10000 --repeat 3
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "json_csv_practice"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # the common package
+
+from common.records import RecordReader  # noqa: E402
+from sales_engine import aggregate_sales  # noqa: E402
+from sales_incremental import IncrementalSales  # noqa: E402
+from generators import generate_sales  # noqa: E402
+
+
+def full_aggregate(path):
+    with open(path, encoding="utf-8") as file:
+        return aggregate_sales(RecordReader(file, skipinitialspace=True))
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return perf_counter() - start, result
+
+
+def comparable(result):
+    total_sales, total_sale_per_item, monthly_total_sales, row_count, skipped = result
+    return total_sales, dict(total_sale_per_item), dict(monthly_total_sales), row_count, skipped.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--append", type=int, default=10_000, help="rows appended before every refresh")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = generate_sales(Path(directory) / "sales.csv", args.rows, args.invalid_ratio)
+        appended = generate_sales(Path(directory) / "appended.csv", args.append, args.invalid_ratio, seed=1)
+        new_rows = appended.read_bytes().split(b"\n", 1)[1]
+
+        sales = IncrementalSales(path)
+        first_seconds, _ = timed(sales.refresh)
+        refresh_timings, full_timings = [], []
+        identical = True
+        for _ in range(args.repeat):
+            with open(path, "ab") as file:
+                file.write(new_rows)
+            refresh_seconds, incremental = timed(sales.refresh)
+            full_seconds, full = timed(full_aggregate, path)
+            refresh_timings.append(refresh_seconds)
+            full_timings.append(full_seconds)
+            identical = identical and comparable(incremental) == comparable(full)
+
+        report = {
+            "rows": args.rows,
+            "appended_rows": args.append,
+            "first_refresh_seconds": round(first_seconds, 4),
+            "refresh_seconds": round(min(refresh_timings), 4),
+            "full_seconds": round(min(full_timings), 4),
+            "refresh_bytes_read": sales.bytes_read,
+            "file_bytes": path.stat().st_size,
+            "speedup": round(min(full_timings) / min(refresh_timings), 1),
+            "identical": identical,
+        }
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compares the JSON backends of convert_to_json in the pretty and compact modes.
+
+Usage:
+    python benchmarks/bench_json_backends.py --rows 200000 --repeat 3
+"""
+import argparse
+import csv
+import json
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "csv_json_converter"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # the common package
+
+from converter import CsvJsonConverter  # noqa: E402
+from json_backends import available_backends, get_backend  # noqa: E402
+from generators import generate_records_csv  # noqa: E402
+
+
+def write_json_dump(rows, path):
+    """The writer convert_to_json used before the backends: one json.dump of the whole list."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(rows, file, ensure_ascii=False, indent=4)
+
+
+def write_stream(rows, path, backend, compact):
+    with open(path, "w", encoding="utf-8") as file:
+        CsvJsonConverter.stream_to_json(rows, file, backend, compact)
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+    return round(min(timings), 4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    report = {"rows": args.rows, "backends": available_backends()}
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        source = generate_records_csv(directory / "records.csv", args.rows)
+        with open(source, encoding="utf-8", newline="") as file:
+            rows = list(csv.DictReader(file))
+
+        baseline = directory / "baseline.json"
+        report["json.dump"] = {"seconds": best_time(lambda: write_json_dump(rows, baseline), args.repeat),
+                               "bytes": baseline.stat().st_size}
+        expected = {False: baseline.read_bytes(),
+                    True: json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode()}
+
+        for name in report["backends"]:
+            backend = get_backend(name)
+            for compact in (False, True):
+                output = directory / f"{name}_{'compact' if compact else 'pretty'}.json"
+                seconds = best_time(lambda: write_stream(rows, output, backend, compact), args.repeat)
+                report[f"{name} {'compact' if compact else 'pretty'}"] = {
+                    "seconds": seconds,
+                    "bytes": output.stat().st_size,
+                    "identical_to_json": output.read_bytes() == expected[compact],
+                }
+
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measures the memory per row and the load time of dict rows and compact records (records.py).
+
+Usage:
+    python benchmarks/bench_records.py --rows 1000000 --repeat 3
+"""
+import argparse
+import csv
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "json_csv_practice"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # the common package
+
+from common.records import RecordReader, compact_record  # noqa: E402
+from sales_engine import aggregate_sales  # noqa: E402
+from generators import generate_employees, generate_sales  # noqa: E402
+
+
+def load_csv(reader_class):
+    def load(path):
+        with open(path, encoding="utf-8") as file:
+            return list(reader_class(file, skipinitialspace=True))
+    return load
+
+
+def load_json(compact):
+    def load(path):
+        with open(path, encoding="utf-8") as file:
+            items = json.load(file)
+        return [compact_record(item) for item in items] if compact else items
+    return load
+
+
+def bytes_per_row(load, path):
+    """Memory held by the loaded rows (values included) divided by the number of rows."""
+    tracemalloc.start()
+    rows = load(path)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(held / max(len(rows), 1), 1)
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+    return round(min(timings), 4)
+
+
+def compare(dict_load, record_load, path, repeat, aggregate=None):
+    report = {}
+    for name, load in (("dict", dict_load), ("record", record_load)):
+        report[f"{name}_bytes_per_row"] = bytes_per_row(load, path)
+        report[f"{name}_load_seconds"] = best_time(lambda: load(path), repeat)
+        if aggregate is not None:
+            rows = load(path)
+            report[f"{name}_aggregate_seconds"] = best_time(lambda: aggregate(rows), repeat)
+            del rows
+    report["saved_bytes_per_row"] = round(report["dict_bytes_per_row"] - report["record_bytes_per_row"], 1)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    report = {"rows": args.rows}
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        sales = generate_sales(directory / "sales.csv", args.rows, args.invalid_ratio)
+        employees, performance = generate_employees(
+            directory / "employees.json", directory / "performance.csv", args.rows, args.invalid_ratio
+        )
+
+        report["sales_csv"] = compare(
+            load_csv(csv.DictReader), load_csv(RecordReader), sales, args.repeat, aggregate=aggregate_sales
+        )
+        report["performance_csv"] = compare(load_csv(csv.DictReader), load_csv(RecordReader), performance, args.repeat)
+        report["employees_json"] = compare(load_json(False), load_json(True), employees, args.repeat)
+
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Measures the sales cube: building and loading it and its range queries, against rescanning sales.csv.
+
+Usage:
+    python benchmarks/bench_sales_cube.py --rows 1000000 --queries 1000
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "json_csv_practice"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # the common package
+
+from common.records import RecordReader  # noqa: E402
+from sales_cube import load_cube  # noqa: E402
+from sales_engine import aggregate_sales  # noqa: E402
+from generators import generate_sales  # noqa: E402
+
+
+def rescan(path):
+    with open(path, encoding="utf-8") as file:
+        return aggregate_sales(RecordReader(file, skipinitialspace=True))
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return perf_counter() - start, result
+
+
+def per_query(function, queries):
+    start = perf_counter()
+    for query in queries:
+        function(*query)
+    return round((perf_counter() - start) / len(queries) * 1e6, 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    ranges = []
+    for _ in range(args.queries):
+        start = date(2020, 1, 1).toordinal() + rng.randint(0, 1800)
+        ranges.append((date.fromordinal(start), date.fromordinal(start + rng.randint(0, 365))))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = generate_sales(Path(directory) / "sales.csv", args.rows, args.invalid_ratio)
+        rescan_seconds, (total_sales, total_sale_per_item, monthly_total_sales, _, _) = timed(rescan, path)
+        build_seconds, _ = timed(load_cube, path)
+        load_seconds, cube = timed(load_cube, path)
+        items = list(total_sale_per_item)
+
+        report = {
+            "rows": args.rows,
+            "items": len(items),
+            "days": len(cube.days),
+            "rescan_seconds": round(rescan_seconds, 4),
+            "build_seconds": round(build_seconds, 4),
+            "load_seconds": round(load_seconds, 4),
+            "cube_bytes": path.with_suffix(".cube").stat().st_size,
+            "range_total_us": per_query(cube.total, ranges),
+            "item_filtered_total_us": per_query(
+                cube.total, [(start, end, rng.sample(items, 3)) for start, end in ranges]),
+            "top_5_items_us": per_query(lambda start, end: cube.top_items(5, start, end), ranges),
+            "identical": (cube.total() == total_sales and cube.item_totals() == dict(total_sale_per_item)
+                          and cube.monthly_totals() == dict(sorted(monthly_total_sales.items()))),
+        }
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
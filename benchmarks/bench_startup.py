@@ -0,0 +1,82 @@
+"""Measures the cold-start latency of the headless command-line tools against a time budget.
+
+Every command runs in a fresh interpreter on small generated datasets, so the time is mostly
+interpreter startup, imports and argument parsing. The exit status is 1 if the median time of
+any command is over the budget.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5 --budget-ms 250
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import generators
+
+
+ROOT = Path(__file__).resolve().parent.parent
+TASKS_CLI = ROOT / "json_csv_practice" / "cli.py"
+CONVERTER_CLI = ROOT / "csv_json_converter" / "cli.py"
+TXT_CLI = ROOT / "txt_to_csv" / "cli.py"
+
+DEFAULT_BUDGET_MS = 250
+
+
+def commands(directory):
+    """Returns {name: argv} of the measured commands, which read and write files in directory."""
+    tasks = [str(TASKS_CLI), "--data-dir", str(directory), "--log-file", str(directory / "tasks.log")]
+    return {
+        "python": ["-c", "pass"],
+        "tasks_help": [str(TASKS_CLI), "--help"],
+        "task1": [*tasks, "task1", "--subject", "python"],
+        "task2": [*tasks, "task2"],
+        "task3": [*tasks, "task3"],
+        "sales_query": [*tasks, "sales", "--start", "2022-01-01", "--end", "2022-12-31", "--top", "3"],
+        "converter_help": [str(CONVERTER_CLI), "--help"],
+        "converter": [str(CONVERTER_CLI), str(directory / "records.csv"), "-o", str(directory / "records.out.json"),
+                      "--log-file", str(directory / "converter.log")],
+        "txt_to_csv": [str(TXT_CLI), str(directory / "prices.txt"), "-o", str(directory / "prices.out.csv"),
+                       "--log-file", str(directory / "txt.log")],
+    }
+
+
+def measure(argv, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        completed = subprocess.run([sys.executable, *argv], capture_output=True, text=True)
+        timings.append((perf_counter() - start) * 1000)
+    return timings, completed.returncode
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    report = {"rows": args.rows, "budget_ms": args.budget_ms, "commands": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        directory = generators.generate_all(directory, args.rows)
+        for name, command in commands(directory).items():
+            timings, returncode = measure(command, args.repeat)
+            report["commands"][name] = {
+                "min_ms": round(min(timings), 1),
+                "median_ms": round(statistics.median(timings), 1),
+                "exit_status": returncode,
+            }
+
+    report["over_budget"] = [name for name, result in report["commands"].items()
+                             if result["median_ms"] > args.budget_ms]
+    print(json.dumps(report, indent=4))
+    return 1 if report["over_budget"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
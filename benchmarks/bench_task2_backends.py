@@ -0,0 +1,67 @@
+"""Compares the pure-Python and the NumPy backends of the task2 sales aggregation.
+
+Usage:
+    python benchmarks/bench_task2_backends.py --rows 1000000 --repeat 3
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "json_csv_practice"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # the common package
+
+from csv import DictReader  # noqa: E402
+from sales_columnar import aggregate_sales_columnar, numpy_available  # noqa: E402
+from sales_engine import aggregate_sales  # noqa: E402
+from generators import generate_sales  # noqa: E402
+
+
+def python_backend(path):
+    with open(path, encoding="utf-8") as file:
+        return aggregate_sales(DictReader(file, skipinitialspace=True))
+
+
+def best_time(function, path, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = function(path)
+        timings.append(perf_counter() - start)
+    return min(timings), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "sales.csv"
+        generate_sales(path, args.rows, args.invalid_ratio)
+
+        python_seconds, python_result = best_time(python_backend, path, args.repeat)
+        report = {
+            "rows": args.rows,
+            "python_seconds": round(python_seconds, 4),
+            "python_rows_per_second": round(args.rows / python_seconds),
+            "numpy_available": numpy_available(),
+        }
+        if numpy_available():
+            numpy_seconds, numpy_result = best_time(aggregate_sales_columnar, path, args.repeat)
+            report.update({
+                "numpy_seconds": round(numpy_seconds, 4),
+                "numpy_rows_per_second": round(args.rows / numpy_seconds),
+                "speedup": round(python_seconds / numpy_seconds, 2),
+                "identical": repr(python_result) == repr(numpy_result),
+            })
+
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compares convert_to_json with string values and with inferred column types (typed.py).
+
+Usage:
+    python benchmarks/bench_typed_json.py --rows 2000000 --repeat 1
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "csv_json_converter"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # the common package
+
+from converter import CsvJsonConverter  # noqa: E402
+from typed import CONVERTERS, TypedRows, infer_types  # noqa: E402
+from generators import generate_typed_csv  # noqa: E402
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+    return round(min(timings), 4)
+
+
+def convert(source, target, typed):
+    converter = CsvJsonConverter(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        converter.convert_to_json(target, stream=True, compact=True, typed=typed)
+    return converter
+
+
+def type_by_row(rows, types):
+    """Converts every value of every row on its own, the way a consumer would reparse them."""
+    typed = [(name, CONVERTERS[kind]) for name, kind in types.items() if kind != "str"]
+    for row in rows:
+        for name, converter in typed:
+            value = row[name]
+            if not value:
+                row[name] = None
+            elif converter.fits(value):
+                row[name] = converter.parse(value)
+        yield row
+
+
+def revenue(path, typed):
+    """What a consumer of the JSON does: sums quantity * price of the rows with a price."""
+    with open(path, encoding="utf-8") as file:
+        rows = json.load(file)
+    if typed:
+        return sum(row["quantity"] * row["price"] for row in rows if isinstance(row["price"], float))
+    total = 0.0
+    for row in rows:
+        try:
+            total += int(row["quantity"]) * float(row["price"])
+        except ValueError:
+            pass
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--invalid-ratio", type=float, default=0.001)
+    args = parser.parse_args(argv)
+
+    report = {"rows": args.rows}
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        source = generate_typed_csv(directory / "orders.csv", args.rows, args.invalid_ratio)
+        strings, typed = directory / "strings.json", directory / "typed.json"
+
+        report["convert_strings_seconds"] = best_time(lambda: convert(source, strings, False), args.repeat)
+        report["convert_typed_seconds"] = best_time(lambda: convert(source, typed, True), args.repeat)
+        converter = convert(source, typed, True)
+        report["column_types"] = converter.column_types
+        report["type_mismatches"] = dict(converter.type_mismatches.counts)
+        report["strings_bytes"] = strings.stat().st_size
+        report["typed_bytes"] = typed.stat().st_size
+
+        # Typing alone, without reading and writing: whole columns per batch against value by value.
+        with open(source, encoding="utf-8", newline="") as file:
+            rows = list(csv.DictReader(file))
+        types = infer_types(rows[:1000], list(rows[0]))
+        report["type_by_column_seconds"] = best_time(
+            lambda: sum(1 for _ in TypedRows().convert(dict(row) for row in rows)), args.repeat)
+        report["type_by_row_seconds"] = best_time(
+            lambda: sum(1 for _ in type_by_row((dict(row) for row in rows), types)), args.repeat)
+        del rows
+
+        report["consume_strings_seconds"] = best_time(lambda: revenue(strings, False), args.repeat)
+        report["consume_typed_seconds"] = best_time(lambda: revenue(typed, True), args.repeat)
+        report["same_result"] = round(revenue(strings, False), 2) == round(revenue(typed, True), 2)
+
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Synthetic dataset generators for the benchmarks.
+
+Every generator streams its rows to disk, so datasets from 10**3 up to 10**8 rows can be
+created without holding them in memory. invalid_ratio is the share of rows which the
+corresponding tool has to skip (wrong types, bad dates, missing fields and so on).
+"""
+import json
+import random
+from pathlib import Path
+
+
+SUBJECTS = ["Python", "JavaScript", "Java", "SQL", "Go", "Rust", "C++", "Math", "Physics", "History"]
+CITIES = ["Moscow", "Kyiv", "Tallinn", "Riga", "Vilnius", "Warsaw", "Prague", "Berlin"]
+NAMES = ["Anna", "Petr", "Maria", "Ivan", "Elena", "Dmitry", "Olga", "Sergey", "Umi", "Denis"]
+POSITIONS = ["Manager", "Analyst", "Developer", "Designer", "Tester"]
+PRODUCTS = ["Electric kettle", "Frying pan", "Toaster", "Microwave", "Blender", "Mixer", "Iron"]
+
+
+def _is_invalid(rng, invalid_ratio):
+    return invalid_ratio > 0 and rng.random() < invalid_ratio
+
+
+def _write_json_array(path, items):
+    """Writes items as a JSON array one by one, like json.dump(..., indent=4) would."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[")
+        first = True
+        for item in items:
+            file.write("\n    " if first else ",\n    ")
+            file.write(json.dumps(item, ensure_ascii=False, indent=4).replace("\n", "\n    "))
+            first = False
+        file.write("]" if first else "\n]")
+
+
+def generate_students(path, rows, invalid_ratio=0.0, seed=0):
+    rng = random.Random(seed)
+
+    def students():
+        for i in range(rows):
+            student = {
+                "name": f"{rng.choice(NAMES)} {i}",
+                "age": rng.randint(17, 60),
+                "city": rng.choice(CITIES),
+                "subjects": rng.sample(SUBJECTS, rng.randint(1, 4)),
+            }
+            if _is_invalid(rng, invalid_ratio):
+                if rng.random() < 0.5:
+                    student["age"] = str(student["age"])
+                else:
+                    del student["age"]
+            yield student
+
+    _write_json_array(path, students())
+    return Path(path)
+
+
+def generate_sales(path, rows, invalid_ratio=0.0, seed=0, items=200):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("Date, Item, Sum\n")
+        for _ in range(rows):
+            date = f"{rng.randint(2020, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            amount = str(rng.randint(1, 5000))
+            if _is_invalid(rng, invalid_ratio):
+                if rng.random() < 0.5:
+                    date = f"{date[:5]}02-30"
+                else:
+                    amount = "n/a"
+            file.write(f"{date}, Item {rng.randint(1, items)}, {amount}\n")
+    return Path(path)
+
+
+def generate_employees(json_path, csv_path, rows, invalid_ratio=0.0, seed=0):
+    """Writes employees.json and performance.csv with the same shuffled set of IDs."""
+    rng = random.Random(seed)
+    ids = list(range(1, rows + 1))
+    rng.shuffle(ids)
+
+    def employees():
+        for employee_id in ids:
+            employee = {"id": employee_id, "name": f"{rng.choice(NAMES)} {employee_id}",
+                        "position": rng.choice(POSITIONS)}
+            if _is_invalid(rng, invalid_ratio):
+                employee["id"] = str(employee_id)
+            yield employee
+
+    _write_json_array(json_path, employees())
+
+    rng.shuffle(ids)
+    with open(csv_path, "w", encoding="utf-8") as file:
+        file.write("employee_id, performance\n")
+        for employee_id in ids:
+            score = str(rng.randint(1, 100))
+            if _is_invalid(rng, invalid_ratio):
+                score = "n/a"
+            file.write(f"{employee_id}, {score}\n")
+    return Path(json_path), Path(csv_path)
+
+
+def generate_prices(path, rows, invalid_ratio=0.0, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as file:
+        for i in range(rows):
+            line = f"{rng.choice(PRODUCTS)} {i}\t{rng.randint(1, 10)}\t{rng.randint(1, 1000)}"
+            if _is_invalid(rng, invalid_ratio):
+                line = line.rsplit("\t", 1)[0]
+            file.write(line + "\n")
+    return Path(path)
+
+
+def generate_prices_csv(path, rows, invalid_ratio=0.0, seed=0):
+    """The CSV written by from_txt_to_csv, input of calculate_total_cost."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write("Name,Amount,Price per piece\r\n")
+        for i in range(rows):
+            quantity = "n/a" if _is_invalid(rng, invalid_ratio) else str(rng.randint(1, 10))
+            file.write(f"{rng.choice(PRODUCTS)} {i},{quantity},{rng.randint(1, 1000)}\r\n")
+    return Path(path)
+
+
+def generate_records_json(path, rows, invalid_ratio=0.0, seed=0, columns=12):
+    """Heterogeneous records for CsvJsonConverter.convert_to_csv, invalid items are not dicts."""
+    rng = random.Random(seed)
+
+    def records():
+        for i in range(rows):
+            if _is_invalid(rng, invalid_ratio):
+                yield i
+                continue
+            yield {f"field_{column}": f"value {i} {column}"
+                   for column in rng.sample(range(columns), rng.randint(columns // 2, columns))}
+
+    _write_json_array(path, records())
+    return Path(path)
+
+
+def generate_records_csv(path, rows, invalid_ratio=0.0, seed=0, columns=12):
+    """Records for CsvJsonConverter.convert_to_json, invalid rows have missing fields."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write(",".join(f"field_{column}" for column in range(columns)) + "\n")
+        for i in range(rows):
+            values = [f"value {i} {column}" for column in range(columns)]
+            if _is_invalid(rng, invalid_ratio):
+                values = values[:columns // 2]
+            file.write(",".join(values) + "\n")
+    return Path(path)
+
+
+def generate_nested_json(path, rows, invalid_ratio=0.0, seed=0):
+    """Nested records with a few recurring shapes for the flattening of convert_to_csv,
+    invalid items are not dicts."""
+    rng = random.Random(seed)
+
+    def records():
+        for i in range(rows):
+            if _is_invalid(rng, invalid_ratio):
+                yield i
+                continue
+            record = {"id": i, "name": f"{rng.choice(NAMES)} {i}",
+                      "address": {"city": rng.choice(CITIES), "zip": f"{rng.randint(10000, 99999)}"},
+                      "skills": rng.sample(SUBJECTS, rng.randint(1, 3))}
+            if rng.random() < 0.3:
+                record["manager"] = {"id": rng.randint(0, rows), "position": rng.choice(POSITIONS)}
+            yield record
+
+    _write_json_array(path, records())
+    return Path(path)
+
+
+def generate_typed_csv(path, rows, invalid_ratio=0.0, seed=0):
+    """Orders with integer, decimal, boolean, empty and zero-padded code columns for the typed
+    mode of convert_to_json, invalid rows have a price which is not a number."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write("id,date,item,quantity,price,discount,paid,code\n")
+        for i in range(rows):
+            price = "n/a" if _is_invalid(rng, invalid_ratio) else f"{rng.randint(100, 99999) / 100}"
+            discount = f"{rng.randint(1, 30) / 100}" if rng.random() < 0.5 else ""
+            file.write(f"{i},2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},{rng.choice(PRODUCTS)},"
+                       f"{rng.randint(1, 20)},{price},{discount},{rng.choice(('true', 'false'))},"
+                       f"{rng.randint(0, 99999):05d}\n")
+    return Path(path)
+
+
+def generate_all(directory, rows, invalid_ratio=0.0, seed=0):
+    """Generates every dataset with the file names the tools expect into directory."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    generate_students(directory / "students.json", rows, invalid_ratio, seed)
+    generate_sales(directory / "sales.csv", rows, invalid_ratio, seed)
+    generate_employees(directory / "employees.json", directory / "performance.csv", rows, invalid_ratio, seed)
+    generate_prices(directory / "prices.txt", rows, invalid_ratio, seed)
+    generate_prices_csv(directory / "output.csv", rows, invalid_ratio, seed)
+    generate_records_json(directory / "records.json", rows, invalid_ratio, seed)
+    generate_records_csv(directory / "records.csv", rows, invalid_ratio, seed)
+    generate_nested_json(directory / "nested.json", rows, invalid_ratio, seed)
+    generate_typed_csv(directory / "orders.csv", rows, invalid_ratio, seed)
+    return directory
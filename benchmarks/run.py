@@ -0,0 +1,239 @@
+"""Benchmark harness for every entry point of the repository.
+
+Generates synthetic datasets of the requested sizes and runs every case in a fresh
+subprocess, measuring wall time, throughput (rows per second) and peak RSS. Results are
+written as JSON; with --baseline the run is compared with a previous result file and the
+harness exits with status 1 if a case became slower than --threshold allows.
+
+Usage:
+    python benchmarks/run.py --sizes 1000 100000 --output results.json
+    python benchmarks/run.py --sizes 100000 --cases task2 convert_to_json --baseline results.json
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import generators
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _run_task1():
+    from task1 import task1
+    task1(subjects=["python"])
+
+
+def _run_task2():
+    from task2 import task2
+    task2()
+
+
+def _run_task3():
+    from task3 import task3
+    task3()
+
+
+def _run_convert_to_csv():
+    from converter import CsvJsonConverter
+    CsvJsonConverter("records.json").convert_to_csv("out/records.csv")
+
+
+def _run_convert_to_json():
+    from converter import CsvJsonConverter
+    CsvJsonConverter("records.csv").convert_to_json("out/records.json")
+
+
+def _run_from_txt_to_csv():
+    from CSV import from_txt_to_csv
+    from_txt_to_csv("prices.txt", "out/output.csv")
+
+
+def _run_calculate_total_cost():
+    from CSV import calculate_total_cost
+    calculate_total_cost("output.csv")
+
+
+def _run_from_txt_to_total():
+    from CSV import from_txt_to_total
+    from_txt_to_total("prices.txt", "out/output.csv")
+
+
+# name -> (tool directory, input files, dataset generator, benchmarked function)
+CASES = {
+    "task1": ("json_csv_practice", ["students.json"],
+              lambda d, n, r, s: generators.generate_students(d / "students.json", n, r, s), _run_task1),
+    "task2": ("json_csv_practice", ["sales.csv"],
+              lambda d, n, r, s: generators.generate_sales(d / "sales.csv", n, r, s), _run_task2),
+    "task3": ("json_csv_practice", ["employees.json", "performance.csv"],
+              lambda d, n, r, s: generators.generate_employees(
+                  d / "employees.json", d / "performance.csv", n, r, s), _run_task3),
+    "convert_to_csv": ("csv_json_converter", ["records.json"],
+                       lambda d, n, r, s: generators.generate_records_json(d / "records.json", n, r, s),
+                       _run_convert_to_csv),
+    "convert_to_json": ("csv_json_converter", ["records.csv"],
+                        lambda d, n, r, s: generators.generate_records_csv(d / "records.csv", n, r, s),
+                        _run_convert_to_json),
+    "from_txt_to_csv": ("txt_to_csv", ["prices.txt"],
+                        lambda d, n, r, s: generators.generate_prices(d / "prices.txt", n, r, s),
+                        _run_from_txt_to_csv),
+    "calculate_total_cost": ("txt_to_csv", ["output.csv"],
+                             lambda d, n, r, s: generators.generate_prices_csv(d / "output.csv", n, r, s),
+                             _run_calculate_total_cost),
+    "from_txt_to_total": ("txt_to_csv", ["prices.txt"],
+                          lambda d, n, r, s: generators.generate_prices(d / "prices.txt", n, r, s),
+                          _run_from_txt_to_total),
+}
+
+
+def peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_worker(case, directory):
+    """Runs one case in the current (fresh) process and prints its measurements as JSON."""
+    tool, inputs, _, function = CASES[case]
+    sys.path[:0] = [str(ROOT / tool), str(ROOT)]
+    os.chdir(directory)
+    Path("out").mkdir(exist_ok=True)
+    for sidecar in (*Path().glob("*.subjects.idx"), *Path().glob("*.schema.json")):
+        sidecar.unlink()  # every run is measured cold
+    logging.basicConfig(level=logging.INFO, filename="benchmark.log",
+                        format="%(asctime)s - %(levelname)s - [%(name)s] - %(message)s")
+
+    rss_before = peak_rss_kb()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        function()
+    seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "seconds": seconds,
+        "peak_rss_kb": peak_rss_kb(),
+        "rss_before_kb": rss_before,
+        "bytes_in": sum(Path(name).stat().st_size for name in inputs),
+    }))
+
+
+def run_case(case, rows, directory, invalid_ratio, seed, repeat):
+    tool, inputs, generate, _ = CASES[case]
+    if not all((directory / name).exists() for name in inputs):
+        generate(directory, rows, invalid_ratio, seed)
+
+    measurements = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, __file__, "--worker", case, "--data", str(directory)],
+            capture_output=True, text=True, check=True,
+        )
+        measurements.append(json.loads(completed.stdout.splitlines()[-1]))
+
+    best = min(measurements, key=lambda measurement: measurement["seconds"])
+    return {
+        "case": case,
+        "rows": rows,
+        "invalid_ratio": invalid_ratio,
+        "seconds": round(best["seconds"], 6),
+        "rows_per_second": round(rows / best["seconds"]) if best["seconds"] else None,
+        "megabytes_per_second": round(best["bytes_in"] / best["seconds"] / 2 ** 20, 3) if best["seconds"] else None,
+        "peak_rss_kb": max(measurement["peak_rss_kb"] for measurement in measurements),
+        "rss_before_kb": best["rss_before_kb"],
+        "bytes_in": best["bytes_in"],
+    }
+
+
+def git_revision():
+    try:
+        completed = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Returns the cases which are slower than in the baseline by more than threshold."""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {(result["case"], result["rows"]): result for result in json.load(file)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["case"], result["rows"]))
+        if previous and result["seconds"] > previous["seconds"] * (1 + threshold):
+            regressions.append({
+                "case": result["case"],
+                "rows": result["rows"],
+                "baseline_seconds": previous["seconds"],
+                "seconds": result["seconds"],
+            })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks every entry point on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--data-dir", help="keep the generated datasets here instead of a temporary directory")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="previous result file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown against the baseline")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker, args.data)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="benchmarks_") as temporary:
+        base = Path(args.data_dir or temporary)
+        results = []
+        for rows in args.sizes:
+            directory = base / f"{rows}_rows"
+            directory.mkdir(parents=True, exist_ok=True)
+            for case in args.cases:
+                result = run_case(case, rows, directory, args.invalid_ratio, args.seed, args.repeat)
+                results.append(result)
+                print(f"{case:22} {rows:>12} rows {result['seconds']:10.3f}s "
+                      f"{result['rows_per_second'] or 0:>12} rows/s {result['peak_rss_kb']:>10} KB")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.baseline:
+        report["regressions"] = compare(results, args.baseline, args.threshold)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=4)
+    print(f"\nResults are saved to {args.output}")
+
+    if report.get("regressions"):
+        for regression in report["regressions"]:
+            print(f"Regression: {regression['case']} with {regression['rows']} rows "
+                  f"{regression['baseline_seconds']}s -> {regression['seconds']}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,5 @@
+"""Modules shared by the tools of this repository (see README.md).
+
+The tools import them as common.<module>. A tool is run from its own directory, so its script
+entry points (main.py, cli.py, ...) put the repository root on sys.path before importing anything.
+"""
@@ -0,0 +1,131 @@
+import logging
+import queue
+from collections import Counter
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+
+DEFAULT_SAMPLES = 5
+MAX_SAMPLE_LENGTH = 200
+
+
+class BadRows:
+    """Invalid rows counted by type, with the first few samples of every type.
+
+    Only the first `samples` rows of each type are kept (and formatted, once, in the summary),
+    so a feed with millions of bad rows costs a counter increment per row instead of a
+    formatted log line. Instances are picklable and can be merged, so worker processes can
+    collect their own and the parent merges them in file order.
+
+    Usage:
+        bad_rows = BadRows()
+        for i, row in enumerate(rows):
+            ...
+            bad_rows.add("invalid_date", i, e, row)
+        bad_rows.log_summary(logger, metrics)
+    """
+
+    def __init__(self, samples=DEFAULT_SAMPLES):
+        self.limit = samples
+        self.counts = Counter()
+        self.samples = {}
+
+    def add(self, kind, index, error, row=None):
+        count = self.counts[kind] + 1
+        self.counts[kind] = count
+        if count <= self.limit:
+            self.samples.setdefault(kind, []).append((index, error, row))
+
+    def merge(self, other, offset=0):
+        """Adds the bad rows of other, whose row indexes are shifted by offset."""
+        for kind, count in other.counts.items():
+            self.counts[kind] += count
+        for kind, samples in other.samples.items():
+            kept = self.samples.setdefault(kind, [])
+            kept.extend((offset + i, e, row) for i, e, row in samples[:self.limit - len(kept)])
+
+    def to_dict(self):
+        """Returns the counts and the samples as JSON-compatible data. The errors and rows of the
+        samples are kept as the text the summary shows."""
+        samples = {}
+        for kind, kept in self.samples.items():
+            samples[kind] = [[index, _sample_text(error, row)] for index, error, row in kept]
+        return {"limit": self.limit, "counts": dict(self.counts), "samples": samples}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Makes BadRows from the data of to_dict(), with the same summary."""
+        bad_rows = cls(data["limit"])
+        bad_rows.counts.update(data["counts"])
+        bad_rows.samples = {kind: [(index, text, None) for index, text in kept]
+                            for kind, kept in data["samples"].items()}
+        return bad_rows
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def __len__(self):
+        return self.total
+
+    def __repr__(self):
+        return f"BadRows(counts={dict(self.counts)!r}, samples={self.samples!r})"
+
+    def summary(self, what="rows"):
+        lines = [f"Skipped {self.total} invalid {what}: "
+                 + ", ".join(f"{kind}={count}" for kind, count in self.counts.items())]
+        for kind, samples in self.samples.items():
+            shown = f"first {len(samples)} of {self.counts[kind]}" if self.counts[kind] > len(samples) else "all"
+            lines.append(f"  {kind} ({shown}):")
+            for index, error, row in samples:
+                lines.append(f"    #{index}: {_sample_text(error, row)}")
+        return "\n".join(lines)
+
+    def log_summary(self, logger, metrics=None, what="rows", level=logging.WARNING):
+        """Logs one record with the counts and samples and adds the counts to the metrics."""
+        if metrics is not None:
+            for kind, count in self.counts.items():
+                metrics.skip(kind, count)
+        if self.counts:
+            logger.log(level, self.summary(what))
+
+
+@contextmanager
+def queued_logging(logger=None):
+    """Moves the handlers of logger (the root logger by default) behind a queue.
+
+    Log calls only put records into the queue and a background thread writes them with the
+    original handlers, so file I/O does not happen on the hot path. Handlers are restored and
+    the queue is flushed on exit.
+    """
+    logger = logger or logging.getLogger()
+    handlers = logger.handlers[:]
+    if not handlers:
+        yield
+        return
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    listener.start()
+    try:
+        yield
+    finally:
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        for handler in handlers:
+            logger.addHandler(handler)
+
+
+def _sample_text(error, row):
+    text = f"{error}"
+    if row is not None:
+        text += f". Row: {_shorten(repr(row))}"
+    return text
+
+
+def _shorten(text):
+    return text if len(text) <= MAX_SAMPLE_LENGTH else text[:MAX_SAMPLE_LENGTH - 3] + "..."
@@ -0,0 +1,407 @@
+import json
+import logging
+import mmap
+import sys
+from array import array
+from pathlib import Path
+
+from .compression import split_compression_suffix
+
+
+logger = logging.getLogger("columnar")
+
+COLUMNAR_SUFFIX = ".col"
+MAGIC = b"CJCOLUMN"
+VERSION = 1
+ALIGNMENT = 8
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Integer array type codes from the narrowest, the file is always little-endian.
+INT_TYPECODES = ("b", "h", "i", "q")
+
+
+class ColumnarFormatError(ValueError):
+    """Raises when a file is not a columnar snapshot of a supported version."""
+    pass
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class _ColumnBuilder:
+    """Dictionary-encodes the values of one column while rows are written."""
+
+    def __init__(self, rows_before):
+        self.codes = array("i", [-1]) * rows_before
+        self.dictionary = {}
+        self.values = []
+
+    def add(self, value):
+        try:
+            key = (value.__class__, value)
+            code = self.dictionary.get(key)
+        except TypeError:  # lists and objects are compared by their JSON text
+            key = (value.__class__, json.dumps(value, ensure_ascii=False))
+            code = self.dictionary.get(key)
+        if code is None:
+            code = self.dictionary[key] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def encode(self):
+        """Returns (type, text, missing_count, sections), the smallest typed form of the column.
+
+        Integers become an int64 array. Strings which are all canonical integers ('42', '-7', but
+        not '007' or '+7') are stored as int64 too and turned back into the same strings on read.
+        Floats become a float64 array, other strings stay dictionary-encoded and anything else
+        (mixed types, booleans, nulls, lists, objects) is dictionary-encoded as JSON text.
+        """
+        missing_count = self.codes.count(-1)
+        types = {value.__class__ for value in self.values}
+
+        if types == {int} and all(INT64_MIN <= value <= INT64_MAX for value in self.values):
+            return self._encode_numbers("int", self.values, False, missing_count)
+        if types == {str}:
+            numbers = _canonical_ints(self.values)
+            if numbers is not None:
+                return self._encode_numbers("int", numbers, True, missing_count)
+            return "str", False, missing_count, self._encode_dictionary(self.values)
+        if types == {float}:
+            return self._encode_numbers("float", self.values, False, missing_count)
+
+        texts = [json.dumps(value, ensure_ascii=False) for value in self.values]
+        return "json", False, missing_count, self._encode_dictionary(texts)
+
+    def _encode_numbers(self, kind, numbers, text, missing_count):
+        typecode = "d" if kind == "float" else _int_typecode(min(numbers, default=0), max(numbers, default=0))
+        lookup = numbers + [0]  # code -1 (missing) picks the trailing 0
+        sections = {"data": array(typecode, [lookup[code] for code in self.codes])}
+        if missing_count:
+            sections["mask"] = array("B", [code == -1 for code in self.codes])
+        return kind, text, missing_count, sections
+
+    def _encode_dictionary(self, texts):
+        typecode = _int_typecode(-1, len(texts) - 1)
+        codes = self.codes if typecode == "i" else array(typecode, self.codes)
+        return {"data": codes, "dictionary": _encode_strings(texts)}
+
+
+def write_columnar(rows, file_path, source=None):
+    """Writes dict rows into a columnar snapshot and returns the number of rows.
+
+    source is the file the rows were read from. Its path, size and modification time are kept
+    in the header, so readers can check that the snapshot still matches it (see find_snapshot).
+
+    The file starts with the magic bytes, the JSON header length (uint64) and a small JSON
+    header with the row count and the type and byte range of every column, followed by the
+    8-byte aligned column arrays (byte ranges are relative to the aligned end of the header).
+    Columns are typed arrays (the narrowest of int8-int64, or float64) or the narrowest integer
+    codes into a string dictionary (int64 offsets and a UTF-8 blob); -1 codes and mask bytes mark
+    rows which have no value in the column.
+
+    Columns are in the order the keys are first seen, so heterogeneous rows keep all their keys.
+    """
+    builders = {}
+    row_count = 0
+    for row in rows:
+        found = 0
+        for name, builder in builders.items():
+            value = row.get(name, MISSING)
+            if value is MISSING:
+                builder.codes.append(-1)
+            else:
+                builder.add(value)
+                found += 1
+        if found < len(row):
+            for name, value in row.items():
+                if name not in builders:
+                    builder = builders[name] = _ColumnBuilder(row_count)
+                    builder.add(value)
+        row_count += 1
+
+    columns = []
+    blocks = []
+    offset = 0
+    for name in list(builders):
+        kind, text, missing_count, sections = builders.pop(name).encode()
+        column = {"name": name, "type": kind, "text": text, "missing": missing_count}
+        for section, value in sections.items():
+            if section == "dictionary":
+                offsets, blob = value
+                column["dictionary"] = {"size": len(offsets) - 1}
+                parts = ((column["dictionary"], "offsets", offsets), (column["dictionary"], "blob", blob))
+            else:
+                parts = ((column, section, value),)
+            for target, part, data in parts:
+                if part == "data":
+                    column["typecode"] = data.typecode
+                raw = _to_bytes(data)
+                padding = -len(raw) % ALIGNMENT
+                target[part] = [offset, len(raw)]
+                blocks.append(raw + b"\0" * padding)
+                offset += len(raw) + padding
+        columns.append(column)
+
+    header = {"version": VERSION, "rows": row_count, "columns": columns}
+    if source is not None:
+        header["source"] = source_stamp(source)
+    header = json.dumps(header, ensure_ascii=False).encode()
+    prefix = MAGIC + len(header).to_bytes(8, "little") + header
+    with open(file_path, "wb") as file:
+        file.write(prefix + b"\0" * (-len(prefix) % ALIGNMENT))
+        for block in blocks:
+            file.write(block)
+    return row_count
+
+
+class ColumnarFile:
+    """Read-only, memory-mapped view of a columnar snapshot.
+
+    data(name) returns a zero-copy memoryview of a column (integer/float values or integer
+    dictionary codes) straight from the mapped file. values(name) and iter_rows() turn the
+    columns into Python values, with the same strings and numbers the snapshot was written from.
+    Views returned by data() must be released before close().
+
+    Usage:
+        with ColumnarFile("sales.col") as snapshot:
+            amounts = snapshot.data("Sum")
+            for row in snapshot.iter_rows():
+                ...
+    """
+
+    def __init__(self, file_path):
+        self.path = Path(file_path)
+        with self.path.open("rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise ColumnarFormatError(f"'{self.path}' is not a columnar snapshot.")
+            header_length = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], "little")
+            header_end = len(MAGIC) + 8 + header_length
+            header = json.loads(self._mmap[len(MAGIC) + 8:header_end])
+            if header.get("version") != VERSION:
+                raise ColumnarFormatError(f"Unsupported columnar snapshot version {header.get('version')}.")
+            self.rows = header["rows"]
+            self.columns = {column["name"]: column for column in header["columns"]}
+        except Exception:
+            self._mmap.close()
+            raise
+        self._base = header_end + -header_end % ALIGNMENT
+        self.source = header.get("source")  # see source_stamp()
+        self._dictionaries = {}
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    @property
+    def names(self):
+        return list(self.columns)
+
+    def data(self, name):
+        column = self.columns[name]
+        return self._view(column["data"], column["typecode"])
+
+    def mask(self, name):
+        """Returns the missing-value bytes of a numeric column or None if no row misses it."""
+        column = self.columns[name]
+        return self._view(column["mask"], "B") if "mask" in column else None
+
+    def dictionary(self, name):
+        """Returns the decoded dictionary of a 'str' or 'json' column (cached)."""
+        if name not in self._dictionaries:
+            column = self.columns[name]
+            offsets = self._read(column["dictionary"]["offsets"], "q")
+            blob = self._mmap[slice(*self._span(column["dictionary"]["blob"]))]
+            if blob.isascii():  # byte offsets are character offsets, so the text is decoded once
+                blob = blob.decode()
+                entries = [blob[start:end] for start, end in zip(offsets, offsets[1:])]
+            else:
+                entries = [blob[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+            if column["type"] == "json":
+                entries = [json.loads(entry) for entry in entries]
+            self._dictionaries[name] = entries
+        return self._dictionaries[name]
+
+    def values(self, name, missing=MISSING):
+        """Returns the values of a column as a list, missing is put in the rows without a value."""
+        column = self.columns[name]
+        kind = column["type"]
+        if kind in ("str", "json"):
+            lookup = self.dictionary(name) + [missing]  # code -1 picks missing
+            return [lookup[code] for code in self._read(column["data"], column["typecode"])]
+
+        values = self._read(column["data"], column["typecode"])
+        if column["text"]:
+            values = list(map(str, values))
+        if column["missing"]:
+            for i, is_missing in enumerate(self._read(column["mask"], "B")):
+                if is_missing:
+                    values[i] = missing
+        return values
+
+    def row(self, index):
+        row = {}
+        for name, column in self.columns.items():
+            value = self._value(name, column, index)
+            if value is not MISSING:
+                row[name] = value
+        return row
+
+    def iter_rows(self):
+        """Yields the rows as dicts with the keys each row was written with."""
+        names = list(self.columns)
+        columns = [self.values(name) for name in names]
+        if not any(column["missing"] for column in self.columns.values()):
+            for values in zip(*columns):
+                yield dict(zip(names, values))
+            return
+        for values in zip(*columns):
+            yield {name: value for name, value in zip(names, values) if value is not MISSING}
+
+    def _value(self, name, column, index):
+        kind = column["type"]
+        if column["missing"]:
+            if kind in ("str", "json"):
+                if self._item(column["data"], column["typecode"], index) == -1:
+                    return MISSING
+            elif self._item(column["mask"], "B", index):
+                return MISSING
+        if kind in ("str", "json"):
+            return self.dictionary(name)[self._item(column["data"], column["typecode"], index)]
+        value = self._item(column["data"], column["typecode"], index)
+        return str(value) if column["text"] else value
+
+    def _span(self, span):
+        start = self._base + span[0]
+        return start, start + span[1]
+
+    def _view(self, span, typecode):
+        start, end = self._span(span)
+        view = memoryview(self._mmap)[start:end]
+        if sys.byteorder == "little" or typecode == "B":
+            return view.cast(typecode)
+        values = array(typecode, view)  # big-endian hosts get a converted copy
+        view.release()
+        values.byteswap()
+        return memoryview(values)
+
+    def _read(self, span, typecode):
+        values = array(typecode)
+        values.frombytes(self._mmap[slice(*self._span(span))])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tolist()
+
+    def _item(self, span, typecode, index):
+        size = array(typecode).itemsize
+        start = self._base + span[0] + index * size
+        value = array(typecode, self._mmap[start:start + size])
+        if sys.byteorder != "little":
+            value.byteswap()
+        return value[0]
+
+
+def read_columnar(file_path):
+    """Returns all rows of a columnar snapshot as a list of dicts."""
+    with ColumnarFile(file_path) as snapshot:
+        return list(snapshot.iter_rows())
+
+
+def source_stamp(file_path):
+    """Returns the resolved path, size and modification time of a file, which a snapshot keeps of
+    its source file."""
+    file_path = Path(file_path)
+    stat = file_path.stat()
+    return {"path": str(file_path.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def find_snapshot(file_path, columns=()):
+    """Returns the snapshot of a data file ('sales.csv' or 'sales.csv.gz' -> 'sales.col') if it
+    can replace the file, otherwise None.
+
+    A snapshot is used only if it was written from the file as it is now (the same path, size
+    and modification time in its header, see write_columnar) and has all the given columns.
+    Snapshots of another or an older file, snapshots without a source and files which cannot be
+    read as snapshots are ignored, so the data file is read instead.
+    """
+    file_path = Path(file_path)
+    snapshot_path = split_compression_suffix(file_path)[0].with_suffix(COLUMNAR_SUFFIX)
+    if not snapshot_path.exists() or not file_path.exists():
+        return None
+    try:
+        with ColumnarFile(snapshot_path) as snapshot:
+            source, names = snapshot.source, snapshot.names
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable snapshot '{snapshot_path}': {e}")
+        return None
+
+    if source != source_stamp(file_path):
+        logger.info(f"Ignoring snapshot '{snapshot_path}', it was not written from '{file_path}' as it is now")
+        return None
+    missing = [name for name in columns if name not in names]
+    if missing:
+        logger.warning(f"Ignoring snapshot '{snapshot_path}', it has no column {', '.join(map(repr, missing))}")
+        return None
+    return snapshot_path
+
+
+def is_columnar(file_path):
+    try:
+        with open(file_path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _canonical_ints(texts):
+    """Returns the integers of strings which are exactly str(int), otherwise None."""
+    numbers = []
+    for text in texts:
+        if not text or len(text) > 20 or not text.isascii() or not text.lstrip("-").isdigit():
+            return None
+        number = int(text)
+        if str(number) != text or not INT64_MIN <= number <= INT64_MAX:
+            return None
+        numbers.append(number)
+    return numbers
+
+
+def _int_typecode(low, high):
+    for typecode in INT_TYPECODES:
+        bits = array(typecode).itemsize * 8
+        if -2 ** (bits - 1) <= low and high < 2 ** (bits - 1):
+            return typecode
+    return "q"
+
+
+def _encode_strings(texts):
+    encoded = [text.encode() for text in texts]
+    offsets = array("q", [0])
+    total = 0
+    for item in encoded:
+        total += len(item)
+        offsets.append(total)
+    return offsets, b"".join(encoded)
+
+
+def _to_bytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if sys.byteorder != "little" and value.itemsize > 1:
+        value = array(value.typecode, value)
+        value.byteswap()
+    return value.tobytes()
@@ -0,0 +1,74 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+MAGIC_BYTES = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz"}
+
+
+def compression_of(path, detect=True):
+    """Returns 'gzip', 'bz2', 'xz' or None for a file.
+
+    An existing file is recognized by its magic bytes (with detect=True), so a compressed file
+    without a compression suffix is read correctly as well. Otherwise, e.g. for a file which
+    is going to be written, the compression is taken from the suffix.
+    """
+    path = Path(path)
+    if detect and path.is_file():
+        with path.open("rb") as file:
+            head = file.read(6)
+        for magic, compression in MAGIC_BYTES.items():
+            if head.startswith(magic) and (compression != "bz2" or head[3:4].isdigit()):
+                return compression
+        return None
+    return COMPRESSION_SUFFIXES.get(path.suffix.lower())
+
+
+def open_file(path, mode="r", encoding=None, newline=None, compresslevel=None):
+    """Opens a plain, gzip, bz2 or xz file like open().
+
+    Compressed files are decompressed (or compressed) while they are read (or written), nothing
+    is unpacked to disk. Files opened for reading are detected by their magic bytes, files opened
+    for writing by their suffix. compresslevel is the gzip/bz2 level (1-9) or the xz preset (0-9),
+    None keeps the default of the module.
+    """
+    compression = compression_of(path, detect="r" in mode)
+    if compression is None:
+        return open(path, mode, encoding=encoding, newline=newline)
+
+    if "b" not in mode and "t" not in mode:
+        mode += "t"
+    options = {}
+    if "b" not in mode:
+        options.update(encoding=encoding, newline=newline)
+    if compresslevel is not None and "r" not in mode:
+        options["preset" if compression == "xz" else "compresslevel"] = compresslevel
+
+    if compression == "gzip":
+        return gzip.open(path, mode, **options)
+    if compression == "bz2":
+        return bz2.open(path, mode, **options)
+    return lzma.open(path, mode, **options)
+
+
+def split_compression_suffix(path):
+    """Splits 'data.csv.gz' into (Path('data.csv'), '.gz'). The suffix is '' for other files."""
+    path = Path(path)
+    if path.suffix.lower() in COMPRESSION_SUFFIXES:
+        return path.with_suffix(""), path.suffix
+    return path, ""
+
+
+def find_input(path):
+    """Returns path if it exists, else the first existing compressed variant (path.gz, path.bz2,
+    path.xz) and path itself if there is none."""
+    path = Path(path)
+    if path.exists():
+        return path
+    for suffix in COMPRESSION_SUFFIXES:
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return path
@@ -0,0 +1,83 @@
+import json
+
+
+WHITESPACE = " \t\n\r"
+NUMBER_CHARS = "0123456789+-.eE"
+
+
+def iter_json_array(json_file, chunk_size=64 * 1024):
+    """Yields the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks of chunk_size characters and every element is decoded with
+    json.JSONDecoder.raw_decode as soon as it is complete, so only the current element and
+    the unread part of the chunk are kept in memory.
+
+    Raises:
+        json.JSONDecodeError: If the document is not a valid JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = json_file.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            if position < len(buffer) or eof:
+                return
+            fill()
+
+    def error(message):
+        return json.JSONDecodeError(message, buffer, position)
+
+    fill()
+    skip_whitespace()
+    if position >= len(buffer) or buffer[position] != "[":
+        raise error("Expecting '[' at the start of the document")
+    position += 1
+
+    skip_whitespace()
+    if position < len(buffer) and buffer[position] == "]":
+        position += 1
+    else:
+        while True:
+            skip_whitespace()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                # A number at the very end of the buffer may continue in the next chunk.
+                if not eof and not buffer[end:].strip(NUMBER_CHARS):
+                    fill()
+                    continue
+                break
+            position = end
+            yield item
+
+            skip_whitespace()
+            if position >= len(buffer):
+                raise error("Expecting ',' delimiter or ']'")
+            if buffer[position] == "]":
+                position += 1
+                break
+            if buffer[position] != ",":
+                raise error("Expecting ',' delimiter")
+            position += 1
+
+    skip_whitespace()
+    if position < len(buffer):
+        raise error("Extra data")
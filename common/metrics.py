@@ -0,0 +1,148 @@
+import json
+import sys
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class StageMetrics:
+    """Timer and counters of one pipeline stage (load, validate, aggregate, write...)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def to_dict(self):
+        return {
+            "seconds": round(self.seconds, 6),
+            "rows": self.rows,
+            "rows_per_second": round(self.rows_per_second, 1),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class PipelineMetrics:
+    """Structured per-stage metrics of one pipeline run.
+
+    Usage:
+        metrics = PipelineMetrics("task2")
+        with metrics.stage("aggregate") as stage:
+            ...
+            stage.rows += 1
+        metrics.skip("invalid_date")
+        metrics.dump("task2.prom")
+
+    Peak memory is the peak RSS of the process or, with track_memory=True, the peak of Python
+    allocations during the stages measured with tracemalloc (slower, but per pipeline).
+    The values a run computes (totals, top items...) can be put into results, which the
+    command-line tools print as JSON.
+    """
+
+    def __init__(self, pipeline, track_memory=False):
+        self.pipeline = pipeline
+        self.track_memory = track_memory
+        self.stages = {}
+        self.skipped = Counter()
+        self.traced_peak_bytes = 0
+        self.results = {}
+
+    @contextmanager
+    def stage(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageMetrics(name)
+
+        started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start = perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds += perf_counter() - start
+            if self.track_memory and tracemalloc.is_tracing():
+                self.traced_peak_bytes = max(self.traced_peak_bytes, tracemalloc.get_traced_memory()[1])
+            if started_tracing:
+                tracemalloc.stop()
+
+    def skip(self, reason, count=1):
+        self.skipped[reason] += count
+
+    @property
+    def seconds(self):
+        return sum(stage.seconds for stage in self.stages.values())
+
+    @property
+    def peak_memory_bytes(self):
+        if self.track_memory:
+            return self.traced_peak_bytes
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+    def to_dict(self):
+        return {
+            "pipeline": self.pipeline,
+            "seconds": round(self.seconds, 6),
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+            "rows_skipped": dict(self.skipped),
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=4)
+
+    def to_prometheus(self, prefix="pipeline"):
+        """Returns the metrics in the Prometheus text exposition format."""
+        pipeline = self.pipeline
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_label(str(label))}"' for key, label in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}")
+
+        stages = self.stages.values()
+        metric("stage_seconds", "gauge", "Time spent in a pipeline stage.",
+               [({"pipeline": pipeline, "stage": stage.name}, round(stage.seconds, 6)) for stage in stages])
+        metric("stage_rows_total", "counter", "Rows processed by a pipeline stage.",
+               [({"pipeline": pipeline, "stage": stage.name}, stage.rows) for stage in stages])
+        metric("stage_rows_per_second", "gauge", "Throughput of a pipeline stage.",
+               [({"pipeline": pipeline, "stage": stage.name}, round(stage.rows_per_second, 1)) for stage in stages])
+        metric("stage_bytes_read_total", "counter", "Bytes read by a pipeline stage.",
+               [({"pipeline": pipeline, "stage": stage.name}, stage.bytes_read) for stage in stages])
+        metric("stage_bytes_written_total", "counter", "Bytes written by a pipeline stage.",
+               [({"pipeline": pipeline, "stage": stage.name}, stage.bytes_written) for stage in stages])
+        metric("rows_skipped_total", "counter", "Rows skipped by reason.",
+               [({"pipeline": pipeline, "reason": reason}, count) for reason, count in self.skipped.items()])
+        if self.peak_memory_bytes is not None:
+            metric("peak_memory_bytes", "gauge", "Peak memory of the pipeline run.",
+                   [({"pipeline": pipeline}, self.peak_memory_bytes)])
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Writes the metrics to path, in Prometheus text format for '.prom' files and as JSON otherwise."""
+        text = self.to_prometheus() if str(path).endswith(".prom") else self.to_json()
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
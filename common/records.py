@@ -0,0 +1,144 @@
+from csv import DictReader
+
+
+# compact_record() leaves dicts with new key sets alone once this many record types exist,
+# so JSON objects with many different key sets do not create a class per object.
+MAX_RECORD_TYPES = 1024
+
+_RECORD_TYPES = {}
+
+
+class Record(tuple):
+    """Read-only row stored as a tuple of values with one key -> position map per header.
+
+    A dict row costs a hash table per row, a record only the tuple of its values (about a third
+    of the size for a few columns), because the keys are kept once in the record type. Records
+    support the read operations of a dict: row[key], key in row, get(), keys(), values(), items(),
+    len() and iteration over the keys, and their repr is the repr of the dict, so task code and
+    log messages do not change. json.dumps() would write a record as a list, so use to_dict()
+    (or as_dict()) before serializing it.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        return tuple.__getitem__(self, self._index[key])
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        return _rebuild, (self._fields, tuple(tuple.__iter__(self)))
+
+    def get(self, key, default=None):
+        position = self._index.get(key)
+        return default if position is None else tuple.__getitem__(self, position)
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self):
+        return [tuple.__getitem__(self, position) for position in self._index.values()]
+
+    def items(self):
+        return [(key, tuple.__getitem__(self, position)) for key, position in self._index.items()]
+
+    def to_dict(self):
+        return {key: tuple.__getitem__(self, position) for key, position in self._index.items()}
+
+
+def record_type(fields):
+    """Returns the record class for a header (one class per distinct tuple of field names).
+
+    As in a dict built from the header, a repeated field name keeps the position of its
+    last value.
+    """
+    fields = tuple(fields)
+    cls = _RECORD_TYPES.get(fields)
+    if cls is None:
+        index = {field: position for position, field in enumerate(fields)}
+        cls = _RECORD_TYPES[fields] = type("Record", (Record,), {"__slots__": (), "_fields": fields, "_index": index})
+    return cls
+
+
+def _rebuild(fields, values):
+    return record_type(fields)(values)
+
+
+def compact_record(item):
+    """Returns a dict (e.g. a parsed JSON object) as a record, other items unchanged."""
+    if item.__class__ is not dict:
+        return item
+    cls = _RECORD_TYPES.get(tuple(item))
+    if cls is None:
+        if len(_RECORD_TYPES) >= MAX_RECORD_TYPES:
+            return item
+        cls = record_type(item)
+    return cls(item.values())
+
+
+def as_dict(row):
+    """Returns a record as a dict, other rows unchanged."""
+    return row.to_dict() if isinstance(row, Record) else row
+
+
+def pack_records(rows):
+    """Turns records into (fields, values) tuples which marshal can save (the shared field
+    tuples are stored once), other rows stay as they are."""
+    return [(row._fields, tuple(tuple.__iter__(row))) if isinstance(row, Record) else row for row in rows]
+
+
+def unpack_records(rows):
+    """Reverses pack_records()."""
+    return [record_type(row[0])(row[1]) if row.__class__ is tuple else row for row in rows]
+
+
+class RecordReader(DictReader):
+    """csv.DictReader which yields records instead of dicts.
+
+    Rows with the same number of values as the header become records. Other rows are returned
+    as the dicts DictReader makes of them (missing values are restval, extra values are listed
+    under restkey), so every row reads exactly like a DictReader row.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._record_fields = None
+        self._record = None
+
+    def __next__(self):
+        if self.line_num == 0:
+            # Used only for its side effect.
+            self.fieldnames
+        row = next(self.reader)
+        self.line_num = self.reader.line_num
+
+        # Unlike the basic reader, empty rows are skipped.
+        while row == []:
+            row = next(self.reader)
+
+        fieldnames = self.fieldnames
+        if len(fieldnames) == len(row):
+            if fieldnames is not self._record_fields:
+                self._record_fields = fieldnames
+                self._record = record_type(fieldnames)
+            return self._record(row)
+
+        values = dict(zip(fieldnames, row))
+        if len(fieldnames) < len(row):
+            values[self.restkey] = row[len(fieldnames):]
+        else:
+            for key in fieldnames[len(row):]:
+                values[key] = self.restval
+        return values
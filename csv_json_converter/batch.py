@@ -0,0 +1,242 @@
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+from time import perf_counter
+
+# The tool is run from its own directory, the common package is in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from converter import CsvJsonConverter, configure_logging  # noqa: E402
+from common.compression import split_compression_suffix  # noqa: E402
+from common.columnar import COLUMNAR_SUFFIX  # noqa: E402
+from json_backends import available_backends  # noqa: E402
+
+
+SUPPORTED_SUFFIXES = (".csv", ".json", ".jsonl", ".ndjson")
+TARGET_SUFFIXES = {".csv": ".json", ".json": ".csv", ".jsonl": ".csv"}
+
+
+def expand_inputs(inputs):
+    """Turns a list of files, directories and glob patterns into a sorted list of unique files.
+
+    Directories are scanned (not recursively) for .csv, .json and JSON Lines files, also compressed with
+    gzip, bz2 or xz (e.g. .csv.gz). Schema cache sidecar files (*.schema.json) are never treated as input.
+    """
+    files = {}
+    for pattern in inputs:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = path.iterdir()
+        elif any(char in pattern for char in "*?["):
+            candidates = (Path(match) for match in glob.glob(pattern, recursive=True))
+        else:
+            candidates = [path]
+
+        for candidate in candidates:
+            name = split_compression_suffix(candidate)[0].name
+            if name.endswith(SUPPORTED_SUFFIXES) and not name.endswith(".schema.json"):
+                files.setdefault(str(candidate), candidate)
+    return sorted(files.values())
+
+
+def convert_file(source, output_dir, lines=False, compresslevel=None, columnar=False, skipinitialspace=False,
+                 compact=False, json_backend=None, flatten=False, typed=False):
+    """Converts one file into output_dir and returns a JSON-serializable report.
+
+    Runs in a worker process. A compressed file is converted into a file compressed the same
+    way, except for columnar snapshots which are never compressed.
+    """
+    target = target_of(source, output_dir, lines, columnar)
+    return convert_to(source, target, lines, compresslevel, columnar, skipinitialspace, compact, json_backend, flatten,
+                      typed)
+
+
+def target_of(source, output_dir, lines=False, columnar=False):
+    """Returns the file convert_file writes for source."""
+    base, compression_suffix = split_compression_suffix(Path(source))
+    if columnar:
+        return Path(output_dir) / (base.stem + COLUMNAR_SUFFIX)
+    suffix = CsvJsonConverter.suffix_file(base.name)
+    target_suffix = ".jsonl" if lines and suffix == ".csv" else TARGET_SUFFIXES[suffix]
+    return Path(output_dir) / (base.stem + target_suffix + compression_suffix)
+
+
+def shared_targets(files, output_dir, lines=False, columnar=False):
+    """Returns {file: target} of the files whose target is also the target of another file,
+    e.g. 'a.json' and 'a.jsonl' (both 'a.csv') or 'in/a.csv' and 'old/a.csv'."""
+    sources = {}
+    for file in files:
+        target = target_of(file, output_dir, lines, columnar)
+        sources.setdefault(_resolved(target), []).append((file, target))
+    return {file: target for shared in sources.values() if len(shared) > 1 for file, target in shared}
+
+
+def input_targets(files, output_dir, lines=False, columnar=False):
+    """Returns {file: target} of the files whose target is one of the files, e.g. 'in/a.json'
+    (-> 'in/a.csv') together with 'in/a.csv' when the output directory is the input directory."""
+    inputs = set(map(_resolved, files))
+    targets = {file: target_of(file, output_dir, lines, columnar) for file in files}
+    return {file: target for file, target in targets.items() if _resolved(target) in inputs}
+
+
+def _resolved(path):
+    return os.path.normcase(os.path.realpath(path))
+
+
+def failed_report(source, target, message):
+    return {"source": str(source), "target": str(target), "ok": False, "seconds": 0.0, "bytes_in": 0,
+            "bytes_out": 0, "messages": [message], "metrics": {}}
+
+
+def convert_to(source, target, lines=False, compresslevel=None, columnar=False, skipinitialspace=False,
+               compact=False, json_backend=None, flatten=False, typed=False):
+    """Converts source into target and returns a JSON-serializable report.
+
+    The report has the file the converter wrote, whose suffix may differ from target (e.g.
+    'out' becomes 'out.json'). Everything the converter prints is captured into the report
+    instead of being interleaved with the output of other workers.
+    """
+    source = Path(source)
+    target = Path(target)
+    suffix = CsvJsonConverter.suffix_file(split_compression_suffix(source)[0].name)
+    converter = CsvJsonConverter(source, compresslevel=compresslevel, skipinitialspace=skipinitialspace)
+
+    start = perf_counter()
+    messages = io.StringIO()
+    with redirect_stdout(messages):
+        if columnar:
+            written = converter.convert_to_columnar(target, stream=True)
+        elif suffix == ".csv":
+            try:
+                written = converter.convert_to_json(target, stream=True, lines=lines, compact=compact,
+                                                    json_backend=json_backend, typed=typed)
+            except ValueError as e:  # a JSON backend which is unknown or not installed fails only this file
+                print(e)
+                written = False
+        else:
+            written = converter.convert_to_csv(target, stream=True, flatten=flatten)
+
+    report = {
+        "source": str(source),
+        "target": str(written or target),
+        "ok": bool(written),
+        "seconds": round(perf_counter() - start, 6),
+        "bytes_in": source.stat().st_size if source.exists() else 0,
+        "bytes_out": written.stat().st_size if written else 0,
+        "messages": [line for line in messages.getvalue().splitlines() if line],
+        "metrics": converter.metrics.to_dict(),
+    }
+    if converter.column_types:
+        report["column_types"] = converter.column_types
+        report["type_mismatches"] = dict(converter.type_mismatches.counts)
+    return report
+
+
+def convert_batch(inputs, output_dir, workers=None, lines=False, compresslevel=None, columnar=False,
+                  skipinitialspace=False, compact=False, json_backend=None, flatten=False, typed=False):
+    """Converts many files at once in a process pool.
+
+    Args:
+        inputs: Files, directories or glob patterns.
+        output_dir: Directory for the converted files.
+        workers: Number of worker processes, os.cpu_count() by default.
+        lines: Write CSV files as JSON Lines instead of a JSON array.
+        compresslevel: Compression level of the compressed output files, the default of gzip, bz2
+            or xz if None.
+        columnar: Write every file as a columnar snapshot (.col) instead of CSV/JSON.
+        skipinitialspace: Ignore spaces after the commas of CSV files.
+        compact: Write JSON without indentation and spaces.
+        json_backend: Name of the JSON serializer (see json_backends.py), the fastest installed one if None.
+        flatten: Write nested JSON objects and lists as dotted CSV columns.
+        typed: Write CSV values as JSON numbers, booleans and null by the inferred column types.
+
+    Returns:
+        A list of per-file reports in the order of the input files. Files which would be converted
+        into the same target (see shared_targets) or into another input file (see input_targets)
+        are not converted and fail, so no worker overwrites the output of another one or a file
+        another worker reads.
+    """
+    files = expand_inputs(inputs)
+    if not files:
+        return []
+
+    shared = shared_targets(files, output_dir, lines, columnar)
+    reports = {file: failed_report(file, target, f"Output file {target} would be written by more than one input "
+                                                 f"file. Convert them into different directories.")
+               for file, target in shared.items()}
+    reports.update((file, failed_report(file, target, f"Output file {target} is an input file of the batch. "
+                                                      f"Convert the files into another directory."))
+                   for file, target in input_targets(files, output_dir, lines, columnar).items())
+    files_to_convert = [file for file in files if file not in reports]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files_to_convert) <= 1:
+        reports.update((file, convert_file(file, output_dir, lines, compresslevel, columnar, skipinitialspace, compact,
+                                           json_backend, flatten, typed)) for file in files_to_convert)
+        return [reports[file] for file in files]
+
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing is slow to import, only workers need it
+
+    count = len(files_to_convert)
+    # Workers started by spawn do not inherit the logging configuration of the parent.
+    with ProcessPoolExecutor(max_workers=min(workers, count), initializer=configure_logging) as executor:
+        reports.update(zip(files_to_convert, executor.map(
+            convert_file, files_to_convert, [output_dir] * count, [lines] * count, [compresslevel] * count,
+            [columnar] * count, [skipinitialspace] * count, [compact] * count,
+            [json_backend] * count, [flatten] * count, [typed] * count
+        )))
+    return [reports[file] for file in files]
+
+
+def print_report(results, seconds):
+    for result in results:
+        status = "OK" if result["ok"] else "FAILED"
+        print(f"{status:6} {result['seconds']:10.3f}s  {result['source']} -> {result['target']}")
+        if not result["ok"]:
+            for message in result["messages"]:
+                print(f"       {message}")
+
+    converted = sum(result["ok"] for result in results)
+    print(f"\nConverted {converted} of {len(results)} files in {seconds:.3f}s.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converts many CSV and JSON files in parallel.")
+    parser.add_argument("inputs", nargs="+", help="files, directories or glob patterns")
+    parser.add_argument("-o", "--output-dir", default="converted", help="directory for the converted files")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--lines", action="store_true", help="write CSV files as JSON Lines")
+    parser.add_argument("--compresslevel", type=int, default=None,
+                        help="level of compressed output files (1-9 for gzip and bz2, 0-9 for xz)")
+    parser.add_argument("--columnar", action="store_true", help="write columnar snapshots (.col)")
+    parser.add_argument("--skipinitialspace", action="store_true", help="ignore spaces after commas in CSV files")
+    parser.add_argument("--compact", action="store_true", help="write JSON without indentation and spaces")
+    parser.add_argument("--json-backend", choices=["auto", *available_backends()], default="auto",
+                        help="JSON serializer, the fastest installed one by default")
+    parser.add_argument("--flatten", action="store_true",
+                        help="write nested JSON values as dotted columns ('user.name', 'tags.0') instead of as they are")
+    parser.add_argument("--typed", action="store_true",
+                        help="write CSV values as JSON numbers, booleans and null by the inferred column types")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    start = perf_counter()
+    results = convert_batch(args.inputs, args.output_dir, args.workers, args.lines, args.compresslevel, args.columnar,
+                            args.skipinitialspace, args.compact, args.json_backend, args.flatten, args.typed)
+    seconds = perf_counter() - start
+
+    if args.json:
+        print(json.dumps({"seconds": round(seconds, 6), "files": results}, ensure_ascii=False, indent=4))
+    else:
+        print_report(results, seconds)
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
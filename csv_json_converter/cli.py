@@ -0,0 +1,67 @@
+"""Converts one CSV or JSON file without prompts and prints the report as JSON.
+
+Usage:
+    python cli.py data.csv                               # writes data.json next to data.csv
+    python cli.py data.csv -o data.jsonl --lines --typed
+    python cli.py export.json.gz -o export.csv.gz
+    python cli.py data.csv -o data.col                   # columnar snapshot
+
+The report has the source and target, the time, the messages of the converter and its metrics
+(see batch.convert_to). The exit status is 0 if the file was converted and 1 otherwise. The
+converter is imported only after the arguments are parsed, so a run starts quickly (see
+benchmarks/bench_startup.py). batch.py converts many files at once.
+"""
+import argparse
+import json
+import os
+import sys
+
+# The tool is run from its own directory, the common package is in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Converts a CSV or JSON file without prompts and prints a JSON report.")
+    parser.add_argument("source", help="CSV, JSON or JSON Lines file, also compressed (.gz, .bz2, .xz)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="converted file, *.col for a columnar snapshot (next to the source by default)")
+    parser.add_argument("--lines", action="store_true", help="write a CSV file as JSON Lines")
+    parser.add_argument("--compresslevel", type=int, default=None,
+                        help="level of a compressed output file (1-9 for gzip and bz2, 0-9 for xz)")
+    parser.add_argument("--skipinitialspace", action="store_true", help="ignore spaces after commas in CSV files")
+    parser.add_argument("--compact", action="store_true", help="write JSON without indentation and spaces")
+    parser.add_argument("--json-backend", default="auto", help="JSON serializer, the fastest installed one by default")
+    parser.add_argument("--flatten", action="store_true",
+                        help="write nested JSON values as dotted columns ('user.name', 'tags.0') instead of as they are")
+    parser.add_argument("--typed", action="store_true",
+                        help="write CSV values as JSON numbers, booleans and null by the inferred column types")
+    parser.add_argument("--log-file", default="errors.log", help="log file of the converter errors")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from batch import convert_file, convert_to
+    from common.columnar import COLUMNAR_SUFFIX
+    from converter import CsvJsonConverter, configure_logging
+
+    configure_logging(os.path.abspath(args.log_file))
+    options = dict(lines=args.lines, compresslevel=args.compresslevel, skipinitialspace=args.skipinitialspace,
+                   compact=args.compact, json_backend=args.json_backend, flatten=args.flatten, typed=args.typed)
+    try:
+        if CsvJsonConverter.suffix_file(args.source) is None:
+            raise ValueError(f"Unsupported file '{args.source}', expected a .csv, .json or JSON Lines file.")
+        if args.output is None:
+            report = convert_file(args.source, os.path.dirname(args.source) or ".", **options)
+        else:
+            report = convert_to(args.source, args.output, columnar=args.output.endswith(COLUMNAR_SUFFIX), **options)
+    except (OSError, ValueError) as e:
+        report = {"source": args.source, "target": args.output, "ok": False, "messages": [f"{e}"]}
+
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
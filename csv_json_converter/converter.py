@@ -3,14 +3,49 @@ import csv
 import mimetypes
 from pathlib import Path
 import logging
+from contextlib import contextmanager
 from time import sleep
+from itertools import chain, islice
+from ndjson import NDJSON_SUFFIXES, is_ndjson, iter_ndjson, write_ndjson, parse_ndjson_parallel
+from common.json_stream import iter_json_array
+from common.metrics import PipelineMetrics
+from common.compression import compression_of, open_file, split_compression_suffix
+from common.columnar import COLUMNAR_SUFFIX, write_columnar
+from json_backends import get_backend
+from flatten import ColumnCollision, Flattener
+from typed import DEFAULT_TYPE_SAMPLE, TypedRows
 
 
-logging.basicConfig(
-    filename="errors.log",
-    level=logging.ERROR,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+LOG_FILE = "errors.log"
+
+
+def configure_logging(filename=LOG_FILE):
+    """Writes the errors of the converter to a log file.
+
+    Called by the entry points (main.py, batch.py, cli.py), importing the converter does not
+    configure logging.
+    """
+    logging.basicConfig(
+        filename=filename,
+        level=logging.ERROR,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+
+@contextmanager
+def replace_on_success(output_path):
+    """Yields a temporary path next to output_path, which is renamed to output_path when the
+    block succeeds and removed when it fails. A conversion which fails halfway (e.g. invalid
+    JSON after the first rows) leaves neither a partial file nor a damaged older one. The
+    temporary name ends with the name of output_path, whose suffixes pick the compression."""
+    temporary_path = output_path.with_name(".tmp-" + output_path.name)
+    try:
+        yield temporary_path
+        temporary_path.replace(output_path)
+    except BaseException:
+        if temporary_path.exists():
+            temporary_path.unlink()
+        raise
 
 
 class EmptyFileException(Exception):
@@ -24,27 +59,53 @@ class IncorrectJsonItem(Exception):
 
 
 class CsvJsonConverter:
-    def __init__(self, file):
+    def __init__(self, file, workers=1, compresslevel=None, skipinitialspace=False):
         self.file = Path(file)
+        # 'data.csv.gz' is read as 'data.csv', the format comes from the name without the compression suffix.
+        self.base_file, _ = split_compression_suffix(self.file)
+        self.workers = workers
+        self.compresslevel = compresslevel
+        # With skipinitialspace the spaces after commas ('Date, Item, Sum') are not part of names and values.
+        self.skipinitialspace = skipinitialspace
         self.json_data = []
         self.csv_data = []
+        self.column_types = {}
+        self.type_mismatches = None
+        self.metrics = PipelineMetrics("converter")
 
-    def load_data(self):
-        mime_type, _ = mimetypes.guess_type(self.file)
+    def load_data(self, stream=False):
+        mime_type, _ = mimetypes.guess_type(self.base_file)
         try:
             if self.file.stat().st_size == 0:
                 raise EmptyFileException
 
-            if mime_type == "application/json":
-                with open(self.file, 'r', encoding='utf-8') as json_file:
+            if stream:
+                return True
+
+            if is_ndjson(self.base_file):
+                if self.workers > 1 and compression_of(self.file) is None:
+                    records = parse_ndjson_parallel(self.file, self.workers)
+                else:
+                    with open_file(self.file, 'r', encoding='utf-8') as json_file:
+                        records = list(iter_ndjson(json_file))
+                items = [item for item in records if isinstance(item, dict)]
+                self.json_data.extend(items)
+                if len(items) < len(records):
+                    self.metrics.skip("not_a_dict", len(records) - len(items))
+
+            elif mime_type == "application/json":
+                with open_file(self.file, 'r', encoding='utf-8') as json_file:
                     data = json.load(json_file)
                     for item in data:
                         if isinstance(item, dict):
                             self.json_data.append(item)
+                        else:
+                            self.metrics.skip("not_a_dict")
 
-            if mime_type == "text/csv" or self.file.name.endswith('.csv'):
-                with open(self.file, 'r', newline='', encoding='utf-8') as csv_file:
-                    reader = csv.DictReader(csv_file, delimiter=',')
+            if mime_type == "text/csv" or self.base_file.name.endswith('.csv'):
+                with open_file(self.file, 'r', newline='', encoding='utf-8') as csv_file:
+                    # csv_data is public and is dumped as it is, so its rows stay dicts (not records).
+                    reader = csv.DictReader(csv_file, delimiter=',', skipinitialspace=self.skipinitialspace)
                     for row in reader:
                         self.csv_data.append(row)
 
@@ -66,56 +127,320 @@ class CsvJsonConverter:
             logging.error(f"{e}")
             return False
 
-    def convert_to_csv(self, csv_filename):
-        output_path = Path(csv_filename)
+    def convert_to_csv(self, csv_filename, stream=False, discover_headers=True, sample=None, schema_cache=False,
+                       flatten=False):
+        """Writes the dict items of the JSON file as CSV rows.
+
+        The suffix of csv_filename is replaced by '.csv' unless it is one already (a compression
+        suffix is kept). Returns the path of the written file, or False if the conversion failed.
+
+        With flatten, nested objects and lists become dotted columns ('user.name', 'tags.0')
+        instead of Python reprs. Every distinct item shape gets a compiled flattening plan
+        once, which is applied to all items of that shape (see flatten.py). The conversion fails
+        if two values of an item get the same column ({"a.b": 1, "a": {"b": 2}}).
+        """
+        flattener = Flattener() if flatten else None
+        output_path, compression_suffix = split_compression_suffix(csv_filename)
         if output_path.suffix != ".csv":
             output_path = output_path.with_suffix(".csv")
+        output_path = output_path.with_name(output_path.name + compression_suffix)
 
-        if not self.load_data():
-            print("No data to convert. Something went wrong. Please check the file and try again.")
-            return
+        self.metrics = PipelineMetrics("convert_to_csv")
+        with self.metrics.stage("load") as stage:
+            if not self.load_data(stream=stream):
+                print("No data to convert. Something went wrong. Please check the file and try again.")
+                return False
+            if not stream:
+                stage.rows = len(self.json_data)
+                stage.bytes_read = self.file.stat().st_size
 
         CsvJsonConverter.create_directory(output_path)
-        headers = list(self.json_data[0].keys())
-        for item in self.json_data:
-            for key in item.keys():
-                if key not in headers:
-                    headers.append(key)
 
         try:
-            with open(output_path, 'w', newline='', encoding='utf-8') as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=headers)
-                writer.writeheader()
-                for item in self.json_data:
-                    row = {key: item.get(key, '') for key in headers}
-                    writer.writerow(row)
+            with self.metrics.stage("discover_headers") as stage:
+                if stream:
+                    items = self.iter_json_items(count_skipped=True)
+                    if discover_headers:
+                        headers = self.discover_headers(self.iter_json_items(), sample, schema_cache, flattener)
+                        stage.bytes_read = self.file.stat().st_size
+                    else:
+                        # Headers come from the first item only, so rows are written right away
+                        # and keys which appear later are dropped.
+                        headers = []
+                        first_item = next(items, None)
+                        if first_item is not None:
+                            headers = list(flattener.columns(first_item) if flattener else first_item.keys())
+                            items = chain([first_item], items)
+                else:
+                    items = self.json_data
+                    headers = self.discover_headers(items, sample, schema_cache, flattener)
+                if flattener is not None:
+                    items = map(flattener.flatten, items)
+
+            with self.metrics.stage("write") as stage:
+                with replace_on_success(output_path) as temporary_path, \
+                        open_file(temporary_path, 'w', newline='', encoding='utf-8',
+                                  compresslevel=self.compresslevel) as csv_file:
+                    writer = csv.DictWriter(csv_file, fieldnames=headers, restval='', extrasaction='ignore')
+                    writer.writeheader()
+                    writer.writerows(CsvJsonConverter.count_rows(items, stage))
+                if stream:
+                    stage.bytes_read = self.file.stat().st_size
+                stage.bytes_written = output_path.stat().st_size
+        except json.JSONDecodeError as e:
+            print("Invalid JSON file. Please check the file and try again.")
+            logging.error(f"Invalid JSON: {e}")
+            return False
+        except ColumnCollision as e:
+            print("Nested values cannot be flattened into distinct columns. Please convert the file without flattening.")
+            logging.error(f"Column collision: {e}")
+            return False
         except PermissionError as e:
             print(f"You don't have a permission for write to the file {output_path.name}. Please try again.")
             logging.error(f"Don't have permission: {e}")
+            return False
         except OSError as e:
             print(f"OS error. Something went wrong. Please try again.")
             logging.error(f"OS error during file writing: {e}. Path: {output_path}")
+            return False
+        return output_path
 
-    def convert_to_json(self, json_filename):
-        output_path = Path(json_filename)
-        if output_path.suffix != ".json":
+    def convert_to_json(self, json_filename, stream=False, lines=False, compact=False, json_backend=None,
+                        typed=False, type_sample=DEFAULT_TYPE_SAMPLE):
+        """Writes the rows of the CSV file as a JSON array (or as JSON Lines with lines=True).
+
+        The suffix of json_filename is replaced by '.json' (or '.jsonl') unless it is one already
+        (a compression suffix is kept). Returns the path of the written file, or False if the
+        conversion failed.
+
+        The array is indented by 4 spaces, with compact=True it is written without any whitespace
+        (JSON Lines then also leave out the spaces after ',' and ':'). json_backend is the name of
+        the serializer (see json_backends.py), the fastest installed one by default. All backends
+        write the same text as the standard library.
+
+        With typed=True the columns become JSON numbers, booleans and null instead of strings.
+        The type of every column is inferred from the first type_sample rows (see typed.py),
+        the inferred types are kept in column_types. Values which do not fit the type of their
+        column are written as strings, counted in type_mismatches and logged once.
+
+        Raises:
+            ValueError: If json_backend is unknown or not installed.
+        """
+        backend = get_backend(json_backend)
+        output_path, compression_suffix = split_compression_suffix(json_filename)
+        if lines and not is_ndjson(output_path):
+            output_path = output_path.with_suffix(".jsonl")
+        elif output_path.suffix not in (".json", *NDJSON_SUFFIXES):
             output_path = output_path.with_suffix(".json")
+        lines = is_ndjson(output_path)
+        output_path = output_path.with_name(output_path.name + compression_suffix)
 
-        if not self.load_data():
-            print("No data to convert. Something went wrong. Please check the file and try again.")
-            return
+        self.metrics = PipelineMetrics("convert_to_json")
+        with self.metrics.stage("load") as stage:
+            if not self.load_data(stream=stream):
+                print("No data to convert. Something went wrong. Please check the file and try again.")
+                return False
+            if not stream:
+                stage.rows = len(self.csv_data)
+                stage.bytes_read = self.file.stat().st_size
 
         CsvJsonConverter.create_directory(output_path)
 
         try:
-            with open(output_path, 'w', encoding='utf-8') as json_file:
-                json.dump(self.csv_data, json_file, ensure_ascii=False, indent=4)
+            with self.metrics.stage("write") as stage:
+                with replace_on_success(output_path) as temporary_path, \
+                        open_file(temporary_path, 'w', encoding='utf-8', compresslevel=self.compresslevel) as json_file:
+                    rows = self.iter_csv_rows() if stream else self.csv_data
+                    if typed:
+                        typed_rows = TypedRows(type_sample)
+                        self.type_mismatches = typed_rows.mismatches
+                        rows = typed_rows.convert(rows)
+                    if lines:
+                        write_ndjson(CsvJsonConverter.count_rows(rows, stage), json_file,
+                                     dumps=backend.compact if compact else None)
+                    else:
+                        self.stream_to_json(CsvJsonConverter.count_rows(rows, stage), json_file, backend, compact)
+                if typed:
+                    self.column_types = typed_rows.types
+                    if self.type_mismatches:
+                        print(f"{self.type_mismatches.total} values did not fit their column type and were kept as text.")
+                        logging.error(self.type_mismatches.summary())
+                if stream:
+                    stage.bytes_read = self.file.stat().st_size
+                stage.bytes_written = output_path.stat().st_size
+        except csv.Error as e:
+            print("Invalid CSV file. Please check the file and try again.")
+            logging.error(f"Invalid CSV format: {e}")
+            return False
         except PermissionError as e:
             print(f"You don't have a permission for write to the file {output_path.name}. Please try again.")
             logging.error(f"Don't have permission: {e}")
+            return False
         except OSError as e:
             print(f"OS error. Something went wrong. Please try again.")
             logging.error(f"OS error during file writing: {e}. Path: {output_path}")
+            return False
+        return output_path
+
+    def convert_to_columnar(self, columnar_filename, stream=False):
+        """Writes the rows of the CSV or JSON file into a binary columnar snapshot (see common/columnar.py),
+        which can be memory-mapped and read much faster than the text formats.
+
+        Returns the path of the written file ('.col'), or False if the conversion failed.
+        """
+        output_path, _ = split_compression_suffix(columnar_filename)  # a snapshot is never compressed
+        if output_path.suffix != COLUMNAR_SUFFIX:
+            output_path = output_path.with_suffix(COLUMNAR_SUFFIX)
+
+        self.metrics = PipelineMetrics("convert_to_columnar")
+        with self.metrics.stage("load") as stage:
+            if not self.load_data(stream=stream):
+                print("No data to convert. Something went wrong. Please check the file and try again.")
+                return False
+            if not stream:
+                stage.rows = len(self.csv_data) + len(self.json_data)
+                stage.bytes_read = self.file.stat().st_size
+
+        CsvJsonConverter.create_directory(output_path)
+
+        try:
+            with self.metrics.stage("write") as stage:
+                if CsvJsonConverter.suffix_file(str(self.file)) == ".csv":
+                    rows = self.iter_csv_rows() if stream else self.csv_data
+                else:
+                    rows = self.iter_json_items(count_skipped=True) if stream else self.json_data
+                with replace_on_success(output_path) as temporary_path:
+                    stage.rows = write_columnar(rows, temporary_path, source=self.file)
+                if stream:
+                    stage.bytes_read = self.file.stat().st_size
+                stage.bytes_written = output_path.stat().st_size
+        except json.JSONDecodeError as e:
+            print("Invalid JSON file. Please check the file and try again.")
+            logging.error(f"Invalid JSON: {e}")
+            return False
+        except csv.Error as e:
+            print("Invalid CSV file. Please check the file and try again.")
+            logging.error(f"Invalid CSV format: {e}")
+            return False
+        except PermissionError as e:
+            print(f"You don't have a permission for write to the file {output_path.name}. Please try again.")
+            logging.error(f"Don't have permission: {e}")
+            return False
+        except OSError as e:
+            print("OS error. Something went wrong. Please try again.")
+            logging.error(f"OS error during file writing: {e}. Path: {output_path}")
+            return False
+        return output_path
+
+    def iter_json_items(self, count_skipped=False):
+        """Yields dict items of the top-level JSON array (or JSON Lines records) one by one
+        without loading the whole file. With count_skipped other items are counted in the metrics."""
+        with open_file(self.file, 'r', encoding='utf-8') as json_file:
+            items = iter_ndjson(json_file) if is_ndjson(self.base_file) else iter_json_array(json_file)
+            for item in items:
+                if isinstance(item, dict):
+                    yield item
+                elif count_skipped:
+                    self.metrics.skip("not_a_dict")
+
+    @staticmethod
+    def collect_headers(items, sample=None, flattener=None):
+        """Returns the union of item keys (or of flattened column paths) in first-seen order.
+
+        A dict is used as an ordered set, so the discovery is linear in the total number of keys.
+        If sample is given, only the first sample items are inspected.
+        """
+        headers = {}
+        if flattener is None:
+            for item in islice(items, sample):
+                headers.update(dict.fromkeys(item))
+            return list(headers)
+
+        seen = None
+        for item in islice(items, sample):
+            columns = flattener.columns(item)
+            if columns is not seen:  # items of one shape share their columns
+                headers.update(dict.fromkeys(columns))
+                seen = columns
+        return list(headers)
+
+    def schema_cache_path(self):
+        return self.file.with_name(self.file.name + ".schema.json")
+
+    def load_cached_headers(self, sample=None, flatten=False):
+        """Returns headers from the sidecar schema cache or None if it is missing or outdated."""
+        try:
+            stat = self.file.stat()
+            with open(self.schema_cache_path(), 'r', encoding='utf-8') as cache_file:
+                cache = json.load(cache_file)
+            if (cache["size"], cache["mtime_ns"], cache["sample"], cache.get("flatten", False)) == (
+                    stat.st_size, stat.st_mtime_ns, sample, flatten):
+                return cache["headers"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.debug(f"Schema cache is not used: {e}")
+        return None
+
+    def save_cached_headers(self, headers, sample=None, flatten=False):
+        stat = self.file.stat()
+        cache = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sample": sample, "flatten": flatten,
+                 "headers": headers}
+        try:
+            with open(self.schema_cache_path(), 'w', encoding='utf-8') as cache_file:
+                json.dump(cache, cache_file, ensure_ascii=False)
+        except OSError as e:
+            logging.error(f"Cannot write schema cache: {e}. Path: {self.schema_cache_path()}")
+
+    def discover_headers(self, items, sample=None, schema_cache=False, flattener=None):
+        flatten = flattener is not None
+        if schema_cache:
+            headers = self.load_cached_headers(sample, flatten)
+            if headers is not None:
+                return headers
+
+        headers = CsvJsonConverter.collect_headers(items, sample, flattener)
+        if schema_cache:
+            self.save_cached_headers(headers, sample, flatten)
+        return headers
+
+    def iter_csv_rows(self):
+        """Yields CSV rows one by one without keeping them in memory."""
+        with open_file(self.file, 'r', newline='', encoding='utf-8') as csv_file:
+            reader = csv.DictReader(csv_file, delimiter=',', skipinitialspace=self.skipinitialspace)
+            for row in reader:
+                yield row
+
+    @staticmethod
+    def count_rows(rows, stage):
+        """Passes rows through and counts them in the metrics stage."""
+        for row in rows:
+            stage.rows += 1
+            yield row
+
+    @staticmethod
+    def stream_to_json(rows, json_file, backend=None, compact=False):
+        """Writes rows as a JSON array item by item.
+
+        The output is identical to json.dump(list(rows), json_file, ensure_ascii=False, indent=4)
+        or, with compact=True, to the same call with separators=(",", ":") instead of indent, but
+        only one row is held in memory at a time. backend is a serializer from json_backends.py,
+        the standard library's by default.
+        """
+        backend = backend or get_backend("json")
+        json_file.write("[")
+        empty = True
+        if compact:
+            for row in rows:
+                json_file.write(backend.compact(row) if empty else "," + backend.compact(row))
+                empty = False
+            json_file.write("]")
+            return
+
+        for row in rows:
+            item = backend.pretty(row)
+            json_file.write("\n" if empty else ",\n")
+            json_file.write("    " + item.replace("\n", "\n    "))
+            empty = False
+        json_file.write("]" if empty else "\n]")
 
     @staticmethod
     def create_directory(path):
@@ -136,10 +461,13 @@ class CsvJsonConverter:
 
     @staticmethod
     def suffix_file(file):
+        file = str(split_compression_suffix(file)[0])
         if file.endswith(".csv"):
             return ".csv"
         elif file.endswith(".json"):
             return ".json"
+        elif file.endswith(NDJSON_SUFFIXES):
+            return ".jsonl"
 
     @staticmethod
     def printing_info():
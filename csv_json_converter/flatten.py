@@ -0,0 +1,206 @@
+SEPARATOR = "."
+CONTAINERS = frozenset((dict, list))
+
+# Compiled plans are kept for at most this many record shapes in total and per set of top-level
+# keys (e.g. lists of varying length make many shapes), other records are flattened one by one.
+MAX_PLANS = 4096
+MAX_PLANS_PER_KEYS = 16
+
+# Plans know the column names of the first items of every list, longer lists are walked.
+LIST_COLUMNS = 64
+
+
+class ColumnCollision(ValueError):
+    """Two values of a record flatten into the same column, e.g. {"a.b": 1, "a": {"b": 2}}."""
+
+    def __init__(self, column):
+        super().__init__(f"More than one value of a record flattens into the column '{column}'.")
+        self.column = column
+
+
+def flatten_record(record, separator=SEPARATOR):
+    """Flattens nested dicts and lists of a record into one dict with dotted column paths.
+
+    {"user": {"name": "Ann", "tags": ["a", "b"]}} becomes
+    {"user.name": "Ann", "user.tags.0": "a", "user.tags.1": "b"}. Empty dicts and lists are
+    kept as values. Only dicts and lists (as made by the json module) are flattened. Raises
+    ColumnCollision if two values get the same column path instead of dropping one of them.
+    """
+    flat = {}
+    _walk(record.items(), "", flat, separator)
+    return flat
+
+
+def _walk(items, prefix, flat, separator):
+    for key, value in items:
+        column = f"{prefix}{key}"
+        if value.__class__ is dict and value:
+            _walk(value.items(), column + separator, flat, separator)
+        elif value.__class__ is list and value:
+            _walk(enumerate(value), column + separator, flat, separator)
+        elif column in flat:
+            raise ColumnCollision(column)
+        else:
+            flat[column] = value
+
+
+def _flat_plan(record):
+    return record if CONTAINERS.isdisjoint(map(type, record.values())) else None
+
+
+def compile_plan(record, separator=SEPARATOR):
+    """Compiles a function which flattens every record of the same shape as record.
+
+    The shape is the nesting of the dicts of a record: the function reads the plain values
+    straight from their paths and returns the flat dict, or None if a record does not have the
+    shape (a nested dict with other keys or a container where the shape has a plain value). The
+    keys of nested dicts have to come in the same order, so the columns of the flat dict are
+    always in the order of the record, as in flatten_record(). Lists can have any length, their
+    items are flattened with the record. The column paths (without list items) are in the
+    columns attribute of the function. Records without nested values need no plan and are
+    returned as they are.
+
+    Raises ColumnCollision if two values of the shape get the same column path. If a list could
+    get the path of another value (e.g. {"a": [1], "a.0": 2}, or {"a.b": [], "a": {"b": 1}} with
+    an empty list), every record of the shape is flattened by flatten_record(), which checks
+    every path.
+    """
+    if CONTAINERS.isdisjoint(map(type, record.values())):
+        return _flat_plan
+
+    lines = []
+    scalars = []
+    columns = []
+    output = []  # ("value", column, name) and ("list", column, name) in column order
+
+    def visit(variable, items, prefix):
+        for key, value in items:
+            name = f"v{len(lines)}"
+            lines.append(f"{name} = {variable}[{key!r}]")
+            column = f"{prefix}{key}"
+            if value.__class__ is dict and value:
+                lines.append(f"if {name}.__class__ is not dict or tuple({name}) != {tuple(value)!r}: return None")
+                visit(name, value.items(), column + separator)
+            elif value.__class__ is list:
+                lines.append(f"if {name}.__class__ is not list: return None")
+                output.append(("list", column, name))
+            else:
+                if value.__class__ is dict:
+                    lines.append(f"if {name}.__class__ is not dict or {name}: return None")
+                else:
+                    scalars.append(name)
+                columns.append(column)
+                output.append(("value", column, name))
+
+    visit("record", record.items(), "")
+    duplicate = _first_duplicate(columns)
+    if duplicate is not None:
+        raise ColumnCollision(duplicate)
+    list_prefixes = tuple(column + separator for kind, column, _ in output if kind == "list")
+    if list_prefixes and (_first_duplicate(column for _, column, _ in output) is not None
+                          or any(column.startswith(list_prefixes) for _, column, _ in output)):
+        return _walk_plan(separator)
+    namespace = {"CONTAINERS": CONTAINERS, "_walk": _walk}
+    tail = [f"if not CONTAINERS.isdisjoint(map(type, ({''.join(f'{name}, ' for name in scalars)}))): return None",
+            "flat = {}"]
+    for kind, column, name in output:
+        if kind == "value":
+            tail.append(f"flat[{column!r}] = {name}")
+        else:
+            # Plain values of a list are added under column names made once with the plan.
+            namespace[f"c{name}"] = tuple(f"{column}{separator}{i}" for i in range(LIST_COLUMNS))
+            tail.append(f"if not {name}: flat[{column!r}] = {name}")
+            tail.append(f"elif len({name}) <= {LIST_COLUMNS} and CONTAINERS.isdisjoint(map(type, {name})): "
+                        f"flat.update(zip(c{name}, {name}))")
+            tail.append(f"else: _walk(enumerate({name}), {column + separator!r}, flat, {separator!r})")
+    tail.append("return flat")
+
+    source = "\n".join([
+        "def plan(record):",
+        "    try:",
+        *(f"        {line}" for line in lines),
+        "    except KeyError:",
+        "        return None",
+        *(f"    {line}" for line in tail),
+    ])
+    exec(source, namespace)
+    plan = namespace["plan"]
+    plan.columns = tuple(columns)
+    plan.has_lists = any(kind == "list" for kind, _, _ in output)
+    return plan
+
+
+def _first_duplicate(columns):
+    seen = set()
+    for column in columns:
+        if column in seen:
+            return column
+        seen.add(column)
+    return None
+
+
+def _walk_plan(separator):
+    """A plan which flattens every record with flatten_record()."""
+    def plan(record):
+        return flatten_record(record, separator)
+    plan.columns = ()
+    plan.has_lists = True
+    return plan
+
+
+class Flattener:
+    """Flattens records into dotted column paths with one compiled plan per record shape.
+
+    Plans are looked up by the top-level keys of a record, so a record of a known shape is
+    flattened by one call of its plan, without walking the record to find its shape again.
+    A file with a few recurring shapes compiles a few plans and flattens every other record
+    with them. Records of new shapes beyond the limits are flattened with flatten_record().
+
+    Usage:
+        flattener = Flattener()
+        rows = map(flattener.flatten, records)
+    """
+
+    def __init__(self, separator=SEPARATOR):
+        self.separator = separator
+        self.plans = {}
+        self.plan_count = 0
+
+    def flatten(self, record):
+        plans = self.plans.get(tuple(record))
+        if plans is not None:
+            flat = plans[0](record)
+            if flat is not None:
+                return flat
+        plan = self.plan(record, plans, tried=1)
+        return plan(record) if plan is not None else flatten_record(record, self.separator)
+
+    def columns(self, record):
+        """Returns the column paths of a record (used to discover the CSV headers).
+
+        Records of one shape without lists share the same tuple of columns.
+        """
+        plan = self.plan(record, self.plans.get(tuple(record)))
+        if plan is None:
+            return tuple(flatten_record(record, self.separator))
+        if plan is _flat_plan or plan.has_lists:
+            return tuple(plan(record))
+        return plan.columns
+
+    def plan(self, record, plans, tried=0):
+        """Returns the plan of a record, compiling a new one for a new shape, or None if there
+        are too many plans. The first tried plans of the same keys are known not to match, the
+        most recently matched plan is moved to the front."""
+        if plans is not None:
+            for i in range(tried, len(plans)):
+                if plans[i](record) is not None:
+                    if i:
+                        plans.insert(0, plans.pop(i))
+                    return plans[0]
+
+        if self.plan_count >= MAX_PLANS or (plans is not None and len(plans) >= MAX_PLANS_PER_KEYS):
+            return None
+        plan = compile_plan(record, self.separator)
+        self.plans.setdefault(tuple(record), []).insert(0, plan)
+        self.plan_count += 1
+        return plan
@@ -0,0 +1,126 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library is used instead
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # optional, the standard library is used instead
+    ujson = None
+
+
+# Backends from the fastest, the first installed one is used by default.
+PREFERRED_BACKENDS = ("orjson", "ujson", "json")
+
+BACKENDS = {}
+
+# Every leading space of an orjson line is indentation, because JSON strings cannot contain newlines.
+LEADING_SPACES = re.compile(r"^ +", re.MULTILINE)
+
+
+def register_backend(backend_class):
+    """Adds a backend class to the registry under its name (usable as a class decorator)."""
+    BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+
+@register_backend
+class JsonBackend:
+    """Serializer of the standard library json module and the base class of the other backends.
+
+    Every backend writes exactly the text of the standard library:
+        pretty(value) == json.dumps(value, ensure_ascii=False, indent=4)
+        compact(value) == json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    for strings, integers, booleans, None, lists and dicts, which is all a CSV file converts to.
+    Only floats in exponent notation may be spelled differently by a fast backend (1e+16 / 1e16).
+    Values a fast backend cannot serialize (e.g. integers over 64 bits) are passed to the
+    standard library.
+    """
+
+    name = "json"
+
+    def __init__(self):
+        # json.dumps() would make a new encoder for every row.
+        self.pretty_encoder = json.JSONEncoder(ensure_ascii=False, indent=4)
+        self.compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def available():
+        return True
+
+    def pretty(self, value):
+        return self.pretty_encoder.encode(value)
+
+    def compact(self, value):
+        return self.compact_encoder.encode(value)
+
+
+@register_backend
+class OrjsonBackend(JsonBackend):
+    name = "orjson"
+
+    @staticmethod
+    def available():
+        return orjson is not None
+
+    def pretty(self, value):
+        try:
+            text = orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            return super().pretty(value)
+        # orjson indents by 2 spaces only. Flat rows have one level, which a single replace doubles.
+        if "\n    " not in text:
+            return text.replace("\n  ", "\n    ")
+        return LEADING_SPACES.sub(lambda match: match.group() * 2, text)
+
+    def compact(self, value):
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            return super().compact(value)
+
+
+@register_backend
+class UjsonBackend(JsonBackend):
+    """ujson writes the compact form, its indented layout differs from the standard library,
+    so pretty() is the standard library's."""
+
+    name = "ujson"
+
+    @staticmethod
+    def available():
+        return ujson is not None
+
+    def compact(self, value):
+        # ujson turns None keys into "None" instead of "null".
+        if isinstance(value, dict) and not all(key.__class__ is str for key in value):
+            return super().compact(value)
+        try:
+            return ujson.dumps(value, ensure_ascii=False, escape_forward_slashes=False)
+        except (TypeError, ValueError, OverflowError):
+            return super().compact(value)
+
+
+def available_backends():
+    """Returns the names of the installed backends, the fastest first."""
+    names = [name for name in PREFERRED_BACKENDS if name in BACKENDS]
+    names += [name for name in BACKENDS if name not in names]
+    return [name for name in names if BACKENDS[name].available()]
+
+
+def get_backend(name=None):
+    """Returns the backend called name, or the fastest installed one if name is None or 'auto'.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    if name is None or name == "auto":
+        return BACKENDS[available_backends()[0]]()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}'. Choose one of: {', '.join(BACKENDS)}.")
+    if not BACKENDS[name].available():
+        raise ValueError(f"JSON backend '{name}' is not installed.")
+    return BACKENDS[name]()
@@ -1,18 +1,32 @@
-from converter import CsvJsonConverter
+import os
+import sys
+
+# The tool is run from its own directory, the common package is in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from converter import CsvJsonConverter, configure_logging  # noqa: E402
+from common.columnar import COLUMNAR_SUFFIX  # noqa: E402
 
 
 def main():
+    configure_logging()
     CsvJsonConverter.printing_info()
     file = input("Enter the name of the file which you want to convert: ").lower().strip()
     converting_file = CsvJsonConverter(file)
 
     try:
-        if CsvJsonConverter.suffix_file(file) == ".json":
-            filename = input("Enter the name of the CSV converted file: ").strip()
-            converting_file.convert_to_csv(filename)
+        if CsvJsonConverter.suffix_file(file) in (".json", ".jsonl"):
+            filename = input("Enter the name of the CSV converted file (or *.col for a columnar snapshot): ").strip()
+            if filename.endswith(COLUMNAR_SUFFIX):
+                converting_file.convert_to_columnar(filename, stream=True)
+            else:
+                converting_file.convert_to_csv(filename, stream=True)
         elif CsvJsonConverter.suffix_file(file) == ".csv":
-            filename = input("Enter the name of the JSON converted file: ").strip()
-            converting_file.convert_to_json(filename)
+            filename = input("Enter the name of the JSON converted file (or *.col for a columnar snapshot): ").strip()
+            if filename.endswith(COLUMNAR_SUFFIX):
+                converting_file.convert_to_columnar(filename, stream=True)
+            else:
+                converting_file.convert_to_json(filename, stream=True)
     except AttributeError:
         print("You entered an invalid file format. Please try again.")
 
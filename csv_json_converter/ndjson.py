@@ -0,0 +1,83 @@
+import json
+import os
+
+
+NDJSON_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def is_ndjson(path):
+    return str(path).lower().endswith(NDJSON_SUFFIXES)
+
+
+def iter_ndjson(json_file):
+    """Yields the records of a JSON Lines file one by one. Blank lines are skipped.
+
+    Raises:
+        json.JSONDecodeError: If a line is not a valid JSON value.
+    """
+    for line in json_file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def write_ndjson(rows, json_file, dumps=None):
+    """Writes every row as one compact JSON value per line.
+
+    dumps turns a row into its line, json.dumps(row, ensure_ascii=False) by default.
+    """
+    for row in rows:
+        json_file.write(dumps(row) if dumps is not None else json.dumps(row, ensure_ascii=False))
+        json_file.write("\n")
+
+
+def chunk_offsets(path, chunks):
+    """Splits a file into at most chunks byte ranges which start right after a newline.
+
+    Returns:
+        A list of (start, end) tuples which cover the whole file.
+    """
+    size = os.path.getsize(path)
+    chunks = max(1, min(chunks, size))
+    offsets = [0]
+    with open(path, 'rb') as file:
+        for i in range(1, chunks):
+            position = max(size * i // chunks, offsets[-1])
+            file.seek(position)
+            file.readline()
+            position = file.tell()
+            if position >= size:
+                break
+            if position > offsets[-1]:
+                offsets.append(position)
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def parse_chunk(path, start, end):
+    """Parses the lines inside the byte range [start, end) of a JSON Lines file."""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return [json.loads(line) for line in data.split(b"\n") if line.strip()]
+
+
+def parse_ndjson_parallel(path, workers=None):
+    """Parses a JSON Lines file with several worker processes.
+
+    The file is split at newline byte offsets, every worker parses its own range and the
+    records are returned in file order.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = chunk_offsets(path, workers)
+    if len(ranges) == 1:
+        return parse_chunk(path, *ranges[0])
+
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing is slow to import, only workers need it
+
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        parts = executor.map(parse_chunk, [path] * len(ranges), *zip(*ranges))
+        records = []
+        for part in parts:
+            records.extend(part)
+        return records
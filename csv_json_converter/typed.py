@@ -0,0 +1,235 @@
+import re
+from collections import Counter
+from itertools import chain, islice
+from math import inf
+from operator import itemgetter
+
+
+DEFAULT_TYPE_SAMPLE = 1000
+BATCH_SIZE = 10_000
+DEFAULT_SAMPLES = 5
+
+BOOLEANS = {"true": True, "True": True, "TRUE": True, "false": False, "False": False, "FALSE": False}
+
+
+# Digits 2-9 become '1', so the text of a batch shows leading zeros as '00' or '01'.
+SHAPES = str.maketrans("23456789", "11111111")
+LEADING_ZEROS = ("\n00", "\n01", "\n-00", "\n-01", "\n+00", "\n+01")
+
+
+class ColumnConverter:
+    """Converts the values of a column of one type, a whole batch of values at a time.
+
+    The values of a batch are joined into one text with a line per value. If the text has no
+    characters other than those of the type and no leading zeros, all values are parsed by one
+    map() of the type's parse function, which rejects what is left (e.g. '1-2'). Otherwise, the
+    values which do not fit are found by a scan of a regular expression over the text. The
+    pattern is the exact set of texts of the type, it is also used to infer the types.
+    """
+
+    def __init__(self, kind, pattern, parse, characters=None):
+        self.kind = kind
+        self.pattern = re.compile(pattern)
+        # Non-empty lines which are not a value of the type.
+        self.mismatch = re.compile(rf"^(?!(?:{pattern})?$).+$", re.MULTILINE)
+        self.parse = parse
+        self.characters = str.maketrans("", "", "01\n" + characters) if characters is not None else None
+
+    def fits(self, text):
+        if self.pattern.fullmatch(text) is None:
+            return False
+        try:
+            return self.parse(text) not in (inf, -inf)
+        except ValueError:  # e.g. an int longer than the digit limit of int()
+            return False
+
+    def plain(self, text):
+        """Whether text only has characters of the type and no leading zeros."""
+        if self.characters is None:
+            return True
+        shape = ("\n" + text).translate(SHAPES)
+        return not shape.translate(self.characters) and not any(zeros in shape for zeros in LEADING_ZEROS)
+
+    def convert(self, values):
+        """Returns the converted values (None for empty ones) and the positions of the values
+        which do not fit, these are returned as they are."""
+        if None in values:
+            values = [value or "" for value in values]
+        text = "\n".join(values)
+        lines = text.count("\n") == len(values) - 1  # no value has a line break
+        converted = None
+        bad = []
+        if lines and self.plain(text):
+            try:
+                converted = self._parse_all(values)
+            except (ValueError, KeyError):
+                pass
+
+        if converted is None:
+            if lines:
+                bad = list(_line_numbers(text, (match.start() for match in self.mismatch.finditer(text))))
+            else:
+                bad = [i for i, value in enumerate(values) if value and not self.pattern.fullmatch(value)]
+            kept = [values[i] for i in bad]
+            values = values.copy()
+            for i in bad:
+                values[i] = ""
+            try:
+                converted = self._parse_all(values)
+                unparsed = []
+            except ValueError:
+                converted, unparsed = self._parse_each(values)
+            for i, value in zip(bad, kept):
+                converted[i] = values[i] = value
+            if unparsed:
+                bad = sorted(bad + unparsed)
+
+        # Floats out of range ('1e400') are infinite, which is not a JSON number.
+        if inf in converted or -inf in converted:
+            for i, value in enumerate(converted):
+                if value in (inf, -inf):
+                    converted[i] = values[i]
+                    bad.append(i)
+            bad.sort()
+        return converted, bad
+
+    def _parse_all(self, values):
+        if "" not in values:
+            return list(map(self.parse, values))
+        parsed = iter(list(map(self.parse, filter(None, values))))
+        return [next(parsed) if value else None for value in values]
+
+    def _parse_each(self, values):
+        """Parses the values one by one. Texts of the type which parse rejects anyway (e.g. ints
+        longer than the digit limit of int(), see sys.set_int_max_str_digits) are kept as they
+        are. Returns the converted values and their positions."""
+        converted = []
+        unparsed = []
+        for i, value in enumerate(values):
+            try:
+                converted.append(self.parse(value) if value else None)
+            except ValueError:
+                converted.append(value)
+                unparsed.append(i)
+        return converted, unparsed
+
+
+def _line_numbers(text, offsets):
+    """Turns increasing offsets in text into line numbers."""
+    line = last = 0
+    for offset in offsets:
+        line += text.count("\n", last, offset)
+        last = offset
+        yield line
+
+
+# Codes with leading zeros ('007', '01.5'), 'nan', 'inf' or '1_000' stay strings.
+CONVERTERS = {
+    "int": ColumnConverter("int", r"-?(?:0|[1-9][0-9]*)", int, "-"),
+    "float": ColumnConverter("float", r"[+-]?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?",
+                             float, ".-+eE"),
+    "bool": ColumnConverter("bool", "|".join(BOOLEANS), BOOLEANS.__getitem__),
+}
+
+
+def infer_types(rows, fieldnames):
+    """Returns {column: 'int' | 'float' | 'bool' | 'str'} for the sample rows.
+
+    A column is an int column if all its non-empty values are integers as str(int) writes them,
+    a float column if they are decimal numbers (integers included), a bool column if they are
+    true/false and a str column otherwise or if it has no values in the sample.
+    """
+    types = {}
+    for name in dict.fromkeys(fieldnames):
+        values = [value for value in map(itemgetter(name), rows) if value]
+        types[name] = "str"
+        if values and all(isinstance(value, str) for value in values):
+            for kind, converter in CONVERTERS.items():
+                if all(map(converter.fits, values)):
+                    types[name] = kind
+                    break
+    return types
+
+
+class TypeMismatches:
+    """Values which did not fit the inferred type of their column, counted per column, with
+    the first few samples of every column. The values are kept as strings."""
+
+    def __init__(self, samples=DEFAULT_SAMPLES):
+        self.limit = samples
+        self.counts = Counter()
+        self.samples = {}
+
+    def add(self, column, kind, index, value):
+        key = f"{column} ({kind})"
+        count = self.counts[key] + 1
+        self.counts[key] = count
+        if count <= self.limit:
+            self.samples.setdefault(key, []).append((index, value))
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def __len__(self):
+        return self.total
+
+    def summary(self):
+        lines = [f"{self.total} values did not fit the inferred column types and were kept as strings: "
+                 + ", ".join(f"{key}={count}" for key, count in self.counts.items())]
+        for key, samples in self.samples.items():
+            lines.append(f"  {key}: " + ", ".join(f"row {index} {value!r}" for index, value in samples))
+        return "\n".join(lines)
+
+
+class TypedRows:
+    """Converts dict rows of a CSV file to the types inferred from the first sample rows.
+
+    The types are inferred once from a bounded sample, then every column is converted by the
+    converter of its type (see ColumnConverter), a batch of rows at a time. Empty and missing
+    values of typed columns become None. Values which do not fit the type of their column are
+    kept as strings and counted in mismatches instead of raising.
+
+    Usage:
+        typed = TypedRows(sample=1000)
+        for row in typed.convert(rows, fieldnames):
+            ...
+        if typed.mismatches:
+            logging.warning(typed.mismatches.summary())
+    """
+
+    def __init__(self, sample=DEFAULT_TYPE_SAMPLE, batch_size=BATCH_SIZE):
+        self.sample = sample
+        self.batch_size = batch_size
+        self.types = {}
+        self.mismatches = TypeMismatches()
+
+    def convert(self, rows, fieldnames=None):
+        """Yields the rows (dicts, which are changed in place) with typed values.
+
+        fieldnames are the CSV header, by default the keys of the first row.
+        """
+        rows = iter(rows)
+        sample = list(islice(rows, self.sample))
+        if not sample:
+            return
+        if fieldnames is None:
+            fieldnames = [key for key in sample[0] if key is not None]
+        self.types = infer_types(sample, fieldnames)
+        columns = [(name, CONVERTERS[kind]) for name, kind in self.types.items() if kind != "str"]
+
+        index = 0
+        rows = chain(sample, rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            for name, converter in columns:
+                values = list(map(itemgetter(name), batch))
+                converted, bad = converter.convert(values)
+                for i in bad:
+                    self.mismatches.add(name, converter.kind, index + i, values[i])
+                for row, value in zip(batch, converted):
+                    row[name] = value
+            yield from batch
+            index += len(batch)
@@ -0,0 +1,146 @@
+"""Runs the tasks without prompts and prints the results as JSON.
+
+Usage:
+    python cli.py task1 --subject python --subject sql
+    python cli.py task2 --workers 4
+    python cli.py task2 --incremental
+    python cli.py task3 --strategy merge
+    python cli.py sales --start 2024-01-01 --end 2024-03-31 --item "Item 1" --top 5
+
+The report has the results of the run, the lines the task printed and its metrics. The exit
+status is 0 if the task produced its results and 1 otherwise. Only the modules of the chosen
+command are imported, so a run starts quickly (see benchmarks/bench_startup.py).
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+from contextlib import redirect_stdout
+
+# The tool is run from its own directory, the common package is in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+LOG_FILE = "logfile.log"
+
+
+def configure_logging(filename=LOG_FILE):
+    """Writes the log of the tasks to a file. Called by the entry points (main.py and this
+    module), importing the tasks does not configure logging."""
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s - %(levelname)s - [%(name)s] - %(message)s",
+                        filename=filename
+                        )
+
+
+def run_task1(args, cache):
+    from task1 import task1
+    return task1(subjects=args.subject, cache=cache, persist_index=args.index_file)
+
+
+def run_task2(args, cache):
+    from task2 import task2
+    return task2(workers=args.workers, backend=args.backend, cache=cache, incremental=args.incremental)
+
+
+def run_task3(args, cache):
+    from task3 import task3, DEFAULT_MEMORY_BUDGET
+    return task3(strategy=args.strategy, memory_budget=args.memory_budget or DEFAULT_MEMORY_BUDGET, cache=cache)
+
+
+def run_sales(args, cache):
+    """Answers a date-range query from the sales cube (see sales_cube.py)."""
+    from pathlib import Path
+    from common.compression import find_input
+    from common.metrics import PipelineMetrics
+    from sales_cube import load_cube
+
+    metrics = PipelineMetrics("sales")
+    with metrics.stage("load") as stage:
+        cube = load_cube(find_input(Path(args.file)))
+        stage.rows = cube.row_count
+    with metrics.stage("query"):
+        items = args.item or None
+        metrics.results = {
+            "start": args.start,
+            "end": args.end,
+            "items": items,
+            "total": cube.total(args.start, args.end, items),
+            "monthly_totals": cube.monthly_totals(args.start, args.end, items),
+            "top_items": [{"item": item, "total": total}
+                          for item, total in cube.top_items(args.top, args.start, args.end)],
+        }
+    return metrics
+
+
+def run(args):
+    """Runs the command of the parsed arguments and returns its report."""
+    cache = None
+    if args.cache_dir is not None:
+        from dataset_cache import DatasetCache
+        cache = DatasetCache(snapshot_dir=args.cache_dir)
+
+    messages = io.StringIO()
+    with redirect_stdout(messages):
+        metrics = args.handler(args, cache)
+    return {
+        "command": args.command,
+        "ok": bool(metrics.results),
+        "results": metrics.results,
+        "messages": [line.strip() for line in messages.getvalue().splitlines() if line.strip()],
+        "metrics": metrics.to_dict(),
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Runs the JSON & CSV tasks without prompts and prints JSON results.")
+    parser.add_argument("--data-dir", default=".", help="directory with the input files")
+    parser.add_argument("--cache-dir", default=None, help="directory for snapshots of the parsed datasets")
+    parser.add_argument("--log-file", default=LOG_FILE, help="log file of the tasks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    task1 = commands.add_parser("task1", help="students statistics (students.json)")
+    task1.add_argument("--subject", action="append", default=[], help="subject to count the students of (repeatable)")
+    task1.add_argument("--index-file", action=argparse.BooleanOptionalAction, default=None,
+                       help="save the subject index next to students.json (by default only if its directory is writable)")
+    task1.set_defaults(handler=run_task1)
+
+    task2 = commands.add_parser("task2", help="sales statistics (sales.csv)")
+    task2.add_argument("-j", "--workers", type=int, default=1, help="number of worker processes")
+    task2.add_argument("--backend", choices=["python", "numpy"], default="python", help="aggregation backend")
+    task2.add_argument("--incremental", action="store_true",
+                       help="read only the rows appended since the previous incremental run")
+    task2.set_defaults(handler=run_task2)
+
+    task3 = commands.add_parser("task3", help="employee performance (employees.json + performance.csv)")
+    task3.add_argument("--strategy", choices=["hash", "merge"], default="hash", help="join strategy")
+    task3.add_argument("--memory-budget", type=int, default=None, help="build rows kept in memory by the hash join")
+    task3.set_defaults(handler=run_task3)
+
+    sales = commands.add_parser("sales", help="date-range and item queries of the sales cube")
+    sales.add_argument("--file", default="sales.csv", help="sales CSV file")
+    sales.add_argument("--start", default=None, help="first day (YYYY-MM-DD), open if not given")
+    sales.add_argument("--end", default=None, help="last day (YYYY-MM-DD), open if not given")
+    sales.add_argument("--item", action="append", default=[], help="item to count the sales of (repeatable)")
+    sales.add_argument("--top", type=int, default=5, help="number of top items of the range")
+    sales.set_defaults(handler=run_sales)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging(os.path.abspath(args.log_file))
+    os.chdir(args.data_dir)
+
+    try:
+        report = run(args)
+    except (OSError, ValueError) as e:
+        report = {"command": args.command, "ok": False, "error": f"{e}"}
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
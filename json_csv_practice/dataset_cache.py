@@ -0,0 +1,156 @@
+import marshal
+import sys
+from collections import OrderedDict
+from hashlib import sha256
+from json import load
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable
+
+from common.compression import open_file
+from common.records import RecordReader, pack_records, unpack_records
+
+
+logger = getLogger("dataset_cache")
+
+SNAPSHOT_VERSION = 2
+# The marshal format may change between Python versions, so snapshots are keyed by both.
+SNAPSHOT_FORMAT = (SNAPSHOT_VERSION, marshal.version, *sys.version_info[:2])
+
+
+def parse_json(file_path: Path) -> Any:
+    with open_file(file_path, encoding="utf-8") as file:
+        return load(file)
+
+
+def parse_csv(file_path: Path) -> list:
+    """Returns the rows as records (see common/records.py), which take about a third less memory than dicts."""
+    with open_file(file_path, encoding="utf-8") as file:
+        return list(RecordReader(file, skipinitialspace=True))
+
+
+class DatasetCache:
+    """Cache of parsed JSON and CSV datasets shared between task runs.
+
+    Datasets are keyed by the resolved path plus the file size and mtime or, with
+    content_hash=True, by the SHA-256 digest of the file, so a changed file is always parsed
+    again. Parsed data is kept in an in-process LRU limited by the number of entries and by the
+    total size of the source files. If snapshot_dir is set, every parsed dataset is also saved
+    there as a marshal snapshot, so a restarted program skips JSON/CSV parsing too. Only the
+    snapshot of the latest version of every file is kept. Snapshots are only read by the Python
+    version which wrote them.
+
+    The cached objects are shared between callers and must not be modified.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 8,
+            max_bytes: int | None = None,
+            snapshot_dir: str | Path | None = None,
+            content_hash: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir is not None else None
+        self.content_hash = content_hash
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def load_json(self, file_path: str | Path) -> Any:
+        return self.load(file_path, "json", parse_json)
+
+    def load_csv(self, file_path: str | Path) -> list:
+        return self.load(file_path, "csv", parse_csv)
+
+    def load(self, file_path: str | Path, kind: str, parser: Callable[[Path], Any]) -> Any:
+        """Returns the parsed dataset from memory, from a snapshot or by calling parser(file_path).
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            Any exception raised by the parser.
+        """
+        file_path = Path(file_path)
+        key = self.key(file_path, kind)
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+        self.misses += 1
+        data = self.read_snapshot(key, file_path)
+        if data is None:
+            data = parser(file_path)
+            self.write_snapshot(key, file_path, data)
+
+        self.store(key, data, file_path.stat().st_size)
+        return data
+
+    def key(self, file_path: Path, kind: str) -> tuple:
+        stat = file_path.stat()
+        if self.content_hash:
+            digest = sha256()
+            with file_path.open("rb") as file:
+                for block in iter(lambda: file.read(1024 * 1024), b""):
+                    digest.update(block)
+            return kind, digest.hexdigest()
+        return kind, str(file_path.resolve()), stat.st_size, stat.st_mtime_ns
+
+    def store(self, key: tuple, data: Any, size: int) -> None:
+        self.entries[key] = (data, size)
+        self.total_bytes += size
+        while self.entries and (
+                len(self.entries) > self.max_entries
+                or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def snapshot_path(self, key: tuple, file_path: Path) -> Path:
+        """Returns the snapshot file of a dataset. Its name starts with the hash of the source
+        file, so the snapshots of older versions of the file can be found and deleted."""
+        name = sha256(repr((SNAPSHOT_FORMAT, key)).encode("utf-8")).hexdigest()
+        return self.snapshot_dir / f"{_source_name(key[0], file_path)}-{name}.marshal"
+
+    def read_snapshot(self, key: tuple, file_path: Path) -> Any:
+        if self.snapshot_dir is None:
+            return None
+        try:
+            with self.snapshot_path(key, file_path).open("rb") as file:
+                version, snapshot_key, data = marshal.load(file)
+            if version == SNAPSHOT_FORMAT and snapshot_key == list(key):
+                return unpack_records(data) if key[0] == "csv" else data
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring broken snapshot for {key}: {e}")
+        return None
+
+    def write_snapshot(self, key: tuple, file_path: Path, data: Any) -> None:
+        """Saves the snapshot of a dataset and deletes the snapshots of older versions of the file."""
+        if self.snapshot_dir is None:
+            return
+        path = self.snapshot_path(key, file_path)
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            temporary_path = path.with_suffix(".tmp")
+            with temporary_path.open("wb") as file:
+                # marshal cannot save records, CSV rows are saved as (fields, values) tuples.
+                marshal.dump((SNAPSHOT_FORMAT, list(key), pack_records(data) if key[0] == "csv" else data), file)
+            temporary_path.replace(path)
+            for old_path in self.snapshot_dir.glob(f"{_source_name(key[0], file_path)}-*.marshal"):
+                if old_path != path:
+                    old_path.unlink(missing_ok=True)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot write snapshot '{path}': {e}")
+
+
+def _source_name(kind: str, file_path: Path) -> str:
+    return sha256(repr((kind, str(file_path.resolve()))).encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,121 @@
+from pathlib import Path
+from pickle import dump, load, HIGHEST_PROTOCOL
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Iterable, Iterator
+
+
+DEFAULT_MEMORY_BUDGET = 1_000_000
+DEFAULT_PARTITIONS = 16
+
+
+def hash_join(
+        build: Iterable,
+        probe: Iterable,
+        build_key: Callable[[Any], Any],
+        probe_key: Callable[[Any], Any],
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        partitions: int = DEFAULT_PARTITIONS,
+) -> Iterator[tuple[Any, Any]]:
+    """Joins two row streams on a key and yields (build_row, probe_row) for every match.
+
+    A hash table is built on the build side (which should be the smaller one) and the probe
+    side is streamed through it. Build keys must be unique. If the build side has more than
+    memory_budget rows, both sides are partitioned by key hash into temporary files (grace hash
+    join) and every partition is joined on its own, so at most one partition of the build side
+    is kept in memory. In that case matches are not yielded in probe order.
+    """
+    table = {}
+    build_rows = iter(build)
+    for row in build_rows:
+        table[build_key(row)] = row
+        if len(table) > memory_budget:
+            yield from _grace_join(table, build_rows, probe, build_key, probe_key, partitions)
+            return
+
+    for row in probe:
+        match = table.get(probe_key(row))
+        if match is not None:
+            yield match, row
+
+
+def _grace_join(table, build_rows, probe, build_key, probe_key, partitions):
+    with TemporaryDirectory(prefix="hash_join_") as directory:
+        build_paths = [Path(directory) / f"build_{i}.pickle" for i in range(partitions)]
+        probe_paths = [Path(directory) / f"probe_{i}.pickle" for i in range(partitions)]
+
+        _partition(list(table.values()), build_rows, build_key, build_paths)
+        table.clear()
+        _partition([], probe, probe_key, probe_paths)
+
+        for build_path, probe_path in zip(build_paths, probe_paths):
+            partition_table = {build_key(row): row for row in _read_rows(build_path)}
+            for row in _read_rows(probe_path):
+                match = partition_table.get(probe_key(row))
+                if match is not None:
+                    yield match, row
+
+
+def _partition(first_rows, rows, key, paths):
+    files = [path.open("wb") for path in paths]
+    try:
+        for source in (first_rows, rows):
+            for row in source:
+                dump(row, files[hash(key(row)) % len(files)], HIGHEST_PROTOCOL)
+    finally:
+        for file in files:
+            file.close()
+
+
+def _read_rows(path: Path) -> Iterator:
+    with path.open("rb") as file:
+        while True:
+            try:
+                yield load(file)
+            except EOFError:
+                return
+
+
+def merge_join(
+        build: Iterable,
+        probe: Iterable,
+        build_key: Callable[[Any], Any],
+        probe_key: Callable[[Any], Any],
+) -> Iterator[tuple[Any, Any]]:
+    """Joins two row streams which are already sorted by key (sort-merge join).
+
+    Yields (build_row, probe_row) for every match in probe order, keeping only one row of
+    each side in memory. Build keys must be unique. Both sides are read to the end, so the
+    order of every row is checked, also of the build rows after the last probe key.
+
+    Raises:
+        ValueError: If either side is not sorted in ascending key order.
+    """
+    build_rows = iter(build)
+    current = next(build_rows, None)
+    current_key = build_key(current) if current is not None else None
+    previous_probe_key = None
+
+    for row in probe:
+        key = probe_key(row)
+        if previous_probe_key is not None and key < previous_probe_key:
+            raise ValueError(f"Probe side is not sorted by key: {key} after {previous_probe_key}")
+        previous_probe_key = key
+
+        while current is not None and current_key < key:
+            current = next(build_rows, None)
+            if current is not None:
+                next_key = build_key(current)
+                if next_key < current_key:
+                    raise ValueError(f"Build side is not sorted by key: {next_key} after {current_key}")
+                current_key = next_key
+
+        if current is not None and current_key == key:
+            yield current, row
+
+    # The remaining build rows cannot match, but an unsorted build side would have missed matches.
+    if current is not None:
+        for current in build_rows:
+            next_key = build_key(current)
+            if next_key < current_key:
+                raise ValueError(f"Build side is not sorted by key: {next_key} after {current_key}")
+            current_key = next_key
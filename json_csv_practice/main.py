@@ -1,34 +1,48 @@
-from task1 import task1
-from task2 import task2
-from task3 import task3
-import logging
-
-logging.basicConfig(level=logging.INFO,
-                    format="%(asctime)s - %(levelname)s - [%(name)s] - %(message)s",
-                    filename="logfile.log"
-                    )
-
-
-def main():
-    choice = ""
-    while choice != "4":
-        print("\n=== MAIN MENU ===")
-        print("Type '1' to run Task 1 (Students JSON)")
-        print("Type '2' to run Task 2 (Sales CSV)")
-        print("Type '3' to run Task 3 (Employees + Performance)")
-        print("Type '4' to quit")
-        choice = input("Enter your choice: ").strip()
-
-        if choice == "1":
-            task1()
-        elif choice == "2":
-            task2()
-        elif choice == "3":
-            task3()
-        elif choice == "4":
-            print("Thank you for using this program!")
-        else:
-            print("Invalid choice. Please try again.")
+import argparse
+import os
+import sys
+
+# The tool is run from its own directory, the common package is in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task1 import task1  # noqa: E402
+from task2 import task2  # noqa: E402
+from task3 import task3  # noqa: E402
+from dataset_cache import DatasetCache  # noqa: E402
+from common.bad_rows import queued_logging  # noqa: E402
+from cli import configure_logging  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the JSON & CSV tasks from a menu.")
+    parser.add_argument("--cache-dir", default=None,
+                        help="directory for snapshots of the parsed datasets, reused by later runs")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    # Parsed datasets are reused between menu choices and, with --cache-dir, between runs.
+    cache = DatasetCache(snapshot_dir=args.cache_dir)
+    # Log records are written by a background thread, so the tasks do not wait for file I/O.
+    with queued_logging():
+        choice = ""
+        while choice != "4":
+            print("\n=== MAIN MENU ===")
+            print("Type '1' to run Task 1 (Students JSON)")
+            print("Type '2' to run Task 2 (Sales CSV)")
+            print("Type '3' to run Task 3 (Employees + Performance)")
+            print("Type '4' to quit")
+            choice = input("Enter your choice: ").strip()
+
+            if choice == "1":
+                task1(cache=cache)
+            elif choice == "2":
+                task2(cache=cache)
+            elif choice == "3":
+                task3(cache=cache)
+            elif choice == "4":
+                print("Thank you for using this program!")
+            else:
+                print("Invalid choice. Please try again.")
 
 
 if __name__ == "__main__":
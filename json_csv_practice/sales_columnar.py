@@ -0,0 +1,290 @@
+from collections import defaultdict
+from csv import reader
+from datetime import datetime
+from functools import cache
+from pathlib import Path
+
+from common.bad_rows import BadRows
+from common.columnar import ColumnarFile
+from common.compression import open_file
+from common.records import RecordReader
+from sales_engine import aggregate_sales
+
+INT64_DIGITS = 18
+MAX_TEXT_BYTES = 64
+
+
+@cache
+def _numpy():
+    """Imports NumPy on first use, it takes longer to import than the rest of the tasks."""
+    try:
+        import numpy
+    except ImportError:  # NumPy is optional, aggregate_sales_columnar falls back to the pure-Python loop.
+        return None
+    return numpy
+
+
+def numpy_available() -> bool:
+    return _numpy() is not None
+
+
+def aggregate_sales_columnar(file_path):
+    """Aggregates a sales CSV file with NumPy column operations.
+
+    The file is read as one byte buffer and the fields of 'Item', 'Sum' and 'Date' are located
+    by the positions of the newlines and commas, without a Python object per row. Plain digit
+    sums are parsed as a column, 'Item' and 'Date' are turned into codes by one sort each, every
+    distinct date is parsed only once, and the totals per item and per month come from grouped
+    reductions.
+
+    The result, including the skipped rows and their errors, is identical to aggregate_sales.
+    The pure-Python loop is used instead when NumPy is not installed or the file has a shape
+    the column path does not handle (missing columns, quotes, '\r\n' line ends, rows with another
+    number of fields, sums which do not fit int64, texts over MAX_TEXT_BYTES bytes).
+
+    Returns:
+        The same tuple as aggregate_sales.
+    """
+    file_path = Path(file_path)
+    if numpy_available():
+        result = _aggregate_with_numpy(file_path)
+        if result is not None:
+            return result
+
+    with open_file(file_path, encoding='utf-8') as file:
+        return aggregate_sales(RecordReader(file, skipinitialspace=True))
+
+
+def aggregate_sales_snapshot(file_path):
+    """Aggregates a columnar sales snapshot (see common/columnar.py) without building row dicts.
+
+    'Sum' is read as an integer column and 'Item' and 'Date' as dictionary codes, so every
+    distinct date is parsed once and the loop only adds integers. Snapshots with another
+    shape (e.g. a 'Sum' column with non-integer values) are aggregated row by row.
+
+    Returns:
+        The same tuple as aggregate_sales over the file the snapshot was made from.
+    """
+    with ColumnarFile(file_path) as snapshot:
+        columns = snapshot.columns
+        shape = [columns[name]["type"] if name in columns else None for name in ("Item", "Sum", "Date")]
+        if shape not in (["str", "int", "str"], ["str", "str", "str"]) \
+                or any(columns[name]["missing"] for name in ("Item", "Sum", "Date")):
+            return aggregate_sales(snapshot.iter_rows())
+
+        sums = _column_list(snapshot, "Sum")
+        sum_codes = sum_errors = None
+        if columns["Sum"]["type"] == "str":
+            amounts, sum_errors = _parse_dictionary(snapshot.dictionary("Sum"), int)
+            sum_codes = sums
+            sums = [amounts[code] for code in sum_codes]
+        months, date_errors = _parse_dictionary(
+            snapshot.dictionary("Date"), lambda date: datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m")
+        )
+
+        total_sales = 0
+        item_totals = defaultdict(int)
+        monthly_total_sales = defaultdict(int)
+        skipped = BadRows()
+        rows = zip(_column_list(snapshot, "Item"), sums, _column_list(snapshot, "Date"))
+        for i, (item, amount, date) in enumerate(rows):
+            month = months[date]
+            if amount is None or month is None:
+                if amount is None:
+                    kind, error = "invalid_sum", sum_errors[sum_codes[i]]
+                else:
+                    kind, error = "invalid_date", date_errors[date]
+                skipped.add(kind, i, error, snapshot.row(i) if skipped.counts[kind] < skipped.limit else None)
+                continue
+            total_sales += amount
+            item_totals[item] += amount
+            monthly_total_sales[month] += amount
+
+        items = snapshot.dictionary("Item")
+        total_sale_per_item = defaultdict(int, ((items[code], amount) for code, amount in item_totals.items()))
+        return total_sales, total_sale_per_item, monthly_total_sales, len(snapshot), skipped
+
+
+def _parse_dictionary(entries, parse):
+    """Parses every distinct value once, returns the results (None on error) and the errors by code."""
+    results = []
+    errors = {}
+    for code, entry in enumerate(entries):
+        try:
+            results.append(parse(entry))
+        except ValueError as e:
+            results.append(None)
+            errors[code] = e
+    return results, errors
+
+
+def _column_list(snapshot, name):
+    with snapshot.data(name) as view:
+        return view.tolist()
+
+
+def _aggregate_with_numpy(file_path):
+    np = _numpy()
+    with open_file(file_path, 'rb') as file:
+        data = file.read()
+    data.decode('utf-8')  # invalid UTF-8 fails like in the text reader
+
+    header_end = data.find(b"\n")
+    fieldnames = next(reader([data[:header_end if header_end != -1 else None].decode('utf-8')],
+                             skipinitialspace=True), None)
+    if fieldnames is None:
+        return aggregate_sales([])
+    columns = dict(zip(fieldnames, range(len(fieldnames))))
+    if not {"Item", "Sum", "Date"} <= columns.keys():
+        return None
+    # Quotes, carriage returns and NUL bytes need the csv module.
+    if any(special in data for special in (b'"', b"\r", b"\0")):
+        return None
+    width = len(fieldnames)
+
+    # Rows are the non-empty lines after the header, every row needs exactly width - 1 commas.
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buffer == ord("\n"))
+    starts = np.concatenate(([0], newlines + 1))[1:]
+    ends = np.append(newlines, buffer.size)[1:]
+    rows = ends > starts
+    starts, ends = starts[rows], ends[rows]
+    count = starts.size
+    if not count:
+        return aggregate_sales([])
+    commas = np.flatnonzero(buffer == ord(","))
+    commas = commas[commas > header_end]
+    if commas.size != count * (width - 1) \
+            or np.any(np.searchsorted(commas, ends) - np.searchsorted(commas, starts) != width - 1):
+        return None
+    commas = commas.reshape(count, width - 1)
+
+    def field(name):
+        index = columns[name]
+        first = starts if index == 0 else commas[:, index - 1] + 1
+        last = ends if index == width - 1 else commas[:, index]
+        return _skip_spaces(buffer, first, last), last
+
+    factorized = _factorize(buffer, *field("Item")), _factorize(buffer, *field("Date"))
+    if None in factorized:
+        return None
+    (items, item_codes), (dates, date_codes) = factorized
+
+    # Sums: plain ASCII digits are parsed as a column, everything else goes through int().
+    sum_first, sum_last = field("Sum")
+    amounts, fast = _parse_digits(buffer, sum_first, sum_last)
+    sum_errors = {}
+    for i in np.flatnonzero(~fast).tolist():
+        try:
+            amount = int(data[sum_first[i]:sum_last[i]].decode('utf-8'))
+        except ValueError as e:
+            sum_errors[i] = e
+            continue
+        if not -2 ** 63 < amount < 2 ** 63:
+            return None
+        amounts[i] = amount
+
+    # Dates: every distinct date is validated once, the month key is its parsed '%Y-%m'.
+    months = {}
+    date_months = []
+    date_errors = {}
+    for code, date in enumerate(dates):
+        try:
+            month = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m")
+        except ValueError as e:
+            date_months.append(-1)
+            date_errors[code] = e
+            continue
+        date_months.append(months.setdefault(month, len(months)))
+    month_codes = np.array(date_months, dtype=np.int64)[date_codes]
+
+    valid = month_codes >= 0
+    if sum_errors:
+        valid[list(sum_errors)] = False
+
+    skipped = BadRows()
+    for i in np.flatnonzero(~valid).tolist():
+        if i in sum_errors:
+            kind, e = "invalid_sum", sum_errors[i]
+        else:
+            kind, e = "invalid_date", date_errors[int(date_codes[i])]
+        record = None
+        if skipped.counts[kind] < skipped.limit:
+            row = next(reader([data[starts[i]:ends[i]].decode('utf-8')], skipinitialspace=True))
+            record = dict(zip(fieldnames, row))
+        skipped.add(kind, i, e, record)
+
+    amounts = amounts[valid]
+    limit = int(np.abs(amounts).max()) if amounts.size else 0
+    if limit and limit * amounts.size >= 2 ** 63:
+        return None
+
+    total_sales = int(amounts.sum())
+    total_sale_per_item = _grouped_sum(items, item_codes[valid], amounts)
+    monthly_total_sales = _grouped_sum(list(months), month_codes[valid], amounts)
+    return total_sales, total_sale_per_item, monthly_total_sales, count, skipped
+
+
+def _skip_spaces(buffer, first, last):
+    """Moves the starts of the fields [first, last) past their leading spaces, like skipinitialspace."""
+    np = _numpy()
+    first = first.copy()
+    pending = np.flatnonzero(first < last)
+    while pending.size:
+        pending = pending[buffer[first[pending]] == ord(" ")]
+        first[pending] += 1
+        pending = pending[first[pending] < last[pending]]
+    return first
+
+
+def _parse_digits(buffer, first, last):
+    """Parses the fields [first, last) which are 1-18 ASCII digits, a digit position at a time.
+
+    Returns the values (arbitrary for the other fields) and the mask of the parsed fields."""
+    np = _numpy()
+    lengths = last - first
+    parsed = (lengths > 0) & (lengths <= INT64_DIGITS)
+    values = np.zeros(first.size, dtype=np.int64)
+    for position in range(int(lengths[parsed].max()) if parsed.any() else 0):
+        rows = np.flatnonzero(parsed & (lengths > position))
+        digits = buffer[first[rows] + position].astype(np.int64) - ord("0")
+        parsed[rows[(digits < 0) | (digits > 9)]] = False
+        values[rows] = values[rows] * 10 + digits
+    return values, parsed
+
+
+def _factorize(buffer, first, last):
+    """Returns the distinct texts of the fields [first, last) and the code of every field.
+
+    The fields are copied into a fixed-width bytes array, which is sorted once by np.unique.
+    Returns None for fields longer than MAX_TEXT_BYTES, which would make the array too large.
+    """
+    np = _numpy()
+    lengths = last - first
+    width = int(lengths.max())
+    if width > MAX_TEXT_BYTES:
+        return None
+    chars = np.zeros((first.size, max(width, 1)), dtype=np.uint8)
+    for position in range(width):
+        rows = np.flatnonzero(lengths > position)
+        chars[rows, position] = buffer[first[rows] + position]
+    texts, codes = np.unique(chars.view(f"S{max(width, 1)}").reshape(-1), return_inverse=True)
+    return [text.decode('utf-8') for text in texts.tolist()], codes.reshape(-1)
+
+
+def _grouped_sum(keys, codes, amounts):
+    """Sums amounts per code, keys are ordered by first appearance like in a defaultdict loop."""
+    np = _numpy()
+    result = defaultdict(int)
+    if not codes.size:
+        return result
+
+    totals = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(totals, codes, amounts)
+    first_index = np.full(len(keys), codes.size)
+    np.minimum.at(first_index, codes, np.arange(codes.size))
+    for code in np.argsort(first_index, kind="stable").tolist():
+        if first_index[code] == codes.size:
+            break
+        result[keys[code]] = int(totals[code])
+    return result
@@ -0,0 +1,226 @@
+import marshal
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime
+from heapq import nlargest
+from itertools import accumulate, compress
+from logging import getLogger
+from pathlib import Path
+
+from common.bad_rows import BadRows
+from common.compression import open_file, split_compression_suffix
+from common.records import RecordReader
+from schema import Field, Schema
+
+
+logger = getLogger("sales_cube")
+
+CUBE_SUFFIX = ".cube"
+CUBE_VERSION = 1
+# The marshal format may change between Python versions, so a cube is only read by the one which wrote it.
+CUBE_FORMAT = (CUBE_VERSION, marshal.version, *sys.version_info[:2])
+DATE_FORMAT = "%Y-%m-%d"
+
+# The fields and kinds of SALES_SCHEMA (see sales_engine.py), with days instead of months.
+DAILY_SALES_SCHEMA = Schema([
+    Field("Item"),
+    Field("Sum", int, text=True, invalid="invalid_sum"),
+    Field("Date", format=DATE_FORMAT, convert=datetime.toordinal, invalid="invalid_date"),
+])
+
+
+class SalesCube:
+    """Sales totals by day and item with prefix sums, which answer range queries without the rows.
+
+    The days with sales are kept sorted (as date ordinals) with the running total of all items
+    before every day, and every item has its own days with its running totals. The total of a
+    date range is the difference of two running totals found by binary search: O(log days) for
+    all items and O(log days) per item for the totals of some items. Top items of a range take
+    O(items * log days). The cube only takes one sum per day and item that had sales.
+
+    The totals are made from the rows aggregate_sales counts (the same validation and kinds of
+    skipped rows), so the totals of the whole range equal total_sales, total_sale_per_item and
+    monthly_total_sales of task2.
+
+    Usage:
+        cube = load_cube("sales.csv")
+        cube.total("2024-01-01", "2024-03-31", items=["Item 1", "Item 2"])
+        cube.top_items(5, start="2024-06-01")
+
+    Dates of queries are inclusive 'YYYY-MM-DD' strings, dates or datetimes, None is open.
+    """
+
+    def __init__(self, days, prefix, items, row_count=0, skipped=None):
+        self.days = days
+        self.prefix = prefix
+        self.items = items  # {item: (days, prefix)} in the order of first appearance
+        self.row_count = row_count
+        self.skipped = skipped if skipped is not None else BadRows()
+
+    @classmethod
+    def build(cls, rows):
+        """Builds the cube of rows (dicts or records with 'Item', 'Sum' and 'Date' keys)."""
+        cells = defaultdict(int)
+        skipped = BadRows()
+        row_count = 0
+        for _, batch, result in DAILY_SALES_SCHEMA.compile().iter_batches(rows, skipped):
+            row_count += len(batch)
+            columns = result.columns
+            for item, amount, day in compress(zip(columns["Item"], columns["Sum"], columns["Date"]), result.valid):
+                cells[item, day] += amount
+
+        by_item = {}
+        day_totals = defaultdict(int)
+        for (item, day), amount in cells.items():
+            by_item.setdefault(item, {})[day] = amount
+            day_totals[day] += amount
+
+        items = {}
+        for item, amounts in by_item.items():
+            item_days = sorted(amounts)
+            items[item] = (_int64(item_days), _int64(accumulate(map(amounts.__getitem__, item_days), initial=0)))
+        days = sorted(day_totals)
+        return cls(_int64(days), _int64(accumulate(map(day_totals.__getitem__, days), initial=0)), items, row_count,
+                   skipped)
+
+    def total(self, start=None, end=None, items=None):
+        """Total sales from start to end, of the given items only if items is not None."""
+        start, end = _day(start), _day(end)
+        if items is None:
+            return _range_sum(self.days, self.prefix, start, end)
+        return sum(_range_sum(*self.items[item], start, end) for item in items if item in self.items)
+
+    def item_totals(self, start=None, end=None):
+        """Returns {item: total} of the items with sales from start to end."""
+        start, end = _day(start), _day(end)
+        totals = {}
+        for item, (days, prefix) in self.items.items():
+            low, high = _range(days, start, end)
+            if high > low:
+                totals[item] = prefix[high] - prefix[low]
+        return totals
+
+    def top_items(self, n=5, start=None, end=None):
+        """Returns the n (item, total) pairs with the highest totals from start to end."""
+        return nlargest(n, self.item_totals(start, end).items(), key=lambda pair: pair[1])
+
+    def monthly_totals(self, start=None, end=None, items=None):
+        """Returns {'YYYY-MM': total} of the months with sales from start to end, in month order."""
+        start, end = _day(start), _day(end)
+        selected = None if items is None else [self.items[item] for item in items if item in self.items]
+        low, high = _range(self.days, start, end)
+        months = {}
+        while low < high:
+            first = date.fromordinal(self.days[low])
+            next_month = date(first.year + first.month // 12, first.month % 12 + 1, 1).toordinal()
+            month_end = bisect_left(self.days, next_month, low, high)
+            if selected is None:
+                months[f"{first:%Y-%m}"] = self.prefix[month_end] - self.prefix[low]
+            else:
+                month_days = (self.days[low], self.days[month_end - 1])
+                slices = [(prefix, *_range(days, *month_days)) for days, prefix in selected]
+                if any(item_high > item_low for _, item_low, item_high in slices):
+                    months[f"{first:%Y-%m}"] = sum(prefix[item_high] - prefix[item_low]
+                                                   for prefix, item_low, item_high in slices)
+            low = month_end
+        return months
+
+    def to_data(self):
+        """Returns the cube as bytes, lists, dicts and ints (which marshal can save)."""
+        items = [(item, _pack(days), _pack(prefix)) for item, (days, prefix) in self.items.items()]
+        return _pack(self.days), _pack(self.prefix), items, self.row_count, self.skipped.to_dict()
+
+    @classmethod
+    def from_data(cls, data):
+        days, prefix, items, row_count, skipped = data
+        items = {item: (_unpack(item_days), _unpack(item_prefix)) for item, item_days, item_prefix in items}
+        return cls(_unpack(days), _unpack(prefix), items, row_count, BadRows.from_dict(skipped))
+
+
+def _int64(values):
+    """Returns the ints as an array of 64-bit ints (which also loads faster), as a list if they
+    do not fit."""
+    values = list(values)
+    try:
+        return array("q", values)
+    except OverflowError:
+        return values
+
+
+def _pack(values):
+    return values.tobytes() if isinstance(values, array) else values
+
+
+def _unpack(data):
+    if isinstance(data, bytes):
+        values = array("q")
+        values.frombytes(data)
+        return values
+    return data
+
+
+def _day(value):
+    """Returns the date ordinal of a 'YYYY-MM-DD' string, a date or a datetime, None for None."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.strptime(value, DATE_FORMAT)
+    return value.toordinal()
+
+
+def _range(days, start, end):
+    """Returns the slice of the sorted days from start to end (inclusive, None is open)."""
+    low = 0 if start is None else bisect_left(days, start)
+    high = len(days) if end is None else bisect_right(days, end)
+    return low, high
+
+
+def _range_sum(days, prefix, start, end):
+    low, high = _range(days, start, end)
+    return prefix[high] - prefix[low] if high > low else 0
+
+
+def cube_path_of(file_path):
+    """Returns the cube file of a sales file ('sales.csv' or 'sales.csv.gz' -> 'sales.cube')."""
+    return split_compression_suffix(Path(file_path))[0].with_suffix(CUBE_SUFFIX)
+
+
+def load_cube(file_path, cube_path=None):
+    """Returns the cube of a sales CSV file.
+
+    The cube is read from the cube file if it was built from the file as it is now (same path,
+    size and modification time) by the same Python version, otherwise it is built from the file
+    and saved for the next runs.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    file_path = Path(file_path)
+    cube_path = Path(cube_path) if cube_path is not None else cube_path_of(file_path)
+    stat = file_path.stat()
+    key = [str(file_path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+    try:
+        with cube_path.open("rb") as file:
+            version, cube_key, data = marshal.load(file)
+        if version == CUBE_FORMAT and cube_key == key:
+            return SalesCube.from_data(data)
+    except FileNotFoundError:
+        pass
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        logger.warning(f"Ignoring broken cube file '{cube_path}': {e}")
+
+    logger.info(f"Building the sales cube of '{file_path}'")
+    with open_file(file_path, encoding="utf-8") as file:
+        cube = SalesCube.build(RecordReader(file, skipinitialspace=True))
+
+    temporary_path = cube_path.with_name(cube_path.name + ".tmp")
+    try:
+        with temporary_path.open("wb") as file:
+            marshal.dump((CUBE_FORMAT, key, cube.to_data()), file)
+        temporary_path.replace(cube_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot write cube file '{cube_path}': {e}")
+    return cube
@@ -0,0 +1,164 @@
+import io
+import mmap
+import os
+from collections import defaultdict
+from csv import reader
+from itertools import compress
+from pathlib import Path
+
+from common.bad_rows import BadRows
+from common.compression import compression_of, open_file
+from common.records import RecordReader
+from schema import Field, Schema
+
+
+def month_of(date):
+    return date.strftime("%Y-%m")
+
+
+SALES_SCHEMA = Schema([
+    Field("Item"),
+    Field("Sum", int, text=True, invalid="invalid_sum"),
+    Field("Date", format="%Y-%m-%d", convert=month_of, invalid="invalid_date"),
+])
+
+
+def aggregate_sales(rows, start=0):
+    """Computes total sales, sales per item and sales per month.
+
+    Rows are validated in batches by the compiled SALES_SCHEMA (see schema.py), which parses
+    the sums of a batch at once and every distinct date only once, and only the valid rows
+    are added up.
+
+    Args:
+        rows: An iterable of dicts (or records, see common/records.py) with 'Item', 'Sum' and 'Date' keys.
+        start: Index of the first row, used to number skipped rows.
+
+    Returns:
+        A tuple (total_sales, total_sale_per_item, monthly_total_sales, row_count, skipped),
+        where skipped is a BadRows of the rows with missing keys ('missing_field'), a non-integer
+        'Sum' ('invalid_sum') or a 'Date' not in '%Y-%m-%d' format ('invalid_date').
+    """
+    total_sales = 0
+    total_sale_per_item = defaultdict(int)
+    monthly_total_sales = defaultdict(int)
+    skipped = BadRows()
+    row_count = 0
+
+    for _, batch, result in SALES_SCHEMA.compile().iter_batches(rows, skipped, start):
+        row_count += len(batch)
+        columns = result.columns
+        for item, amount, month in compress(zip(columns["Item"], columns["Sum"], columns["Date"]), result.valid):
+            total_sales += amount
+            total_sale_per_item[item] += amount
+            monthly_total_sales[month] += amount
+
+    return total_sales, total_sale_per_item, monthly_total_sales, row_count, skipped
+
+
+def chunk_ranges(file, start, size, chunks):
+    """Splits the byte range [start, size) of a file into ranges which begin at a row boundary."""
+    offsets = [start]
+    for i in range(1, chunks):
+        position = max(start + (size - start) * i // chunks, offsets[-1])
+        newline = file.find(b"\n", position)
+        if newline == -1 or newline + 1 >= size:
+            break
+        if newline + 1 > offsets[-1]:
+            offsets.append(newline + 1)
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def read_header(file):
+    """Reads the header row of a sales CSV file opened in binary mode.
+
+    Returns:
+        A tuple (fieldnames, offset of the first data row).
+    """
+    header = file.readline()
+    return next(reader([header.decode('utf-8')], skipinitialspace=True), []), file.tell()
+
+
+def aggregate_data(data, fieldnames):
+    """Aggregates the rows of a part of a sales CSV file (bytes of whole rows, without the header)."""
+    with io.TextIOWrapper(io.BytesIO(data), encoding='utf-8') as text:
+        rows = RecordReader(text, fieldnames=fieldnames, skipinitialspace=True)
+        return aggregate_sales(rows)
+
+
+def aggregate_chunk(file_path, fieldnames, start, end):
+    """Aggregates the rows inside the byte range [start, end) of a sales CSV file."""
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return aggregate_data(data, fieldnames)
+
+
+def merge_sales(partials):
+    """Merges the results of aggregate_sales over consecutive parts of a file, in file order.
+
+    The merge keeps the order of first appearance of items, months and bad row types and
+    renumbers skipped rows globally, so the result is identical to aggregate_sales over the
+    whole file.
+    """
+    total_sales = 0
+    total_sale_per_item = defaultdict(int)
+    monthly_total_sales = defaultdict(int)
+    row_count = 0
+    skipped = BadRows()
+    for part_total, part_items, part_months, part_rows, part_skipped in partials:
+        total_sales += part_total
+        for item, amount in part_items.items():
+            total_sale_per_item[item] += amount
+        for month, amount in part_months.items():
+            monthly_total_sales[month] += amount
+        skipped.merge(part_skipped, row_count)
+        row_count += part_rows
+
+    return total_sales, total_sale_per_item, monthly_total_sales, row_count, skipped
+
+
+def parallel_aggregate(file_path, workers=None):
+    """Aggregates a sales CSV file with several worker processes (map-reduce).
+
+    The file is split into byte ranges aligned to row boundaries, every worker aggregates
+    its own range and the partial results are merged in file order (see merge_sales), so the
+    result is identical to aggregate_sales over the whole file.
+
+    Files with quoted fields may contain newlines inside a row and compressed files cannot be
+    split at byte offsets, so they are aggregated in a single process.
+
+    Returns:
+        The same tuple as aggregate_sales.
+    """
+    file_path = Path(file_path)
+    workers = workers or os.cpu_count() or 1
+
+    if compression_of(file_path) is not None:
+        with open_file(file_path, encoding='utf-8') as file:
+            return aggregate_sales(RecordReader(file, skipinitialspace=True))
+
+    with open(file_path, 'rb') as file:
+        fieldnames, data_start = read_header(file)
+        size = os.fstat(file.fileno()).st_size
+
+        if size <= data_start:
+            return aggregate_sales([])
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if workers == 1 or mapped.find(b'"') != -1:
+                ranges = [(data_start, size)]
+            else:
+                ranges = chunk_ranges(mapped, data_start, size, workers)
+
+    if len(ranges) == 1:
+        return aggregate_chunk(file_path, fieldnames, *ranges[0])
+
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing is slow to import, only workers need it
+
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        partials = list(executor.map(
+            aggregate_chunk, [file_path] * len(ranges), [fieldnames] * len(ranges), *zip(*ranges)
+        ))
+    return merge_sales(partials)
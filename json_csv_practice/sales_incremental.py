@@ -0,0 +1,179 @@
+import json
+import os
+from hashlib import sha256
+from logging import getLogger
+from pathlib import Path
+
+from common.bad_rows import BadRows
+from common.compression import compression_of, open_file
+from common.records import RecordReader
+from sales_engine import aggregate_data, aggregate_sales, merge_sales, read_header
+
+
+logger = getLogger("sales_incremental")
+
+STATE_SUFFIX = ".state.json"
+STATE_VERSION = 1
+
+# The hashes of this many bytes at the start of the file and before the consumed offset tell
+# whether the file was rewritten since the previous run.
+CHECK_SIZE = 4096
+
+# New data is read and aggregated in blocks of this size.
+BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def state_path_of(file_path):
+    """Returns the default state file of a data file ('sales.csv' -> 'sales.csv.state.json')."""
+    file_path = Path(file_path)
+    return file_path.with_name(file_path.name + STATE_SUFFIX)
+
+
+def complete_rows_end(data):
+    """Returns the length of the complete rows at the start of data, which ends at the last line
+    break outside of a quoted field (the one with an even number of quotes before it)."""
+    end = data.rfind(b"\n") + 1
+    if b'"' in data:
+        quotes = data.count(b'"', 0, end)
+        while end and quotes % 2:
+            previous = data.rfind(b"\n", 0, end - 1) + 1
+            quotes -= data.count(b'"', previous, end)
+            end = previous
+    return end
+
+
+class IncrementalSales:
+    """Aggregates an append-only sales CSV file, reading only the bytes appended since the
+    previous run.
+
+    The result of the rows read so far is saved in a JSON state file ('sales.csv.state.json')
+    together with the byte offset where these rows end. A refresh seeks to the offset,
+    aggregates the complete rows appended since then and merges them into the saved result
+    (see merge_sales), so it costs as much as the new data, whatever the size of the file.
+    A last row without its line break yet is added to the returned result (unless it ends
+    inside a UTF-8 character), but not to the state, so the next refresh reads it again.
+
+    The whole file is aggregated again if there is no usable state, if the file is shorter than
+    the offset (truncated) or if the first bytes or the bytes before the offset changed
+    (rewritten). Compressed files cannot be read from an offset, they are always aggregated in
+    full and no state is saved.
+
+    Usage:
+        sales = IncrementalSales("sales.csv")
+        total_sales, total_sale_per_item, monthly_total_sales, row_count, skipped = sales.refresh()
+
+    Attributes:
+        bytes_read: Bytes of the file read by the last refresh.
+        restart: Why the last refresh aggregated the whole file ('no state', 'truncated',
+            'rewritten' or 'compressed'), None if it continued from the state.
+    """
+
+    def __init__(self, file_path, state_path=None):
+        self.file_path = Path(file_path)
+        self.state_path = Path(state_path) if state_path is not None else state_path_of(self.file_path)
+        self.bytes_read = 0
+        self.restart = None
+
+    def refresh(self):
+        """Returns the same tuple as aggregate_sales over the whole file and updates the state.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        if compression_of(self.file_path) is not None:
+            self.restart = "compressed"
+            self.bytes_read = self.file_path.stat().st_size
+            with open_file(self.file_path, encoding='utf-8') as file:
+                return aggregate_sales(RecordReader(file, skipinitialspace=True))
+
+        with open(self.file_path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            state = self.load_state()
+            self.restart = self.check(file, state, size)
+            if self.restart is None:
+                fieldnames, offset = state["fieldnames"], state["offset"]
+                result = (state["total_sales"], state["total_sale_per_item"], state["monthly_total_sales"],
+                          state["row_count"], BadRows.from_dict(state["skipped"]))
+                file.seek(offset)
+                self.bytes_read = 0
+            else:
+                file.seek(0)
+                fieldnames, offset = read_header(file)
+                result = aggregate_sales([])
+                self.bytes_read = offset
+                if offset == size:  # no data rows yet, maybe not even a whole header
+                    return result
+
+            consumed = offset
+            pending = b""
+            while block := file.read(BLOCK_SIZE):
+                self.bytes_read += len(block)
+                data = pending + block
+                end = complete_rows_end(data)
+                if end:
+                    result = merge_sales([result, aggregate_data(data[:end], fieldnames)])
+                    consumed += end
+                pending = data[end:]
+
+            if self.restart is not None or consumed != offset:
+                self.save_state(file, fieldnames, consumed, result)
+
+        if pending:
+            try:
+                return merge_sales([result, aggregate_data(pending, fieldnames)])
+            except UnicodeDecodeError:  # the row is being written and ends inside a character
+                pass
+        return result
+
+    def check(self, file, state, size):
+        """Returns why the state cannot be continued from, None if it can."""
+        if state is None:
+            return "no state"
+        offset = state["offset"]
+        if size < offset:
+            return "truncated"
+        if (_digest(file, 0, min(offset, CHECK_SIZE)) != state["head"]
+                or _digest(file, max(offset - CHECK_SIZE, 0), offset) != state["tail"]):
+            return "rewritten"
+        return None
+
+    def load_state(self):
+        try:
+            with self.state_path.open(encoding="utf-8") as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring broken state file '{self.state_path}': {e}")
+            return None
+        if state.get("version") != STATE_VERSION or state.get("file") != str(self.file_path.resolve()):
+            return None
+        return state
+
+    def save_state(self, file, fieldnames, offset, result):
+        total_sales, total_sale_per_item, monthly_total_sales, row_count, skipped = result
+        state = {
+            "version": STATE_VERSION,
+            "file": str(self.file_path.resolve()),
+            "fieldnames": fieldnames,
+            "offset": offset,
+            "head": _digest(file, 0, min(offset, CHECK_SIZE)),
+            "tail": _digest(file, max(offset - CHECK_SIZE, 0), offset),
+            "total_sales": total_sales,
+            "total_sale_per_item": total_sale_per_item,
+            "monthly_total_sales": monthly_total_sales,
+            "row_count": row_count,
+            "skipped": skipped.to_dict(),
+        }
+        temporary_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        try:
+            with temporary_path.open("w", encoding="utf-8") as state_file:
+                json.dump(state, state_file, ensure_ascii=False)
+            temporary_path.replace(self.state_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot write state file '{self.state_path}': {e}")
+
+
+def _digest(file, start, end):
+    file.seek(start)
+    return sha256(file.read(end - start)).hexdigest()
@@ -0,0 +1,313 @@
+import re
+from datetime import datetime
+from itertools import compress, islice, repeat
+from operator import is_, not_
+
+from common.records import Record
+
+
+BATCH_SIZE = 10_000
+
+# Parsed dates are cached by their text, the cache is emptied when it has more entries.
+FORMAT_CACHE_SIZE = 100_000
+
+# The text int() reads: an optional sign, digits with single underscores and surrounding spaces.
+INT_TEXT = re.compile(r"\s*[+-]?\d+(?:_\d+)*\s*")
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()  # value of a field a row does not have
+_INVALID = object()
+
+
+class DuplicateIDError(Exception):
+    """Raises when a duplicate ID is founded."""
+    pass
+
+
+class Field:
+    """A field every row must have.
+
+    Args:
+        name: Key of the field.
+        type: Type of the value (e.g. int), any value if None. bool values pass as int, like
+            in isinstance().
+        text: The value is the text of an int (a CSV value) and is parsed the way int() reads
+            it. Values which already are ints are accepted as well.
+        format: strptime format of a date field (e.g. '%Y-%m-%d'), the value is parsed into a
+            datetime. Every distinct text is parsed only once.
+        convert: Function applied to the parsed date, e.g. to take its month.
+        missing: Kind of the rows without the field.
+        invalid: Kind of the rows whose value does not have the type or the format.
+    """
+
+    def __init__(self, name, type=None, text=False, format=None, convert=None, missing="missing_field",
+                 invalid="invalid_value"):
+        self.name = name
+        self.type = type
+        self.text = text
+        self.format = format
+        self.convert = convert
+        self.missing = missing
+        self.invalid = invalid
+
+    def __repr__(self):
+        return f"Field({self.name!r})"
+
+
+class Schema:
+    """Declared fields of the rows of a dataset and the field whose values have to be unique.
+
+    The schema is compiled into a Validator, which checks rows a batch at a time without raising
+    an exception per bad row.
+
+    Usage:
+        SALES = Schema([Field("Item"), Field("Sum", int, text=True, invalid="invalid_sum")])
+        validator = SALES.compile()
+        for start, rows, result in validator.iter_batches(reader, bad_rows):
+            for item, amount in compress(zip(result.columns["Item"], result.columns["Sum"]), result.valid):
+                ...
+
+    Args:
+        fields: The fields in the order they are checked, a row gets the kind of its first bad field.
+        unique: Name of the field whose (parsed) values have to be unique among the valid rows.
+        duplicate: Kind of the rows whose unique value was seen before.
+        prefix: Prefix of all kinds, e.g. 'employee_' for 'employee_missing_field'.
+    """
+
+    def __init__(self, fields, unique=None, duplicate="duplicate_id", prefix=""):
+        self.fields = list(fields)
+        self.unique = unique
+        self.duplicate = prefix + duplicate
+        self.prefix = prefix
+
+    def compile(self):
+        """Returns a new Validator (with its own set of seen unique values)."""
+        return Validator(self)
+
+
+class ValidationResult:
+    """Result of the validation of a batch of rows.
+
+    Attributes:
+        valid: Mask with True for every valid row of the batch.
+        reasons: (position, kind, field) of every invalid row, in row order.
+        columns: Values of every field by name, parsed for fields with a type or a format. The
+            values of invalid rows are not defined.
+    """
+
+    def __init__(self, valid, reasons, columns):
+        self.valid = valid
+        self.reasons = reasons
+        self.columns = columns
+
+
+class Validator:
+    """Checks batches of rows against a schema.
+
+    Every field gets the check of its declaration once, which works on the whole column of a
+    batch: values are taken from the rows with C-level map() calls, plain columns are checked
+    and parsed in one go (e.g. all sums are digits) and only the rest is looked at value by
+    value. Nothing raises for a bad row, the result has a mask and the reasons instead.
+    The values of the unique field of all valid rows so far are in seen.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.seen = set()
+        self.checks = [(field, _compile_check(field, schema.prefix)) for field in schema.fields]
+
+    def validate(self, rows):
+        """Validates a list of rows (dicts or records) and returns a ValidationResult."""
+        count = len(rows)
+        valid = [True] * count
+        reasons = {}
+        columns = {}
+        getters = _getters(rows)
+        for field, check in self.checks:
+            values, bad = check(getters(field.name))
+            for i, kind in bad:
+                if valid[i]:
+                    valid[i] = False
+                    reasons[i] = (kind, field)
+            columns[field.name] = values
+
+        unique = self.schema.unique
+        if unique is not None:
+            keys = columns[unique]
+            candidates = list(compress(keys, valid))
+            if len(set(candidates)) == len(candidates) and self.seen.isdisjoint(candidates):
+                self.seen.update(candidates)
+            else:
+                field = next(field for field in self.schema.fields if field.name == unique)
+                for i in compress(range(count), valid):
+                    if keys[i] in self.seen:
+                        valid[i] = False
+                        reasons[i] = (self.schema.duplicate, field)
+                    else:
+                        self.seen.add(keys[i])
+
+        return ValidationResult(valid, [(i, kind, field) for i, (kind, field) in sorted(reasons.items())], columns)
+
+    def iter_batches(self, rows, bad_rows, start=0, batch_size=BATCH_SIZE):
+        """Validates rows a batch at a time and adds the invalid ones to bad_rows.
+
+        Yields:
+            (index of the first row of the batch, the rows of the batch, its ValidationResult).
+        """
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            result = self.validate(batch)
+            self.report(result, batch, bad_rows, start)
+            yield start, batch, result
+            start += len(batch)
+
+    def report(self, result, rows, bad_rows, start=0):
+        """Adds the invalid rows of a batch to bad_rows. The error of a row is made only for the
+        samples bad_rows keeps."""
+        for i, kind, field in result.reasons:
+            if bad_rows.counts[kind] < bad_rows.limit:
+                bad_rows.add(kind, start + i, self.error(rows[i], kind, field, start + i), rows[i])
+            else:
+                bad_rows.add(kind, start + i, None)
+
+    def error(self, row, kind, field, index):
+        """Returns the exception which explains why the row is of kind."""
+        value = _get(row, field.name)
+        if value is MISSING:
+            return KeyError(field.name)
+        if kind == self.schema.duplicate:
+            return DuplicateIDError(f"Duplicate {field.name} {value} found in record #{index}: {row}")
+        try:
+            if field.format is not None:
+                datetime.strptime(value, field.format)
+            elif field.text:
+                field.type(value)
+        except (ValueError, TypeError) as e:
+            return e
+        if field.type is not None and not field.text:
+            return TypeError(f"Invalid type for {field.name}: {type(value)}")
+        return ValueError(f"Invalid value for {field.name}: {value!r}")
+
+
+def _get(row, name):
+    if isinstance(row, (dict, Record)):
+        return row.get(name, MISSING)
+    return MISSING
+
+
+def _getters(rows):
+    """Returns a function which returns the column of a field of rows, MISSING where a row
+    does not have it. Rows of one record type or dicts are read with C-level calls."""
+    classes = set(map(type, rows))
+    cls = classes.pop() if len(classes) == 1 else None
+    if cls is dict:
+        return lambda name: list(map(dict.get, rows, repeat(name), repeat(MISSING)))
+    if cls is not None and issubclass(cls, Record):
+        def column(name):
+            position = cls._index.get(name)
+            if position is None:
+                return [MISSING] * len(rows)
+            return list(map(tuple.__getitem__, rows, repeat(position)))
+        return column
+    return lambda name: [_get(row, name) for row in rows]
+
+
+def _compile_check(field, prefix):
+    """Returns the check of a field: a function of a column which returns the (parsed) values
+    and the (position, kind) of the bad ones."""
+    missing = prefix + field.missing
+    invalid = prefix + field.invalid
+
+    def bad_value(value):
+        return missing if value is MISSING else invalid
+
+    if field.format is not None:
+        cache = {}
+        date_format = field.format
+        convert = field.convert
+
+        def parse(value):
+            try:
+                date = datetime.strptime(value, date_format)
+            except (ValueError, TypeError):
+                return _INVALID
+            return convert(date) if convert is not None else date
+
+        def check(values):
+            if set(map(type, values)) != {str}:  # lists and dicts cannot be looked up and are no dates
+                values = [value if value.__hash__ is not None else _INVALID for value in values]
+            parsed = list(map(cache.get, values))
+            if None in parsed:
+                if len(cache) > FORMAT_CACHE_SIZE:
+                    cache.clear()
+                for value in set(compress(values, map(is_, parsed, repeat(None)))):
+                    cache[value] = parse(value)
+                parsed = list(map(cache.__getitem__, values))
+            if _INVALID not in parsed:
+                return parsed, []
+            return parsed, [(i, bad_value(values[i])) for i, date in enumerate(parsed) if date is _INVALID]
+        return check
+
+    if field.type is not None and field.text:
+        parse_type = field.type
+
+        def check(values):
+            types = set(map(type, values))
+            if types <= {parse_type}:  # e.g. the int column of a snapshot
+                return values, []
+            if types == {str}:
+                plain = list(map(str.isdecimal, values))
+            else:
+                plain = [value.__class__ is str and value.isdecimal() for value in values]
+            others = list(compress(range(len(values)), map(not_, plain)))
+            work = values
+            if others:
+                work = values.copy()
+                for i in others:
+                    work[i] = "0"
+            try:
+                parsed = list(map(parse_type, work))
+            except ValueError:  # more digits than int() reads (see sys.set_int_max_str_digits)
+                parsed = [None] * len(values)
+                others = range(len(values))
+            if not others:
+                return parsed, []
+
+            bad = []
+            for i in others:
+                value = values[i]
+                if (value.__class__ is str and INT_TEXT.fullmatch(value) is not None) or isinstance(value, parse_type):
+                    try:
+                        parsed[i] = parse_type(value)
+                        continue
+                    except ValueError:
+                        pass
+                parsed[i] = None
+                bad.append((i, bad_value(value)))
+            return parsed, bad
+        return check
+
+    if field.type is not None:
+        value_type = field.type
+
+        def check(values):
+            if set(map(type, values)) <= {value_type}:
+                return values, []
+            return values, [(i, bad_value(value)) for i, value in enumerate(values)
+                            if value is MISSING or not isinstance(value, value_type)]
+        return check
+
+    def check(values):
+        if MISSING not in values:
+            return values, []
+        return values, [(i, missing) for i, value in enumerate(values) if value is MISSING]
+    return check
+
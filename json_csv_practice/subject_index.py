@@ -0,0 +1,123 @@
+import os
+from hashlib import sha256
+from json import dump, load
+from logging import getLogger
+from pathlib import Path
+
+from common.compression import find_input, open_file
+
+
+logger = getLogger("subject_index")
+
+
+class SubjectIndex:
+    """Inverted index subject -> ids of the students who study it.
+
+    Subjects are stored in lower case and a student id is the position of the student in
+    'students.json'. A student who lists the same subject twice is counted once, so count()
+    gives the same numbers as scanning the students one by one.
+    """
+
+    def __init__(self, index: dict[str, list[int]]):
+        self.index = index
+
+    @classmethod
+    def build(cls, students: list[dict]) -> "SubjectIndex":
+        index = {}
+        for student_id, student in enumerate(students):
+            for subject in {subject.lower() for subject in student.get("subjects", [])}:
+                index.setdefault(subject, []).append(student_id)
+        return cls(index)
+
+    def __contains__(self, subject: str) -> bool:
+        return subject.lower() in self.index
+
+    def count(self, subject: str) -> int:
+        return len(self.index.get(subject.lower(), ()))
+
+    def students(self, subject: str) -> list[int]:
+        return self.index.get(subject.lower(), [])
+
+    def query(self, subjects) -> dict[str, int]:
+        """Returns the number of students for every subject in subjects."""
+        return {subject: self.count(subject) for subject in subjects}
+
+
+def index_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + ".subjects.idx")
+
+
+def file_digest(file_path: Path) -> str:
+    digest = sha256()
+    with file_path.open("rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_subject_index(file_path, students: list[dict] | None = None, persist: bool | None = None) -> SubjectIndex:
+    """Returns the subject index of a students file, building it only when the file changed.
+
+    The index is saved next to the file as '<name>.subjects.idx' together with the file size,
+    mtime and SHA-256 digest. It is reused while size and mtime match; if only the mtime
+    changed, the digest decides. When the index has to be rebuilt, students are used if
+    given, otherwise the file is loaded.
+
+    With persist=None (the default) a saved index is used, but the index is only saved if the
+    directory of the file is writable, so read-only inputs get no sidecar file. persist=True
+    always saves it and persist=False neither reads nor saves it.
+
+    Raises:
+        FileNotFoundError: If the students file is not found.
+        JSONDecodeError: If the students file has to be parsed and contains invalid JSON.
+    """
+    file_path = Path(file_path)
+    stat = file_path.stat()
+    cache_path = index_path(file_path)
+    digest = None
+    save = persist if persist is not None else os.access(cache_path.parent, os.W_OK)
+
+    if persist is not False:
+        try:
+            with cache_path.open(encoding="utf-8") as cache_file:
+                cache = load(cache_file)
+            if (cache["size"], cache["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                return SubjectIndex(cache["index"])
+            if cache["size"] == stat.st_size:
+                digest = file_digest(file_path)
+                if cache["sha256"] == digest:
+                    cache["mtime_ns"] = stat.st_mtime_ns
+                    if save:
+                        save_cache(cache_path, cache)
+                    return SubjectIndex(cache["index"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.info(f"Subject index '{cache_path}' is not used: {e}")
+
+    if students is None:
+        with open_file(file_path, encoding="utf-8") as file:
+            students = load(file)
+    subject_index = SubjectIndex.build(students)
+
+    if save:
+        cache = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest or file_digest(file_path),
+            "index": subject_index.index,
+        }
+        save_cache(cache_path, cache)
+    return subject_index
+
+
+def save_cache(cache_path: Path, cache: dict) -> None:
+    try:
+        with cache_path.open("w", encoding="utf-8") as cache_file:
+            dump(cache, cache_file, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"Cannot save subject index '{cache_path}': {e}")
+
+
+def query_subjects(subjects, file_path="students.json", persist: bool | None = None) -> dict[str, int]:
+    """Answers many subject lookups without prompting, e.g. query_subjects(["python", "sql"]).
+    persist is passed to load_subject_index."""
+    return load_subject_index(find_input(file_path), persist=persist).query(subjects)
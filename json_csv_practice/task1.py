@@ -1,9 +1,20 @@
 from pathlib import Path
 from json import load, JSONDecodeError
+from itertools import compress
 from logging import getLogger
+from subject_index import load_subject_index
+from common.compression import find_input, open_file
+from common.metrics import PipelineMetrics
+from common.bad_rows import BadRows
+from dataset_cache import DatasetCache
+from schema import Field, Schema
 
 
-def task1() -> None:
+STUDENT_SCHEMA = Schema([Field("age", int, missing="missing_age", invalid="invalid_age")])
+
+
+def task1(subjects: list[str] | None = None, cache: DatasetCache | None = None,
+          persist_index: bool | None = None) -> PipelineMetrics:
     """Analyzes student data from a JSON file and displays key statistics.
 
     Loads student data from 'students.json', logs errors if the file is missing
@@ -13,6 +24,25 @@ def task1() -> None:
         - Prompts the user for a subject name and displays how many students study that subject.
         Allows repeated input until a match or 'exit'.
 
+    Students without a valid age are skipped and reported in one warning with their counts by
+    type and the first samples. They are found in batches by the compiled STUDENT_SCHEMA
+    (see schema.py) instead of an exception per student.
+
+    Subject lookups use an inverted subject index which is built once per file version and
+    saved next to 'students.json' if its directory is writable (see subject_index.py).
+
+    Args:
+        subjects: Subjects to look up without prompting. If given, the count for every subject
+            is printed and no input is requested.
+        cache: Cache of parsed datasets. If given, the students are taken from it and the file is
+            parsed only when it has changed since the previous run.
+        persist_index: Whether the subject index is saved next to the file. None saves it only
+            if the directory is writable, False also ignores a saved index.
+
+    Returns:
+        Metrics of the load, validate, aggregate and index stages (timings, rows, bytes read and
+        skipped rows by reason).
+
     Raises:
     FileNotFoundError: If the file 'students.json' is not found.
     JSONDecodeError: If the file contains invalid JSON.
@@ -23,58 +53,76 @@ def task1() -> None:
     logger = getLogger("task1")
     logger.info("Task 1 started")
 
-    file_path = Path("students.json")  # Starts Step 1: reading data from file
-
-    try:
-        if not file_path.exists():
-            raise FileNotFoundError(f"File '{file_path}' not found.")
-
-        with file_path.open(encoding="utf-8") as file:
-            students = load(file)
-    except Exception as e:
-        if isinstance(e, FileNotFoundError):
-            logger.error(f"Error opening file '{file_path}': {e}")
-            print(f"{e} Check the path and try again.")
-        elif isinstance(e, JSONDecodeError):
-            logger.error(f"Error reading file '{file_path}': {e.msg} at line {e.lineno}, column {e.colno}")
-            print(f"An error within reading the file '{file_path}'")
-        logger.info("Task 1 stopped")
-        return
+    metrics = PipelineMetrics("task1")
+    file_path = find_input(Path("students.json"))  # Starts Step 1: reading data from file
+
+    with metrics.stage("load") as stage:
+        try:
+            if not file_path.exists():
+                raise FileNotFoundError(f"File '{file_path}' not found.")
+
+            if cache is not None:
+                students = cache.load_json(file_path)
+            else:
+                with open_file(file_path, encoding="utf-8") as file:
+                    students = load(file)
+            stage.bytes_read = file_path.stat().st_size
+        except Exception as e:
+            if isinstance(e, FileNotFoundError):
+                logger.error(f"Error opening file '{file_path}': {e}")
+                print(f"{e} Check the path and try again.")
+            elif isinstance(e, JSONDecodeError):
+                logger.error(f"Error reading file '{file_path}': {e.msg} at line {e.lineno}, column {e.colno}")
+                print(f"An error within reading the file '{file_path}'")
+            logger.info("Task 1 stopped")
+            return metrics
+        stage.rows = len(students)
 
     if not students:
         logger.warning(f"File {file_path} loaded, but student list is empty")
         logger.info("Task 1 stopped")
         print(f"File '{file_path}' is empty. Check the file and try again.")
-        return
+        return metrics
 
     print(f"\nTotal count of students: {len(students)}")  # Ends Step 1, starts Step 2: counting amount of students
 
+    bad_rows = BadRows()
     valid_students = []  # Ends Step 2, starts Step 3: finding the oldest student and printing his data (name, age etc.)
 
-    for i, student in enumerate(students):
-        try:
-            age = student['age']
-            if not isinstance(age, int):
-                raise TypeError(f"Invalid type for age: {type(age)}")
-            valid_students.append(student)
-        except (KeyError, TypeError) as e:
-            logger.warning(f"Error in element #{i}: {e}. Student data: {student}")
-            continue
+    with metrics.stage("validate") as stage:
+        for _, batch, result in STUDENT_SCHEMA.compile().iter_batches(students, bad_rows):
+            valid_students.extend(compress(batch, result.valid))
+        stage.rows = len(students)
+    bad_rows.log_summary(logger, metrics, what="students")
 
     if not valid_students:
         logger.warning("There is no valid student list with valid key 'age'")
         logger.info("Task 1 stopped")
         print("There is no valid student list with valid age. Check the file and try again.")
-        return
-
-    oldest_student = max(valid_students, key=lambda student: student["age"])
+        return metrics
+
+    with metrics.stage("aggregate") as stage:
+        oldest_student = max(valid_students, key=lambda student: student["age"])
+        stage.rows = len(valid_students)
+    metrics.results["students"] = len(students)
+    metrics.results["valid_students"] = len(valid_students)
+    metrics.results["oldest_student"] = {key: oldest_student.get(key) for key in ("name", "age", "city")}
     print(f"\nThe oldest student is {oldest_student['name']}.")
     print(f"His age is {oldest_student['age']}.")
     print(f"He is from {oldest_student['city']}")
 
-    all_subjects = set()  # Ends Step 3, starts Step 4: counting amount of student who learning certain subject
-    for student in students:
-        all_subjects.update(subject.lower() for subject in student.get("subjects", []))
+    # Ends Step 3, starts Step 4: counting amount of student who learning certain subject
+    with metrics.stage("index") as stage:
+        subject_index = load_subject_index(file_path, students, persist=persist_index)
+        stage.rows = len(students)
+
+    if subjects is not None:
+        subject_counts = subject_index.query(subject.strip().lower() for subject in subjects)
+        metrics.results["subjects"] = subject_counts
+        for subject, count in subject_counts.items():
+            print(f"{count} student{'s' if count != 1 else ''} study '{subject}'.")
+        logger.info("Task 1 finished")
+        return metrics
 
     subject = ""
     while subject != "exit":
@@ -83,16 +131,13 @@ def task1() -> None:
         if subject == "exit":
             logger.info("Task 1 stopped by user request")
             print("Exiting Task 1.")
-            return
+            return metrics
 
-        if subject in all_subjects:
-            count = sum(
-                subject in (s.lower() for s in student.get("subjects", []))
-                for student in students
-            )
+        if subject in subject_index:
+            count = subject_index.count(subject)
             print(f"{count} student{'s' if count > 1 else ''} study '{subject}'.")
             logger.info("Task 1 finished")
-            return
+            return metrics
         else:
             print(f"No students study '{subject}'. Try again or type 'exit'.")
             logger.warning(f"Subject '{subject}' not found among students")
@@ -1,11 +1,21 @@
 from pathlib import Path
-from csv import DictReader
-from collections import defaultdict
 from logging import getLogger
-from datetime import datetime
+from sales_engine import aggregate_sales, parallel_aggregate
+from sales_columnar import aggregate_sales_columnar, aggregate_sales_snapshot, numpy_available
+from sales_incremental import IncrementalSales
+from common.columnar import find_snapshot
+from common.compression import find_input, open_file
+from common.records import RecordReader
+from common.metrics import PipelineMetrics
+from dataset_cache import DatasetCache
 
 
-def task2() -> None:
+def task2(
+        workers: int = 1,
+        backend: str = "python",
+        cache: DatasetCache | None = None,
+        incremental: bool = False,
+) -> PipelineMetrics:
     """Analyzes sales data from a CSV file and displays key statistics.
 
     Reads data from 'sales.csv', processes each row, and displays:
@@ -14,10 +24,31 @@ def task2() -> None:
       - Total sales amount per month.
 
     Invalid or incomplete rows (e.g., missing keys, bad data types, or wrong date format)
-    are skipped with a warning logged. The function assumes the date format to be '%Y-%m-%d'.
+    are skipped and reported in one warning with their counts by type and the first samples.
+    The function assumes the date format to be '%Y-%m-%d'.
+
+    If a columnar snapshot 'sales.col' (see common/columnar.py) was written from the CSV file as it
+    is now and has the 'Item', 'Sum' and 'Date' columns, it is aggregated instead of the CSV file.
 
     The function logs all critical steps and skips incorrect rows without interrupting execution.
 
+    Args:
+        workers: Number of processes for the aggregation. With more than one worker the file is
+            split into row-aligned byte ranges which are aggregated in parallel and merged.
+        backend: 'python' for the row-by-row loop or 'numpy' for the vectorized column path,
+            which falls back to the loop when NumPy is not installed.
+        cache: Cache of parsed datasets. If given, the single-process Python backend takes the rows
+            from it and the file is parsed only when it has changed since the previous run.
+        incremental: Tail mode for an append-only 'sales.csv'. The totals are saved with the
+            consumed byte offset in 'sales.csv.state.json' (see sales_incremental.py) and every
+            run reads only the bytes appended since the previous one. A truncated or rewritten
+            file is aggregated from the start again. Snapshots, workers and the backend are not
+            used in this mode.
+
+    Returns:
+        Metrics of the aggregate stage (which reads and aggregates the file in one pass) and of
+        the report stage, with skipped rows by reason.
+
     Raises:
         FileNotFoundError: If 'sales.csv' is not found.
         ValueError: If a row contains invalid numeric or date format in 'Sum' or 'Date' fields.
@@ -27,58 +58,79 @@ def task2() -> None:
     logger = getLogger("task2")
     logger.info("Task 2 started")
 
-    file_path = Path("sales.csv")  # Starts Step 1: reading data from file
-
-    try:
-        if not file_path.exists():
-            raise FileNotFoundError(f"File '{file_path}' not found.")
-
-        with file_path.open(encoding='utf-8') as file:
-            reader = DictReader(file, skipinitialspace=True)
-            sales = list(reader)
-    except Exception as e:
-        if isinstance(e, FileNotFoundError):
-            logger.error(f"Error opening file '{file_path}': {e}")
-            print(f"{e} Check the file path and try again.")
-        else:
-            logger.error(f"Error reading file '{file_path}': {e}")
-            print(f"An error occurred while reading file '{file_path}'. Check the file and try again.")
-        logger.info("Task 2 stopped")
-        return
+    metrics = PipelineMetrics("task2")
+    file_path = find_input(Path("sales.csv"))
+    # Starts Step 1: reading data from file
+    snapshot_path = None if incremental else find_snapshot(file_path, columns=("Item", "Sum", "Date"))
+    bytes_read = None
 
-    if not sales:
+    with metrics.stage("aggregate") as stage:
+        try:
+            if not file_path.exists():
+                raise FileNotFoundError(f"File '{file_path}' not found.")
+
+            if incremental:
+                sales = IncrementalSales(file_path)
+                result = sales.refresh()
+                bytes_read = sales.bytes_read
+                if sales.restart is not None:
+                    logger.info(f"Aggregated '{file_path}' from the start ({sales.restart})")
+                logger.info(f"Read {sales.bytes_read} new bytes of '{file_path}'")
+            elif snapshot_path is not None:
+                logger.info(f"Reading columnar snapshot '{snapshot_path}'")
+                result = aggregate_sales_snapshot(snapshot_path)
+            elif backend == "numpy":
+                if not numpy_available():
+                    logger.info("NumPy is not installed, using the pure-Python backend")
+                result = aggregate_sales_columnar(file_path)
+            elif workers > 1:
+                result = parallel_aggregate(file_path, workers)
+            elif cache is not None:
+                result = aggregate_sales(cache.load_csv(file_path))
+            else:
+                with open_file(file_path, encoding='utf-8') as file:
+                    reader = RecordReader(file, skipinitialspace=True)
+                    result = aggregate_sales(reader)
+        except Exception as e:
+            if isinstance(e, FileNotFoundError):
+                logger.error(f"Error opening file '{file_path}': {e}")
+                print(f"{e} Check the file path and try again.")
+            else:
+                logger.error(f"Error reading file '{file_path}': {e}")
+                print(f"An error occurred while reading file '{file_path}'. Check the file and try again.")
+            logger.info("Task 2 stopped")
+            return metrics
+
+        total_sales, total_sale_per_item, monthly_total_sales, row_count, skipped = result
+        stage.rows = row_count
+        stage.bytes_read = bytes_read if bytes_read is not None else (snapshot_path or file_path).stat().st_size
+
+    if not row_count:
         logger.warning(f"Sales file '{file_path}' loaded but contains no data")
         logger.info("Task 2 stopped")
         print(f"File '{file_path}' is empty. Check the file and try again.")
-        return
+        return metrics
 
     # Ends Step 1, starts Step 2, 3, 4: counting amount of sales during the whole period,
     # defining top-selling item, dividing sales by months and printing it
-    total_sales = 0
-    total_sale_per_item = defaultdict(int)
-    monthly_total_sales = defaultdict(int)
+    with metrics.stage("report") as stage:
+        skipped.log_summary(logger, metrics)
+        if not total_sale_per_item:
+            logger.warning(f"Sales file '{file_path}' has no valid rows")
+            logger.info("Task 2 stopped")
+            print(f"File '{file_path}' has no valid sales rows. Check the file and try again.")
+            return metrics
 
-    for i, row in enumerate(sales):
-        try:
-            item = row["Item"]
-            amount = int(row["Sum"])
-            date = row["Date"]
-            date_obj = datetime.strptime(date, "%Y-%m-%d")
-            monthly_key = date_obj.strftime("%Y-%m")
-
-            total_sales += amount
-            total_sale_per_item[item] += amount
-            monthly_total_sales[monthly_key] += amount
-        except (KeyError, ValueError) as e:
-            logger.warning(f"Skipping invalid row #{i}: {e}. Row: {row}")
-            continue
-
-    top_item = max(total_sale_per_item.items(), key=lambda x: x[1])
-    logger.info(f"Top-selling item is '{top_item[0]}' with total sales of {top_item[1]}")
-    print(f"\nTotal sales sum: {total_sales}¥")
-    print(f"\nTop-selling item: {top_item[0]}. Total sales: {top_item[1]}¥")
-    print(f"\nMonthly sales totals:")
-    for month, amount in sorted(monthly_total_sales.items()):
-        print(f"{month}: {amount}¥")
+        top_item = max(total_sale_per_item.items(), key=lambda x: x[1])
+        metrics.results["total_sales"] = total_sales
+        metrics.results["top_item"] = {"item": top_item[0], "total": top_item[1]}
+        metrics.results["monthly_total_sales"] = dict(sorted(monthly_total_sales.items()))
+        logger.info(f"Top-selling item is '{top_item[0]}' with total sales of {top_item[1]}")
+        print(f"\nTotal sales sum: {total_sales}¥")
+        print(f"\nTop-selling item: {top_item[0]}. Total sales: {top_item[1]}¥")
+        print(f"\nMonthly sales totals:")
+        for month, amount in sorted(monthly_total_sales.items()):
+            print(f"{month}: {amount}¥")
+        stage.rows = len(monthly_total_sales)
     logger.info("Task 2 finished")
-    return
+    return metrics
@@ -1,15 +1,32 @@
 from pathlib import Path
-from json import load, JSONDecodeError
-from csv import DictReader
+from json import JSONDecodeError
+from contextlib import ExitStack
+from itertools import chain, compress, count
 from logging import getLogger
-
-
-class DuplicateIDError(Exception):
-    """Raises when a duplicate ID is founded."""
-    pass
-
-
-def task3() -> None:
+from join_engine import DEFAULT_MEMORY_BUDGET, hash_join, merge_join
+from dataset_cache import DatasetCache
+from common.compression import find_input, open_file
+from common.columnar import ColumnarFile, find_snapshot
+from common.metrics import PipelineMetrics
+from common.bad_rows import BadRows
+from common.json_stream import iter_json_array
+from common.records import RecordReader, compact_record
+from schema import DuplicateIDError, Field, Schema  # noqa: F401  DuplicateIDError is re-exported, it was defined here
+
+
+EMPLOYEE_SCHEMA = Schema([Field("id", int)], unique="id", prefix="employee_")
+PERFORMANCE_SCHEMA = Schema(
+    [Field("employee_id", int, text=True), Field("performance", int, text=True)],
+    unique="employee_id",
+    prefix="performance_",
+)
+
+
+def task3(
+        strategy: str = "hash",
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        cache: DatasetCache | None = None,
+) -> PipelineMetrics:
     """Combines employee data from JSON and performance data from CSV to analyze performance statistics.
 
     This script:
@@ -18,6 +35,25 @@ def task3() -> None:
         - Matches employee IDs from both sources, ensuring consistency.
         - Calculates average performance and identifies the employee with the highest score.
 
+    Both files are streamed through a join (see join_engine.py) and the statistics are computed
+    in the same pass. Records are validated in batches by the compiled EMPLOYEE_SCHEMA and
+    PERFORMANCE_SCHEMA (see schema.py), which also detect the duplicate IDs. Only the IDs of both files are kept in memory to detect duplicates and
+    mismatches, and the joined employees are kept as compact records (see common/records.py).
+    Columnar snapshots 'employees.col' and 'performance.col' (see common/columnar.py) are
+    read instead of the text files when they were written from the files as they are now and
+    have the ID and performance columns.
+
+    Args:
+        strategy: 'hash' builds a hash table on the smaller file and streams the other one
+            through it, spilling to temporary files when the build side has more than
+            memory_budget rows. 'merge' is a sort-merge join for files already sorted by ID.
+        memory_budget: Maximal number of build rows kept in memory by the hash join.
+        cache: Cache of parsed datasets. If given, both files are taken from it instead of being
+            streamed, and they are parsed only when they have changed since the previous run.
+
+    Returns:
+        Metrics of the load and join stages (timings, rows, bytes read and skipped rows by reason).
+
     Raises:
         FileNotFoundError: If either input file is missing.
         JSONDecodeError: If the JSON file is malformed.
@@ -31,88 +67,135 @@ def task3() -> None:
     logger.info("Task 3 started")
 
     # Starts Step 1: reading data from files employees.json and performance.csv
-    json_path = Path("employees.json")
-    csv_path = Path("performance.csv")
-
-    try:
-        if not json_path.exists():
-            raise FileNotFoundError(f"File '{json_path}' not found.")
-        if not csv_path.exists():
-            raise FileNotFoundError(f"File '{csv_path}' not found.")
-
-        with json_path.open(encoding="utf-8") as json_file:
-            employees = load(json_file)
-
-        with csv_path.open(encoding="utf-8") as csv_file:
-            reader = DictReader(csv_file, skipinitialspace=True)
-            performance = list(reader)
-    except Exception as e:
-        if isinstance(e, FileNotFoundError):
-            print(f"{e} Check the file and try again.")
-            logger.error(e)
-        elif isinstance(e, JSONDecodeError):
-            logger.error(f"Error parsing the file '{json_path}': {e}")
-            print(f"Error while reading employees data in file '{json_path}'. Check the file and try again.")
-        else:
-            logger.error(f"Failed to parse file '{csv_path}': {e}")
-            print(f"Error while reading file '{csv_path}. Check the file and try again.")
-        logger.info("Task 3 stopped")
-        return
-
-    if not employees:
-        logger.warning(f"File '{json_path}' contains no data'")
-        logger.info("Task 3 stopped")
-        print(f"File '{json_path}' is empty. Check the file and try again.")
-        return
-
-    if not performance:
-        logger.warning(f"File '{csv_path}' contains no data'")
-        logger.info("Task 3 stopped")
-        print(f"File '{csv_path}' is empty. Check the file and try again.")
-        return
-
-    # Ends Step 1, start Step 2, 3, 4: comparison of performance data for each employee, defining average performance
-    # and finding the employee with the highest performance and printing it
-    data_error = False
-    employees_dict = {}
-    json_ids = set()
-    for i, employee in enumerate(employees):
-        try:
-            if "id" not in employee:
-                raise KeyError("Missing 'id' key in employee record.")
-            employee_id = employee["id"]
-
-            if not isinstance(employee["id"], int):
-                raise TypeError(f"ID must be int, got '{type(employee['id'])}' instead.")
-
-            if employee_id in json_ids:
-                raise DuplicateIDError(f"Duplicate ID {employee_id} found in employee record #{i}: {employee}")
-
-            json_ids.add(employee_id)
-            employees_dict[employee_id] = employee
-        except (TypeError, KeyError, DuplicateIDError) as e:
-            logger.warning(f"Skipping employee #{i} in JSON due to invalid ID: {e}")
-            data_error = True
-            continue
-
-    csv_ids = set()
-    total_performance = 0
-    top_employee = (0, 0)
-    for i, row in enumerate(performance):
-        try:
-            employee_id = int(row["employee_id"])
-            performance_score = int(row["performance"])
-            if employee_id in csv_ids:
-                raise DuplicateIDError(f"Duplicate ID {employee_id} found in employee record #{i}: {row}")
-        except (KeyError, ValueError, TypeError, DuplicateIDError) as e:
-            logger.warning(f"Skipping employee #{i} in CSV due to invalid data: {e}")
-            data_error = True
-            continue
-
-        csv_ids.add(employee_id)
-        total_performance += performance_score
-        if performance_score > top_employee[1]:
-            top_employee = (employee_id, performance_score)
+    json_path = find_input(Path("employees.json"))
+    csv_path = find_input(Path("performance.csv"))
+    json_snapshot = find_snapshot(json_path, columns=("id",))
+    csv_snapshot = find_snapshot(csv_path, columns=("employee_id", "performance"))
+    json_source = json_snapshot or json_path
+    csv_source = csv_snapshot or csv_path
+
+    metrics = PipelineMetrics("task3")
+    with ExitStack() as files:
+        with metrics.stage("load") as stage:
+            try:
+                if not json_source.exists():
+                    raise FileNotFoundError(f"File '{json_path}' not found.")
+                if not csv_source.exists():
+                    raise FileNotFoundError(f"File '{csv_path}' not found.")
+
+                if json_snapshot is not None:
+                    employees = files.enter_context(ColumnarFile(json_snapshot)).iter_rows()
+                elif cache is not None:
+                    employees = iter(cache.load_json(json_path))
+                else:
+                    json_file = files.enter_context(open_file(json_path, encoding="utf-8"))
+                    employees = iter_json_array(json_file)
+                first_employee = next(employees, None)
+
+                if csv_snapshot is not None:
+                    performance = files.enter_context(ColumnarFile(csv_snapshot)).iter_rows()
+                elif cache is not None:
+                    performance = iter(cache.load_csv(csv_path))
+                else:
+                    csv_file = files.enter_context(open_file(csv_path, encoding="utf-8"))
+                    performance = RecordReader(csv_file, skipinitialspace=True)
+                first_row = next(performance, None)
+                stage.bytes_read = json_source.stat().st_size + csv_source.stat().st_size
+            except Exception as e:
+                if isinstance(e, FileNotFoundError):
+                    print(f"{e} Check the file and try again.")
+                    logger.error(e)
+                elif isinstance(e, JSONDecodeError):
+                    logger.error(f"Error parsing the file '{json_path}': {e}")
+                    print(f"Error while reading employees data in file '{json_path}'. Check the file and try again.")
+                else:
+                    logger.error(f"Failed to parse file '{csv_path}': {e}")
+                    print(f"Error while reading file '{csv_path}. Check the file and try again.")
+                logger.info("Task 3 stopped")
+                return metrics
+
+        if first_employee is None:
+            logger.warning(f"File '{json_path}' contains no data'")
+            logger.info("Task 3 stopped")
+            print(f"File '{json_path}' is empty. Check the file and try again.")
+            return metrics
+
+        if first_row is None:
+            logger.warning(f"File '{csv_path}' contains no data'")
+            logger.info("Task 3 stopped")
+            print(f"File '{csv_path}' is empty. Check the file and try again.")
+            return metrics
+
+        # Ends Step 1, start Step 2, 3, 4: comparison of performance data for each employee, defining average
+        # performance and finding the employee with the highest performance and printing it
+        data_error = False
+        bad_rows = BadRows()
+        employee_validator = EMPLOYEE_SCHEMA.compile()
+        performance_validator = PERFORMANCE_SCHEMA.compile()
+        json_ids = employee_validator.seen
+        csv_ids = performance_validator.seen
+        total_performance = 0
+        top_employee = (0, 0)
+        top_row = -1
+
+        def valid_employees():
+            nonlocal data_error
+            for _, batch, result in employee_validator.iter_batches(chain([first_employee], employees), bad_rows):
+                data_error = data_error or bool(result.reasons)
+                for employee_id, employee in compress(zip(result.columns["id"], batch), result.valid):
+                    yield employee_id, compact_record(employee)
+
+        def valid_performance():
+            nonlocal data_error, total_performance, top_employee, top_row
+            for start, _, result in performance_validator.iter_batches(chain([first_row], performance), bad_rows):
+                data_error = data_error or bool(result.reasons)
+                columns = result.columns
+                rows = zip(count(start), columns["employee_id"], columns["performance"])
+                for i, employee_id, performance_score in compress(rows, result.valid):
+                    total_performance += performance_score
+                    if performance_score > top_employee[1]:
+                        top_employee = (employee_id, performance_score)
+                        top_row = i
+                    yield employee_id, performance_score, i
+
+        with metrics.stage("join") as stage:
+            employee_rows = valid_employees()
+            performance_rows = valid_performance()
+            if strategy == "merge":
+                pairs = merge_join(employee_rows, performance_rows, lambda e: e[0], lambda p: p[0])
+            elif json_source.stat().st_size <= csv_source.stat().st_size:
+                pairs = hash_join(employee_rows, performance_rows, lambda e: e[0], lambda p: p[0], memory_budget)
+            else:
+                pairs = ((e, p) for p, e in hash_join(
+                    performance_rows, employee_rows, lambda p: p[0], lambda e: e[0], memory_budget
+                ))
+
+            # The best matched row by (score, earliest row) is the top employee if it has a match in JSON.
+            top_match = None
+            try:
+                for (_, employee), (_, performance_score, i) in pairs:
+                    if top_match is None or (performance_score, -i) > (top_match[1], -top_match[2]):
+                        top_match = (employee, performance_score, i)
+                for _ in chain(employee_rows, performance_rows):
+                    pass
+            except JSONDecodeError as e:
+                logger.error(f"Error parsing the file '{json_path}': {e}")
+                print(f"Error while reading employees data in file '{json_path}'. Check the file and try again.")
+                logger.info("Task 3 stopped")
+                return metrics
+            except ValueError as e:
+                logger.error(f"Cannot merge files '{json_path}' and '{csv_path}': {e}")
+                print("Files are not sorted by ID. Use the hash strategy or sort the files and try again.")
+                logger.info("Task 3 stopped")
+                return metrics
+            except Exception as e:
+                logger.error(f"Failed to parse file '{csv_path}': {e}")
+                print(f"Error while reading file '{csv_path}. Check the file and try again.")
+                logger.info("Task 3 stopped")
+                return metrics
+            finally:
+                bad_rows.log_summary(logger, metrics, what="employee records")
+            stage.rows = len(json_ids) + len(csv_ids) + bad_rows.total
 
     if data_error:
         logger.warning("An invalid data in CSV or in JSON")
@@ -123,14 +206,17 @@ def task3() -> None:
             logger.warning(f"IDs only in CSV: {sorted(csv_ids - json_ids)}")
             logger.info("Task 3 stopped")
             print("Mismatch in valid ID data. Check the logs.")
-        return
+        return metrics
 
+    top_name = top_match[0]['name'] if top_match is not None and top_match[2] == top_row else "unknown"
     average_performance = total_performance / len(csv_ids)
     logger.info(f"Average performance: {average_performance}")
     logger.info(f"Top employee ID: {top_employee[0]}")
+    metrics.results["average_performance"] = average_performance
+    metrics.results["top_employee"] = {"id": top_employee[0], "name": top_name, "performance": top_employee[1]}
     print(f"\nAverage performance among all employees: {average_performance}")
-    print(f"Top employee name: {employees_dict[top_employee[0]]['name']}")
+    print(f"Top employee name: {top_name}")
     print(f"Top employee ID: {top_employee[0]}")
     print(f"Top employee performance: {top_employee[1]}")
     logger.info("Task 3 finished")
-    return
+    return metrics
@@ -0,0 +1,13 @@
+"""The tools are run from their directories, so their modules import each other by plain
+name. The tests put the repository root (for the common package) and every tool directory on
+sys.path. Only cli.py and main.py exist in more than one tool, the tests run them as scripts."""
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+TOOLS = ("json_csv_practice", "csv_json_converter", "txt_to_csv")
+
+for path in (ROOT, *(ROOT / tool for tool in TOOLS)):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,65 @@
+import logging
+import pickle
+
+from common.bad_rows import BadRows, queued_logging
+
+
+def test_only_the_first_samples_are_kept():
+    bad_rows = BadRows(samples=2)
+    for i in range(5):
+        bad_rows.add("invalid_date", i, ValueError(f"bad date {i}"), {"Date": i})
+    bad_rows.add("invalid_sum", 9, ValueError("bad sum"))
+
+    assert bad_rows.counts == {"invalid_date": 5, "invalid_sum": 1}
+    assert bad_rows.total == len(bad_rows) == 6
+    assert [index for index, _, _ in bad_rows.samples["invalid_date"]] == [0, 1]
+    summary = bad_rows.summary()
+    assert summary.startswith("Skipped 6 invalid rows: invalid_date=5, invalid_sum=1")
+    assert "invalid_date (first 2 of 5):" in summary
+    assert "#1: bad date 1. Row: {'Date': 1}" in summary
+
+
+def test_merge_shifts_the_row_indexes():
+    first, second = BadRows(samples=3), BadRows(samples=3)
+    first.add("invalid_sum", 1, "e1")
+    second.add("invalid_sum", 0, "e2")
+    second.add("invalid_sum", 4, "e3")
+    second.add("invalid_sum", 5, "e4")
+
+    first.merge(pickle.loads(pickle.dumps(second)), offset=10)
+    assert first.counts["invalid_sum"] == 4
+    assert [index for index, _, _ in first.samples["invalid_sum"]] == [1, 10, 14]
+
+
+def test_to_dict_round_trip_keeps_the_summary():
+    bad_rows = BadRows()
+    bad_rows.add("missing_field", 3, KeyError("Sum"), {"Item": "A"})
+    assert BadRows.from_dict(bad_rows.to_dict()).summary() == bad_rows.summary()
+
+
+def test_log_summary_adds_counts_to_metrics(caplog):
+    from common.metrics import PipelineMetrics
+
+    metrics = PipelineMetrics("test")
+    bad_rows = BadRows()
+    bad_rows.add("invalid_age", 0, "e")
+    with caplog.at_level(logging.WARNING):
+        bad_rows.log_summary(logging.getLogger("test"), metrics, what="students")
+    assert metrics.skipped == {"invalid_age": 1}
+    assert caplog.records[-1].getMessage().startswith("Skipped 1 invalid students")
+
+
+def test_queued_logging_restores_the_handlers():
+    logger = logging.getLogger("queued")
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    try:
+        with queued_logging(logger):
+            assert handler not in logger.handlers
+            logger.warning("through the queue")
+        assert logger.handlers == [handler]
+        assert [record.getMessage() for record in records] == ["through the queue"]
+    finally:
+        logger.removeHandler(handler)
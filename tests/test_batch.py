@@ -0,0 +1,118 @@
+import gzip
+import json
+
+import pytest
+
+from batch import convert_batch, expand_inputs, main
+from json_backends import BACKENDS, available_backends
+
+
+RECORDS = [{"name": "Ann", "age": 30}, {"name": "Bob", "age": 25}]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    directory = tmp_path / "in"
+    directory.mkdir()
+    (directory / "a.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+    (directory / "a.jsonl").write_text("".join(json.dumps(record) + "\n" for record in RECORDS), encoding="utf-8")
+    (directory / "b.csv").write_text("name,age\nAnn,30\n", encoding="utf-8")
+    (directory / "data.schema.json").write_text("{}", encoding="utf-8")
+    return directory
+
+
+def test_directories_are_expanded_without_sidecars(inputs):
+    assert [path.name for path in expand_inputs([str(inputs)])] == ["a.json", "a.jsonl", "b.csv"]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_files_are_converted_like_one_at_a_time(tmp_path, workers):
+    directory = tmp_path / "in"
+    directory.mkdir()
+    for i in range(4):
+        (directory / f"part{i}.json").write_text(json.dumps(RECORDS[:i % 2 + 1]), encoding="utf-8")
+    (directory / "c.csv.gz").write_bytes(gzip.compress("name,age\nAnn,30\n".encode("utf-8")))
+    (directory / "broken.json").write_text('[{"name": ', encoding="utf-8")
+
+    reports = convert_batch([str(directory)], tmp_path / "out", workers=workers)
+
+    assert [(report["source"], report["ok"]) for report in reports] == [
+        (str(directory / name), name != "broken.json")
+        for name in ["broken.json", "c.csv.gz", "part0.json", "part1.json", "part2.json", "part3.json"]]
+    assert not (tmp_path / "out" / "broken.csv").exists()
+    assert (tmp_path / "out" / "part1.csv").read_text(encoding="utf-8").splitlines() == ["name,age", "Ann,30", "Bob,25"]
+    assert json.loads(gzip.decompress((tmp_path / "out" / "c.json.gz").read_bytes())) == [{"name": "Ann", "age": "30"}]
+
+
+def test_no_files_give_no_reports(tmp_path):
+    assert convert_batch([str(tmp_path / "*.json")], tmp_path / "out") == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_files_with_the_same_target_fail(inputs, tmp_path, workers):
+    output_dir = tmp_path / "out"
+
+    reports = convert_batch([str(inputs)], output_dir, workers=workers)
+
+    assert [(report["source"], report["ok"]) for report in reports] == [
+        (str(inputs / "a.json"), False), (str(inputs / "a.jsonl"), False), (str(inputs / "b.csv"), True)]
+    assert reports[0]["target"] == reports[1]["target"] == str(output_dir / "a.csv")
+    assert "more than one input" in reports[0]["messages"][0]
+    assert not (output_dir / "a.csv").exists()
+    assert json.loads((output_dir / "b.json").read_text(encoding="utf-8")) == [{"name": "Ann", "age": "30"}]
+
+
+def test_files_of_different_directories_with_the_same_name_fail(tmp_path):
+    for name in ("in", "old"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "b.csv").write_text("name\nAnn\n", encoding="utf-8")
+
+    reports = convert_batch([str(tmp_path / "in"), str(tmp_path / "old")], tmp_path / "out", workers=1)
+
+    assert [report["ok"] for report in reports] == [False, False]
+    assert not (tmp_path / "out" / "b.json").exists()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_files_written_over_another_input_fail(tmp_path, workers):
+    (tmp_path / "a.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+    (tmp_path / "a.csv").write_text("name\nAnn\n", encoding="utf-8")
+    (tmp_path / "b.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+
+    reports = convert_batch([str(tmp_path)], tmp_path, workers=workers)
+
+    assert [(report["source"], report["ok"]) for report in reports] == [
+        (str(tmp_path / "a.csv"), False), (str(tmp_path / "a.json"), False), (str(tmp_path / "b.json"), True)]
+    assert "is an input file of the batch" in reports[1]["messages"][0]
+    assert (tmp_path / "a.csv").read_text(encoding="utf-8") == "name\nAnn\n"
+    assert json.loads((tmp_path / "a.json").read_text(encoding="utf-8")) == RECORDS
+    assert (tmp_path / "b.csv").exists()
+
+
+def test_columnar_targets_of_csv_and_json_collide(tmp_path):
+    (tmp_path / "a.csv").write_text("name\nAnn\n", encoding="utf-8")
+    (tmp_path / "a.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+
+    reports = convert_batch([str(tmp_path / "a.*")], tmp_path / "out", workers=1, columnar=True)
+
+    assert [report["ok"] for report in reports] == [False, False]
+
+
+def test_unavailable_json_backend_fails_per_file(tmp_path):
+    (tmp_path / "a.csv").write_text("name\nAnn\n", encoding="utf-8")
+    (tmp_path / "b.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+
+    reports = convert_batch([str(tmp_path / "*.*")], tmp_path / "out", workers=1, json_backend="missing")
+
+    assert [report["ok"] for report in reports] == [False, True]
+    assert "Unknown JSON backend 'missing'" in reports[0]["messages"][0]
+
+
+def test_cli_offers_only_installed_backends(tmp_path):
+    missing = [name for name in BACKENDS if name not in available_backends()]
+    if not missing:
+        pytest.skip("every JSON backend is installed")
+
+    with pytest.raises(SystemExit) as error:
+        main([str(tmp_path), "--json-backend", missing[0]])
+    assert error.value.code == 2
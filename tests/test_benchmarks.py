@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+RUN = ROOT / "benchmarks" / "run.py"
+
+
+def run_benchmarks(tmp_path, *args):
+    return subprocess.run([sys.executable, str(RUN), "--sizes", "50", "--data-dir", str(tmp_path / "data"),
+                           "--output", str(tmp_path / "results.json"), *args],
+                          capture_output=True, text=True, cwd=tmp_path, timeout=300)
+
+
+def test_every_case_runs_on_generated_data(tmp_path):
+    result = run_benchmarks(tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    report = json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))
+    assert report["results"] and all(case["rows"] == 50 and case["seconds"] > 0 for case in report["results"])
+
+
+def test_datasets_are_the_same_for_a_seed(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(ROOT / "benchmarks"))
+    import generators
+
+    first = generators.generate_all(tmp_path / "first", 30, invalid_ratio=0.2, seed=1)
+    second = generators.generate_all(tmp_path / "second", 30, invalid_ratio=0.2, seed=1)
+
+    names = sorted(path.name for path in first.iterdir())
+    assert names == sorted(path.name for path in second.iterdir())
+    assert all((first / name).read_bytes() == (second / name).read_bytes() for name in names)
+    assert len(json.loads((first / "students.json").read_text(encoding="utf-8"))) == 30
+    assert len((first / "sales.csv").read_text(encoding="utf-8").splitlines()) == 31
+
+
+def test_slower_case_than_the_baseline_fails(tmp_path):
+    run_benchmarks(tmp_path, "--cases", "task2")
+    report = json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))
+    for case in report["results"]:
+        case["seconds"] = 1e-9
+    (tmp_path / "baseline.json").write_text(json.dumps(report), encoding="utf-8")
+
+    result = run_benchmarks(tmp_path, "--cases", "task2", "--baseline", tmp_path / "baseline.json")
+
+    assert result.returncode == 1
+    assert "Regression: task2" in result.stdout
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from common.columnar import ColumnarFile, ColumnarFormatError, MISSING, is_columnar, read_columnar, write_columnar
+
+
+def test_round_trip_keeps_values_types_and_missing_keys(tmp_path):
+    rows = [
+        {"id": 1, "code": "007", "amount": "42", "price": 1.5, "name": "Ann", "tags": ["a"], "flag": True},
+        {"id": 2, "code": "12", "amount": "-7", "price": 2.0, "name": "Ann", "tags": None},
+        {"id": 3, "amount": "0", "name": "Ünal", "extra": {"x": 1}},
+    ]
+    path = tmp_path / "data.col"
+    assert write_columnar(rows, path) == 3
+
+    assert is_columnar(path)
+    assert read_columnar(path) == rows
+    with ColumnarFile(path) as snapshot:
+        assert snapshot.names == ["id", "code", "amount", "price", "name", "tags", "flag", "extra"]
+        assert snapshot.columns["id"]["type"] == "int"
+        assert snapshot.columns["amount"]["type"] == "int" and snapshot.columns["amount"]["text"]
+        assert snapshot.columns["code"]["type"] == "str"  # '007' is not a canonical integer
+        assert snapshot.columns["tags"]["type"] == "json"
+        assert snapshot.values("price") == [1.5, 2.0, MISSING]
+        assert snapshot.row(2) == rows[2]
+        with snapshot.data("id") as view:
+            assert view.tolist() == [1, 2, 3]
+
+
+def test_empty_snapshot(tmp_path):
+    path = tmp_path / "empty.col"
+    assert write_columnar([], path) == 0
+    assert read_columnar(path) == []
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "data.col"
+    path.write_bytes(b"Date,Item,Sum\n")
+    assert not is_columnar(path)
+    with pytest.raises(ColumnarFormatError):
+        ColumnarFile(path)
+
+
+def test_find_snapshot_checks_the_source_and_the_columns(tmp_path):
+    from common.columnar import find_snapshot
+
+    source = tmp_path / "data.csv"
+    source.write_text("a,b\n1,2\n", encoding="utf-8")
+    snapshot = tmp_path / "data.col"
+    assert find_snapshot(source) is None
+
+    write_columnar([{"a": "1", "b": "2"}], snapshot)
+    assert find_snapshot(source) is None  # no source in the header
+
+    write_columnar([{"a": "1", "b": "2"}], snapshot, source=source)
+    with ColumnarFile(snapshot) as columnar:
+        assert columnar.source["path"] == str(source.resolve())
+    assert find_snapshot(source, columns=("a", "b")) == snapshot
+    assert find_snapshot(source, columns=("a", "c")) is None
+
+    source.write_text("a,b\n1,3\n", encoding="utf-8")  # same size, only the modification time tells
+    os.utime(source, ns=(columnar.source["mtime_ns"], columnar.source["mtime_ns"] + 1000))
+    assert find_snapshot(source) is None
+
+    snapshot.write_bytes(b"CJCOLUMN\xff")
+    assert find_snapshot(source) is None
@@ -0,0 +1,48 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from common.compression import compression_of, find_input, open_file, split_compression_suffix
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz"])
+def test_round_trip_and_detection_by_suffix(tmp_path, suffix):
+    path = tmp_path / f"data.csv{suffix}"
+    with open_file(path, "w", encoding="utf-8", newline="", compresslevel=1) as file:
+        file.write("Date,Item,Sum\r\n2024-01-01,Ä,1\r\n")
+
+    with open_file(path, encoding="utf-8", newline="") as file:
+        assert file.read() == "Date,Item,Sum\r\n2024-01-01,Ä,1\r\n"
+    assert compression_of(path) == {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}[suffix]
+
+
+def test_compressed_file_without_suffix_is_detected_by_magic_bytes(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(gzip.compress(b"a,b\n1,2\n"))
+
+    assert compression_of(path) == "gzip"
+    with open_file(path, encoding="utf-8") as file:
+        assert file.read() == "a,b\n1,2\n"
+
+
+def test_plain_file_starting_like_bz2_is_not_compressed(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("BZh is not a bzip2 header without a block size digit", encoding="utf-8")
+    assert compression_of(path) is None
+
+
+def test_split_compression_suffix():
+    assert split_compression_suffix("data.csv.gz") == (Path("data.csv"), ".gz")
+    assert split_compression_suffix("data.csv") == (Path("data.csv"), "")
+
+
+def test_find_input_prefers_the_plain_file(tmp_path):
+    plain = tmp_path / "sales.csv"
+    compressed = tmp_path / "sales.csv.xz"
+    assert find_input(plain) == plain
+
+    compressed.write_bytes(b"")
+    assert find_input(plain) == compressed
+    plain.write_text("", encoding="utf-8")
+    assert find_input(plain) == plain
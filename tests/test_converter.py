@@ -0,0 +1,115 @@
+import gzip
+import json
+
+from converter import CsvJsonConverter
+
+
+def test_loaded_csv_rows_are_dicts(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text("name,age\nAnna,30\n", encoding="utf-8")
+    converter = CsvJsonConverter(source)
+
+    assert converter.load_data()
+    assert converter.csv_data == [{"name": "Anna", "age": "30"}]
+    assert json.loads(json.dumps(converter.csv_data)) == [{"name": "Anna", "age": "30"}]
+
+
+def test_loaded_csv_is_written_like_json_dump(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text("name,age\nAnna,30\nBob,\n", encoding="utf-8")
+
+    written = CsvJsonConverter(source).convert_to_json(tmp_path / "out.json")
+
+    assert written == tmp_path / "out.json"
+    assert written.read_text(encoding="utf-8") == json.dumps(
+        [{"name": "Anna", "age": "30"}, {"name": "Bob", "age": ""}], ensure_ascii=False, indent=4)
+
+
+def test_failed_streaming_conversion_leaves_no_partial_file(tmp_path):
+    source = tmp_path / "data.json"
+    source.write_text('[{"name": "Ann"}, {"name": "Bob"}, {"name": ', encoding="utf-8")
+    target = tmp_path / "out.csv"
+
+    assert CsvJsonConverter(source).convert_to_csv(target, stream=True, discover_headers=False) is False
+    assert list(tmp_path.iterdir()) == [source]
+
+
+def test_failed_conversion_keeps_the_older_output(tmp_path):
+    source = tmp_path / "data.json"
+    source.write_text('[{"name": "Ann"}, {"name": ', encoding="utf-8")
+    target = tmp_path / "out.csv"
+    target.write_text("name\nOld\n", encoding="utf-8")
+
+    assert CsvJsonConverter(source).convert_to_csv(target, stream=True, discover_headers=False) is False
+    assert target.read_text(encoding="utf-8") == "name\nOld\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data.json", "out.csv"]
+
+
+def test_compressed_output_is_written_through_the_temporary_file(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text("name\nAnn\n", encoding="utf-8")
+
+    written = CsvJsonConverter(source).convert_to_json(tmp_path / "out.json.gz", stream=True)
+
+    assert written == tmp_path / "out.json.gz"
+    assert json.loads(gzip.decompress(written.read_bytes())) == [{"name": "Ann"}]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data.csv", "out.json.gz"]
+
+
+def test_streaming_json_output_matches_the_loaded_output(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text('name,note\nAnn,"a, ""quoted"" note"\nBob,Łódź\n', encoding="utf-8")
+    converter = CsvJsonConverter(source)
+
+    loaded = converter.convert_to_json(tmp_path / "loaded.json")
+    streamed = converter.convert_to_json(tmp_path / "streamed.json", stream=True)
+
+    assert streamed.read_text(encoding="utf-8") == loaded.read_text(encoding="utf-8")
+    assert converter.metrics.to_dict()["stages"]["write"]["rows"] == 2
+
+
+def test_empty_csv_is_written_as_an_empty_array(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text("name,age\n", encoding="utf-8")
+
+    written = CsvJsonConverter(source).convert_to_json(tmp_path / "out.json", stream=True)
+
+    assert json.loads(written.read_text(encoding="utf-8")) == []
+
+
+def test_headers_are_the_union_of_item_keys_in_first_seen_order(tmp_path):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps([{"a": 1}, {"b": 2, "a": 3}, {"c": 4}]), encoding="utf-8")
+
+    written = CsvJsonConverter(source).convert_to_csv(tmp_path / "out.csv", stream=True)
+
+    assert written.read_text(encoding="utf-8").splitlines() == ["a,b,c", "1,,", "3,2,", ",,4"]
+
+
+def test_sampled_headers_leave_out_later_keys(tmp_path):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps([{"a": 1}, {"b": 2}]), encoding="utf-8")
+
+    written = CsvJsonConverter(source).convert_to_csv(tmp_path / "out.csv", stream=True, sample=1)
+
+    assert written.read_text(encoding="utf-8").splitlines() == ["a", "1", '""']
+
+
+def test_schema_cache_is_used_until_the_file_changes(tmp_path, monkeypatch):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps([{"a": 1}, {"b": 2}]), encoding="utf-8")
+    converter = CsvJsonConverter(source)
+    converter.convert_to_csv(tmp_path / "out.csv", stream=True, schema_cache=True)
+    assert json.loads(converter.schema_cache_path().read_text(encoding="utf-8"))["headers"] == ["a", "b"]
+
+    calls = []
+    collect_headers = CsvJsonConverter.collect_headers
+    monkeypatch.setattr(CsvJsonConverter, "collect_headers",
+                        staticmethod(lambda *args: calls.append(1) or collect_headers(*args)))
+    converter.convert_to_csv(tmp_path / "out.csv", stream=True, schema_cache=True)
+    assert calls == []
+
+    source.write_text(json.dumps([{"c": 3}]), encoding="utf-8")
+    written = converter.convert_to_csv(tmp_path / "out.csv", stream=True, schema_cache=True)
+    assert calls == [1]
+    assert written.read_text(encoding="utf-8").splitlines() == ["c", "3"]
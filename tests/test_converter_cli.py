@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+CLI = ROOT / "csv_json_converter" / "cli.py"
+
+
+def run_cli(tmp_path, *args):
+    result = subprocess.run([sys.executable, str(CLI), *map(str, args), "--log-file", str(tmp_path / "errors.log")],
+                            capture_output=True, text=True, cwd=tmp_path)
+    return result.returncode, json.loads(result.stdout)
+
+
+def write_csv(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text("name,age\nAnna,30\nBob,25\n", encoding="utf-8")
+    return source
+
+
+def test_output_without_suffix_reports_the_written_file(tmp_path):
+    source = write_csv(tmp_path)
+
+    code, report = run_cli(tmp_path, source, "-o", tmp_path / "dc_out")
+
+    assert code == 0
+    assert report["ok"] is True
+    assert report["target"] == str(tmp_path / "dc_out.json")
+    assert report["bytes_out"] == (tmp_path / "dc_out.json").stat().st_size
+    assert json.loads((tmp_path / "dc_out.json").read_text(encoding="utf-8")) == [
+        {"name": "Anna", "age": "30"}, {"name": "Bob", "age": "25"}]
+
+
+def test_default_output_is_next_to_the_source(tmp_path):
+    source = write_csv(tmp_path)
+
+    code, report = run_cli(tmp_path, source)
+
+    assert code == 0
+    assert report["target"] == str(tmp_path / "data.json")
+    assert (tmp_path / "data.json").exists()
+
+
+def test_unsupported_source_fails(tmp_path):
+    source = tmp_path / "data.txt"
+    source.write_text("text", encoding="utf-8")
+
+    code, report = run_cli(tmp_path, source)
+
+    assert code == 1
+    assert report["ok"] is False
+
+
+def test_unavailable_json_backend_fails(tmp_path):
+    source = write_csv(tmp_path)
+
+    code, report = run_cli(tmp_path, source, "--json-backend", "missing")
+
+    assert code == 1
+    assert "Unknown JSON backend 'missing'" in report["messages"][0]
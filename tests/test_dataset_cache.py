@@ -0,0 +1,86 @@
+import json
+import marshal
+import os
+
+import dataset_cache
+from dataset_cache import DatasetCache
+
+
+def write_files(tmp_path):
+    (tmp_path / "data.json").write_text(json.dumps([{"id": 1}]), encoding="utf-8")
+    (tmp_path / "data.csv").write_text("id, name\n1, Ann\n", encoding="utf-8")
+
+
+def test_datasets_are_cached_until_the_file_changes(tmp_path):
+    write_files(tmp_path)
+    cache = DatasetCache()
+
+    first = cache.load_json(tmp_path / "data.json")
+    assert cache.load_json(tmp_path / "data.json") is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    (tmp_path / "data.json").write_text(json.dumps([{"id": 2}]), encoding="utf-8")
+    assert cache.load_json(tmp_path / "data.json") == [{"id": 2}]
+    assert cache.misses == 2
+
+
+def test_entries_are_evicted_by_count(tmp_path):
+    write_files(tmp_path)
+    cache = DatasetCache(max_entries=1)
+
+    cache.load_json(tmp_path / "data.json")
+    cache.load_csv(tmp_path / "data.csv")
+    assert len(cache.entries) == 1
+
+
+def test_snapshots_are_read_by_a_new_cache(tmp_path):
+    write_files(tmp_path)
+    snapshots = tmp_path / "snapshots"
+    DatasetCache(snapshot_dir=snapshots).load_csv(tmp_path / "data.csv")
+
+    cache = DatasetCache(snapshot_dir=snapshots)
+    rows = cache.load_csv(tmp_path / "data.csv")
+
+    assert [row.to_dict() for row in rows] == [{"id": "1", "name": "Ann"}]
+    assert len(os.listdir(snapshots)) == 1
+
+
+def test_only_the_snapshot_of_the_latest_file_is_kept(tmp_path):
+    write_files(tmp_path)
+    snapshots = tmp_path / "snapshots"
+    DatasetCache(snapshot_dir=snapshots).load_csv(tmp_path / "data.csv")
+    for rows in (1, 2):
+        (tmp_path / "data.json").write_text(json.dumps([{"id": i} for i in range(rows)]), encoding="utf-8")
+        DatasetCache(snapshot_dir=snapshots).load_json(tmp_path / "data.json")
+
+    assert len(os.listdir(snapshots)) == 2
+    cache = DatasetCache(snapshot_dir=snapshots)
+    assert cache.load_json(tmp_path / "data.json") == [{"id": 0}, {"id": 1}]
+    assert [row.to_dict() for row in cache.load_csv(tmp_path / "data.csv")] == [{"id": "1", "name": "Ann"}]
+    assert len(os.listdir(snapshots)) == 2
+
+
+def test_snapshots_of_another_python_version_are_not_read(tmp_path, monkeypatch):
+    write_files(tmp_path)
+    snapshots = tmp_path / "snapshots"
+    DatasetCache(snapshot_dir=snapshots).load_json(tmp_path / "data.json")
+    version, minor = dataset_cache.SNAPSHOT_FORMAT[-2:]
+    monkeypatch.setattr(dataset_cache, "SNAPSHOT_FORMAT", (*dataset_cache.SNAPSHOT_FORMAT[:-2], version, minor + 1))
+
+    parsed = []
+    cache = DatasetCache(snapshot_dir=snapshots)
+    data = cache.load(tmp_path / "data.json", "json", lambda path: parsed.append(path) or [{"id": 1}])
+
+    assert data == [{"id": 1}]
+    assert parsed == [tmp_path / "data.json"]
+    assert len(os.listdir(snapshots)) == 1
+
+
+def test_broken_snapshot_is_parsed_again(tmp_path):
+    write_files(tmp_path)
+    cache = DatasetCache(snapshot_dir=tmp_path / "snapshots")
+    key = cache.key(tmp_path / "data.json", "json")
+    cache.snapshot_dir.mkdir()
+    cache.snapshot_path(key, tmp_path / "data.json").write_bytes(marshal.dumps((dataset_cache.SNAPSHOT_FORMAT,))[:-1])
+
+    assert cache.load_json(tmp_path / "data.json") == [{"id": 1}]
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from converter import CsvJsonConverter
+from flatten import LIST_COLUMNS, ColumnCollision, Flattener, flatten_record
+
+
+RECORDS = [
+    {"id": 1, "name": "Ann"},
+    {"id": 2, "user": {"name": "Bob", "tags": ["a", "b"]}, "empty": {}},
+    {"id": 3, "user": {"name": "Cid", "tags": []}, "empty": {}},
+    {"id": 4, "user": {"tags": ["c"], "name": "Dan"}, "empty": {}},
+    {"id": 5, "user": {"name": "Eve", "tags": [{"x": 1}, [2, 3]]}, "empty": {}},
+    {"id": 6, "user": {"name": "Fay", "tags": list(range(LIST_COLUMNS + 1))}, "empty": {}},
+    {"id": 7, "user": {"name": {"first": "Gus"}, "tags": []}, "empty": {}},
+    {"id": 8, "user": None, "empty": {"a": 1}},
+    {"a": {"y": 1, "z": []}},
+    {"a": {"z": [], "y": 1}},
+    {"a": {"y": 1, "z": [1]}},
+    {"a": [1], "a.1": 2},
+    {"a.b": [1], "a": {"b": 2}},
+]
+
+
+def items(flat):
+    return list(flat.items())
+
+
+def test_plans_flatten_like_the_walk_in_record_order():
+    flattener = Flattener()
+    for record in RECORDS * 2:  # the second round uses the cached plans
+        expected = flatten_record(record)
+        assert items(flattener.flatten(record)) == items(expected)
+        assert list(flattener.columns(record)) == list(expected)
+
+
+@pytest.mark.parametrize("record", [
+    {"a.b": 1, "a": {"b": 2}},
+    {"a": {"b.c": 1, "b": {"c": 2}}},
+    {"a.0": 1, "a": [2]},
+    {"a.b": [], "a": {"b": 1}},
+])
+def test_colliding_columns_raise(record):
+    with pytest.raises(ColumnCollision):
+        flatten_record(record)
+    flattener = Flattener()
+    with pytest.raises(ColumnCollision):
+        flattener.flatten(record)
+    with pytest.raises(ColumnCollision):
+        flattener.columns(record)
+
+
+def test_list_columns_are_checked_for_every_record():
+    flattener = Flattener()
+    assert flattener.flatten({"a.0": 1, "a": []}) == {"a.0": 1, "a": []}
+    with pytest.raises(ColumnCollision):
+        flattener.flatten({"a.0": 1, "a": [2]})
+
+
+def write_json(tmp_path, records):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps(records), encoding="utf-8")
+    return source
+
+
+def test_converter_flattens_only_on_request(tmp_path):
+    source = write_json(tmp_path, [{"id": 1, "user": {"name": "Ann"}}])
+
+    plain = CsvJsonConverter(source).convert_to_csv(tmp_path / "plain.csv", stream=True)
+    flat = CsvJsonConverter(source).convert_to_csv(tmp_path / "flat.csv", stream=True, flatten=True)
+
+    assert plain.read_text(encoding="utf-8").splitlines() == ["id,user", "1,{'name': 'Ann'}"]
+    assert flat.read_text(encoding="utf-8").splitlines() == ["id,user.name", "1,Ann"]
+
+
+def test_converter_fails_on_colliding_columns(tmp_path, capsys):
+    source = write_json(tmp_path, [{"a.b": 1, "a": {"b": 2}}])
+
+    assert CsvJsonConverter(source).convert_to_csv(tmp_path / "out.csv", stream=True, flatten=True) is False
+    assert "without flattening" in capsys.readouterr().out
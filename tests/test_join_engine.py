@@ -0,0 +1,41 @@
+import pytest
+
+from join_engine import hash_join, merge_join
+
+
+def key(row):
+    return row[0]
+
+
+BUILD = [(i, f"build {i}") for i in range(0, 40, 2)]
+PROBE = [(i, f"probe {i}") for i in range(0, 40, 3)]
+MATCHES = sorted((b, p) for b in BUILD for p in PROBE if b[0] == p[0])
+
+
+def test_hash_join_yields_every_match_in_probe_order():
+    assert list(hash_join(BUILD, PROBE, key, key)) == MATCHES
+
+
+@pytest.mark.parametrize("memory_budget, partitions", [(0, 1), (3, 4), (5, 16)])
+def test_grace_hash_join_finds_the_same_matches(memory_budget, partitions):
+    pairs = hash_join(iter(BUILD), iter(PROBE), key, key, memory_budget=memory_budget, partitions=partitions)
+    assert sorted(pairs) == MATCHES
+
+
+def test_merge_join_of_sorted_sides():
+    assert list(merge_join(BUILD, PROBE, key, key)) == MATCHES
+    assert list(merge_join([], PROBE, key, key)) == []
+    assert list(merge_join(BUILD, [], key, key)) == []
+
+
+def test_unsorted_probe_side_raises():
+    with pytest.raises(ValueError, match="Probe side"):
+        list(merge_join(BUILD, [(4, "a"), (2, "b")], key, key))
+
+
+@pytest.mark.parametrize("ids", [[2, 4, 5, 3, 1], [3, 1, 2, 4, 5], [1, 2, 3, 5, 4]])
+def test_unsorted_build_side_raises_even_after_the_last_probe_key(ids):
+    build = [(i, f"employee {i}") for i in ids]
+    probe = [(i, f"score {i}") for i in range(1, 6)]
+    with pytest.raises(ValueError, match="Build side"):
+        list(merge_join(build, probe, key, key))
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from converter import CsvJsonConverter
+from json_backends import BACKENDS, available_backends, get_backend
+
+
+VALUES = [
+    {"name": "Ann", "age": "30", "city": "Київ", "note": 'a "quoted" / \\ line\n'},
+    {"id": 1, "ok": True, "none": None, "tags": ["a", "b"], "nested": {"x": {"y": []}}, "empty": {}},
+    {"big": 2 ** 70, None: "null key", 1: "int key"},
+    [],
+    "text",
+]
+
+
+@pytest.mark.parametrize("name", available_backends())
+@pytest.mark.parametrize("value", VALUES)
+def test_backends_write_the_text_of_the_standard_library(name, value):
+    backend = get_backend(name)
+
+    assert backend.pretty(value) == json.dumps(value, ensure_ascii=False, indent=4)
+    assert backend.compact(value) == json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def test_auto_is_the_fastest_installed_backend():
+    assert "json" in available_backends()
+    assert get_backend("auto").name == available_backends()[0]
+
+
+def test_unknown_or_missing_backend_raises():
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        get_backend("simplejson")
+    missing = [name for name in BACKENDS if name not in available_backends()]
+    if missing:
+        with pytest.raises(ValueError, match="is not installed"):
+            get_backend(missing[0])
+
+
+@pytest.mark.parametrize("name", available_backends())
+@pytest.mark.parametrize("stream", [False, True])
+def test_compact_output_is_the_compact_standard_json(tmp_path, name, stream):
+    source = tmp_path / "data.csv"
+    source.write_text("name,age\nAnn,30\nБоб,\n", encoding="utf-8")
+
+    written = CsvJsonConverter(source).convert_to_json(tmp_path / "out.json", stream=stream, compact=True,
+                                                        json_backend=name)
+
+    assert written.read_text(encoding="utf-8") == json.dumps(
+        [{"name": "Ann", "age": "30"}, {"name": "Боб", "age": ""}], ensure_ascii=False, separators=(",", ":"))
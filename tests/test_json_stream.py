@@ -0,0 +1,30 @@
+import io
+import json
+
+import pytest
+
+from common.json_stream import iter_json_array
+
+
+DOCUMENT = json.dumps([{"id": 1, "name": "Ä" * 10}, 12345678901234567890, -1.5e-3, "x, y]", [], {}, None, True])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+def test_items_are_the_same_for_every_chunk_size(chunk_size):
+    items = list(iter_json_array(io.StringIO(DOCUMENT), chunk_size=chunk_size))
+    assert items == json.loads(DOCUMENT)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1024])
+def test_numbers_split_between_chunks_are_read_whole(chunk_size):
+    assert list(iter_json_array(io.StringIO(" [ 1234567 , 89.5e2 ] "), chunk_size)) == [1234567, 8950.0]
+
+
+def test_empty_array():
+    assert list(iter_json_array(io.StringIO("  []  "))) == []
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1, 2", "[1 2]", "[1,]", "[1] [2]", "[1, {]"])
+def test_invalid_documents_raise(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO(text), chunk_size=2))
@@ -0,0 +1,42 @@
+import json
+
+from common.metrics import PipelineMetrics
+
+
+def test_stages_accumulate_time_and_counters():
+    metrics = PipelineMetrics("test")
+    with metrics.stage("load") as stage:
+        stage.rows = 10
+        stage.bytes_read = 100
+    with metrics.stage("load") as stage:
+        stage.rows += 5
+    metrics.skip("invalid_date")
+    metrics.skip("invalid_date", 2)
+
+    data = metrics.to_dict()
+    assert data["pipeline"] == "test"
+    assert data["stages"]["load"]["rows"] == 15
+    assert data["stages"]["load"]["bytes_read"] == 100
+    assert data["rows_skipped"] == {"invalid_date": 3}
+    assert json.loads(metrics.to_json()) == data
+
+
+def test_prometheus_labels_are_escaped():
+    metrics = PipelineMetrics('task "1"')
+    with metrics.stage("load"):
+        pass
+
+    text = metrics.to_prometheus()
+    assert 'pipeline_stage_rows_total{pipeline="task \\"1\\"",stage="load"} 0' in text
+    assert text.endswith("\n")
+
+
+def test_dump_picks_the_format_by_suffix(tmp_path):
+    metrics = PipelineMetrics("test")
+    with metrics.stage("write"):
+        pass
+
+    metrics.dump(tmp_path / "run.prom")
+    metrics.dump(tmp_path / "run.json")
+    assert (tmp_path / "run.prom").read_text(encoding="utf-8").startswith("# HELP")
+    assert json.loads((tmp_path / "run.json").read_text(encoding="utf-8"))["pipeline"] == "test"
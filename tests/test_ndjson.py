@@ -0,0 +1,70 @@
+import io
+import json
+
+import pytest
+
+from converter import CsvJsonConverter
+from ndjson import chunk_offsets, is_ndjson, iter_ndjson, parse_ndjson_parallel, write_ndjson
+
+
+RECORDS = [{"id": i, "name": f"Name {i}", "tags": ["a", "ü"][:i % 3]} for i in range(50)]
+
+
+@pytest.fixture
+def ndjson_file(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_text("".join(json.dumps(record, ensure_ascii=False) + "\n\n" for record in RECORDS), encoding="utf-8")
+    return path
+
+
+def test_suffixes():
+    assert is_ndjson("a.jsonl") and is_ndjson("A.NDJSON")
+    assert not is_ndjson("a.json")
+
+
+def test_written_lines_are_read_back():
+    text = io.StringIO()
+    write_ndjson(RECORDS, text)
+
+    assert text.getvalue().count("\n") == len(RECORDS)
+    assert list(iter_ndjson(io.StringIO(text.getvalue()))) == RECORDS
+
+
+def test_invalid_line_raises():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_ndjson(io.StringIO('{"a": 1}\n{"a": \n')))
+
+
+@pytest.mark.parametrize("chunks", [1, 3, 7, 1000])
+def test_chunks_start_after_a_newline_and_cover_the_file(ndjson_file, chunks):
+    data = ndjson_file.read_bytes()
+    ranges = chunk_offsets(ndjson_file, chunks)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert all(data[start - 1:start] == b"\n" for start, _ in ranges[1:])
+
+
+def test_parallel_parsing_keeps_the_file_order(ndjson_file):
+    assert parse_ndjson_parallel(ndjson_file, workers=3) == RECORDS
+
+
+def test_json_lines_to_csv_skip_non_dict_records(tmp_path, ndjson_file):
+    with open(ndjson_file, "a", encoding="utf-8") as file:
+        file.write("[1, 2]\n")
+    converter = CsvJsonConverter(ndjson_file, workers=2)
+
+    written = converter.convert_to_csv(tmp_path / "out.csv")
+
+    assert len(written.read_text(encoding="utf-8").splitlines()) == len(RECORDS) + 1
+    assert converter.metrics.to_dict()["rows_skipped"] == {"not_a_dict": 1}
+
+
+def test_csv_to_json_lines(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text("name,age\nAnn,30\nBob,25\n", encoding="utf-8")
+
+    written = CsvJsonConverter(source).convert_to_json(tmp_path / "out.json", stream=True, lines=True)
+
+    assert written == tmp_path / "out.jsonl"
+    assert written.read_text(encoding="utf-8") == '{"name": "Ann", "age": "30"}\n{"name": "Bob", "age": "25"}\n'
@@ -0,0 +1,83 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from subject_index import index_path
+
+
+CLI = ROOT / "json_csv_practice" / "cli.py"
+
+SALES = """Date, Item, Sum
+2024-01-05, Item 1, 100
+2024-01-20, Item 2, 250
+2024-02-01, Item 1, 50
+2024-02-30, Item 3, 10
+2024-03-03, Item 2, abc
+"""
+
+STUDENTS = [
+    {"name": "Ann", "age": 20, "city": "Kyiv", "subjects": ["Python", "SQL"]},
+    {"name": "Bob", "age": 22, "city": "Lviv", "subjects": ["sql"]},
+]
+
+
+def run_cli(tmp_path, *args):
+    result = subprocess.run([sys.executable, str(CLI), "--data-dir", str(tmp_path),
+                             "--log-file", str(tmp_path / "logfile.log"), *map(str, args)],
+                            capture_output=True, text=True, cwd=ROOT)
+    return result.returncode, json.loads(result.stdout)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    (tmp_path / "sales.csv").write_text(SALES, encoding="utf-8")
+    (tmp_path / "students.json").write_text(json.dumps(STUDENTS), encoding="utf-8")
+    return tmp_path
+
+
+@pytest.mark.parametrize("options", [[], ["--workers", "2"], ["--incremental"]])
+def test_task2_prints_the_results_as_json(data_dir, options):
+    code, report = run_cli(data_dir, "task2", *options)
+
+    assert code == 0
+    assert report["ok"] is True
+    assert report["results"] == {"total_sales": 400, "top_item": {"item": "Item 2", "total": 250},
+                                 "monthly_total_sales": {"2024-01": 350, "2024-02": 50}}
+    assert report["metrics"]["rows_skipped"] == {"invalid_date": 1, "invalid_sum": 1}
+
+
+def test_task1_counts_subjects_without_the_index_file(data_dir):
+    code, report = run_cli(data_dir, "task1", "--subject", "sql", "--no-index-file")
+
+    assert code == 0
+    assert report["results"]["subjects"] == {"sql": 2}
+    assert not index_path(data_dir / "students.json").exists()
+
+
+def test_sales_range_query(data_dir):
+    code, report = run_cli(data_dir, "sales", "--start", "2024-01-10", "--end", "2024-02-28", "--top", "1")
+
+    assert code == 0
+    assert report["results"]["total"] == 300
+    assert report["results"]["top_items"] == [{"item": "Item 2", "total": 250}]
+
+
+def test_missing_input_fails_with_status_1(tmp_path):
+    code, report = run_cli(tmp_path, "sales")
+
+    assert code == 1
+    assert report["ok"] is False
+    assert "sales.csv" in report["error"]
+
+
+def test_only_the_chosen_command_is_imported(data_dir):
+    result = subprocess.run([sys.executable, "-X", "importtime", str(CLI), "--data-dir", str(data_dir),
+                             "--log-file", str(data_dir / "logfile.log"), "task1", "--no-index-file"],
+                            capture_output=True, text=True, cwd=ROOT)
+    imported = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines()}
+
+    assert "task1" in imported
+    assert not imported & {"task2", "task3", "sales_cube", "sales_engine", "numpy"}
@@ -0,0 +1,36 @@
+import csv
+import io
+import pickle
+
+from common.records import RecordReader, as_dict, compact_record, pack_records, record_type, unpack_records
+
+
+CSV_TEXT = "Date, Item, Sum\n2024-01-01, A, 1\n\n2024-01-02, B\n2024-01-03, C, 3, extra\n"
+
+
+def test_reader_reads_like_dict_reader():
+    records = list(RecordReader(io.StringIO(CSV_TEXT), skipinitialspace=True))
+    dicts = list(csv.DictReader(io.StringIO(CSV_TEXT), skipinitialspace=True))
+    assert [as_dict(row) for row in records] == dicts
+    assert [type(row) is dict for row in records] == [False, True, True]  # short and long rows stay dicts
+
+
+def test_record_reads_like_a_dict():
+    record = record_type(("a", "b", "a"))(("1", "2", "3"))
+    expected = {"a": "3", "b": "2"}  # a repeated key keeps its last value, as in dict(zip())
+    assert record["a"] == "3" and record.get("c", "x") == "x"
+    assert list(record) == list(expected) and len(record) == 2 and "b" in record
+    assert list(record.items()) == list(expected.items()) and list(record.values()) == ["3", "2"]
+    assert repr(record) == repr(expected)
+    assert record.to_dict() == expected
+
+
+def test_records_survive_pickle_and_marshal_packing():
+    rows = [compact_record({"x": 1, "y": [2]}), {"plain": "dict"}]
+    assert [as_dict(row) for row in pickle.loads(pickle.dumps(rows))] == [{"x": 1, "y": [2]}, {"plain": "dict"}]
+    assert [as_dict(row) for row in unpack_records(pack_records(rows))] == [{"x": 1, "y": [2]}, {"plain": "dict"}]
+
+
+def test_compact_record_leaves_other_items_alone():
+    assert compact_record([1, 2]) == [1, 2]
+    assert compact_record("text") == "text"
@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+
+from common.records import RecordReader
+from sales_columnar import _aggregate_with_numpy, aggregate_sales_columnar
+from sales_engine import aggregate_sales
+
+pytest.importorskip("numpy")
+
+
+CASES = {
+    "plain": "Date, Item, Sum\n2024-01-05, Item 1, 100\n2024-02-01, Item 2, 50\n2024-01-09, Item 1, 7\n",
+    "invalid": "Date, Item, Sum\n2024-02-30, Item 1, 100\n2024-01-01, Item 2, abc\n2024-01-01, Item 3,\n"
+               "bad, Item 4, 1\n2024-03-01, Item 5, 2\n",
+    "int_texts": "Date, Item, Sum\n2024-01-01, A, +5\n2024-01-01, B, -3\n2024-01-01, C, 1_000\n"
+                 "2024-01-01, D, 12 \n2024-01-01, E, 007\n2024-01-01, F,  \n",
+    "blank_lines_no_final_newline": "Date,Item,Sum\n\n2024-01-01,A,1\n\n2024-02-01,B,2",
+    "unicode_items": "Date, Item, Sum\n2024-01-01, Käse, 3\n2024-01-01, 寿司, 4\n2024-01-01, Käse, 5\n",
+    "other_columns": "Id, Sum, Note, Item, Date\n1, 5, x, A, 2024-01-01\n2, 6, , B, 2024-01-02\n",
+    "header_only": "Date, Item, Sum\n",
+    "empty_item": "Date, Item, Sum\n2024-01-01, , 5\n2024-01-01,   , 6\n",
+    # Shapes the byte parser leaves to the csv module.
+    "quoted": 'Date, Item, Sum\n2024-01-01, "Item, 1", 5\n',
+    "extra_fields": "Date, Item, Sum\n2024-01-01, A, 5, extra\n",
+    "short_rows": "Date, Item, Sum\n2024-01-01, A\n",
+    "crlf": "Date, Item, Sum\r\n2024-01-01, A, 5\r\n",
+    "huge_sum": "Date, Item, Sum\n2024-01-01, A, 99999999999999999999\n",
+    "long_item": f"Date, Item, Sum\n2024-01-01, {'x' * 100}, 5\n",
+}
+
+
+def python_result(path):
+    with open(path, encoding="utf-8") as file:
+        return aggregate_sales(RecordReader(file, skipinitialspace=True))
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_numpy_backend_matches_the_row_loop(tmp_path, name):
+    path = tmp_path / "sales.csv"
+    path.write_text(CASES[name], encoding="utf-8", newline="")
+
+    assert repr(aggregate_sales_columnar(path)) == repr(python_result(path))
+
+
+@pytest.mark.parametrize("name", ["quoted", "extra_fields", "short_rows", "crlf", "huge_sum", "long_item"])
+def test_unsupported_shapes_fall_back(tmp_path, name):
+    path = tmp_path / "sales.csv"
+    path.write_text(CASES[name], encoding="utf-8", newline="")
+
+    assert _aggregate_with_numpy(path) is None
+
+
+def test_compressed_file(tmp_path):
+    path = tmp_path / "sales.csv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write(CASES["invalid"])
+    plain = tmp_path / "sales.csv"
+    plain.write_text(CASES["invalid"], encoding="utf-8")
+
+    assert repr(aggregate_sales_columnar(path)) == repr(python_result(plain))
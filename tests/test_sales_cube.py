@@ -0,0 +1,70 @@
+import sales_cube
+from common.records import RecordReader
+from sales_cube import cube_path_of, load_cube
+from sales_engine import aggregate_sales
+
+
+SALES = """Date, Item, Sum
+2024-01-05, Item 1, 100
+2024-01-20, Item 2, 250
+2024-02-01, Item 1, 50
+2024-02-30, Item 3, 10
+2024-03-03, Item 2, abc
+2024-03-15, Item 3, 70
+2023-12-31, Item 2, 5
+"""
+
+
+def write_sales(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(SALES, encoding="utf-8")
+    return path
+
+
+def test_whole_range_matches_aggregate_sales(tmp_path):
+    path = write_sales(tmp_path)
+    with open(path, encoding="utf-8") as file:
+        total, per_item, monthly, row_count, skipped = aggregate_sales(RecordReader(file, skipinitialspace=True))
+
+    cube = load_cube(path)
+
+    assert cube.total() == total
+    assert cube.item_totals() == dict(per_item)
+    assert cube.monthly_totals() == dict(sorted(monthly.items()))
+    assert cube.row_count == row_count
+    assert cube.skipped.counts == skipped.counts
+
+
+def test_range_queries(tmp_path):
+    cube = load_cube(write_sales(tmp_path))
+
+    assert cube.total("2024-01-01", "2024-01-31") == 350
+    assert cube.total("2024-01-01", None, items=["Item 1", "Unknown"]) == 150
+    assert cube.top_items(1, start="2024-01-01") == [("Item 2", 250)]
+    assert cube.monthly_totals("2024-02-01", items=["Item 3"]) == {"2024-03": 70}
+    assert cube.total("2025-01-01") == 0
+
+
+def test_cube_file_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    path = write_sales(tmp_path)
+    load_cube(path)
+    assert cube_path_of(path).exists()
+
+    built = []
+    monkeypatch.setattr(sales_cube.SalesCube, "build", classmethod(lambda cls, rows: built.append(1)))
+    assert load_cube(path).total() == 475
+    assert built == []
+
+
+def test_cube_file_of_another_python_version_is_rebuilt(tmp_path, monkeypatch):
+    path = write_sales(tmp_path)
+    load_cube(path)
+    version, minor = sales_cube.CUBE_FORMAT[-2:]
+    monkeypatch.setattr(sales_cube, "CUBE_FORMAT", (*sales_cube.CUBE_FORMAT[:-2], version, minor + 1))
+
+    built = []
+    build = sales_cube.SalesCube.build.__func__
+    monkeypatch.setattr(sales_cube.SalesCube, "build",
+                        classmethod(lambda cls, rows: built.append(1) or build(cls, rows)))
+    assert load_cube(path).total() == 475
+    assert built == [1]
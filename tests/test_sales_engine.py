@@ -0,0 +1,76 @@
+import gzip
+import io
+
+import pytest
+
+from common.records import RecordReader
+from sales_engine import aggregate_sales, chunk_ranges, parallel_aggregate, read_header
+
+
+ROWS = "".join(f"2024-{month:02d}-{day:02d}, Item {day % 7}, {day * month}\n"
+               for month in range(1, 13) for day in range(1, 29))
+SALES = "Date, Item, Sum\n" + ROWS + "2024-13-01, Item 1, 5\n2024-01-01, Item 2, x\n" + ROWS
+
+
+def aggregate_text(text):
+    return aggregate_sales(RecordReader(io.StringIO(text), skipinitialspace=True))
+
+
+def write_sales(tmp_path, text=SALES):
+    path = tmp_path / "sales.csv"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_invalid_rows_are_skipped_by_kind():
+    total, per_item, monthly, row_count, skipped = aggregate_text(
+        "Date, Item, Sum\n2024-01-05, A, 10\n2024-02-30, B, 1\n2024-01-06, C, x\n2024-02-01, A, 5\n")
+
+    assert total == 15
+    assert dict(per_item) == {"A": 15}
+    assert dict(monthly) == {"2024-01": 10, "2024-02": 5}
+    assert row_count == 4
+    assert dict(skipped.counts) == {"invalid_date": 1, "invalid_sum": 1}
+
+
+
+def test_sum_with_more_digits_than_int_reads_is_skipped():
+    total, per_item, _, row_count, skipped = aggregate_sales(
+        [{"Item": "b", "Sum": "9" * 5000, "Date": "2024-01-02"}, {"Item": "a", "Sum": "5", "Date": "2024-01-02"}])
+
+    assert (total, dict(per_item), row_count) == (5, {"a": 5}, 2)
+    assert dict(skipped.counts) == {"invalid_sum": 1}
+
+def test_chunks_are_aligned_to_rows(tmp_path):
+    path = write_sales(tmp_path)
+    with open(path, "rb") as file:
+        _, start = read_header(file)
+    data = path.read_bytes()
+
+    ranges = chunk_ranges(data, start, len(data), 5)
+
+    assert ranges[0][0] == start and ranges[-1][1] == len(data)
+    assert all(data[begin - 1:begin] == b"\n" for begin, _ in ranges)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 5])
+def test_parallel_result_is_identical(tmp_path, workers):
+    path = write_sales(tmp_path)
+
+    assert repr(parallel_aggregate(path, workers)) == repr(aggregate_text(SALES))
+
+
+def test_quoted_and_compressed_files_use_one_process(tmp_path):
+    quoted = 'Date, Item, Sum\n2024-01-01, "Item\n1", 5\n' + ROWS
+    path = write_sales(tmp_path, quoted)
+    assert repr(parallel_aggregate(path, 4)) == repr(aggregate_text(quoted))
+
+    compressed = tmp_path / "sales.csv.gz"
+    compressed.write_bytes(gzip.compress(SALES.encode("utf-8")))
+    assert repr(parallel_aggregate(compressed, 4)) == repr(aggregate_text(SALES))
+
+
+def test_header_only_file(tmp_path):
+    path = write_sales(tmp_path, "Date, Item, Sum\n")
+
+    assert parallel_aggregate(path, 2)[:4] == (0, {}, {}, 0)
@@ -0,0 +1,118 @@
+import gzip
+import io
+
+import pytest
+
+import sales_incremental
+from common.records import RecordReader
+from sales_engine import aggregate_sales
+from sales_incremental import IncrementalSales, complete_rows_end, state_path_of
+
+
+HEADER = "Date, Item, Sum\n"
+FIRST = "2024-01-05, Item 1, 100\n2024-02-30, Item 3, 10\n"
+SECOND = "2024-01-20, Item 2, 250\n2024-03-03, Item 2, abc\n"
+
+
+def aggregate_text(text):
+    return aggregate_sales(RecordReader(io.StringIO(text), skipinitialspace=True))
+
+
+def same(result, expected):
+    """Compares the totals and the skipped rows, whose saved samples are kept as text."""
+    return (repr(result[:4]) == repr(expected[:4])
+            and result[4].to_dict() == expected[4].to_dict())
+
+
+@pytest.fixture
+def sales_file(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(HEADER + FIRST, encoding="utf-8")
+    return path
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(text)
+
+
+def test_complete_rows_end_at_a_line_break_outside_quotes():
+    assert complete_rows_end(b"a,1\nb,2") == 4
+    assert complete_rows_end(b'a,1\n"b\nc",2\n"d\n') == 12
+    assert complete_rows_end(b"no line break") == 0
+
+
+def test_appended_rows_are_read_from_the_offset(sales_file):
+    assert same(IncrementalSales(sales_file).refresh(), aggregate_text(HEADER + FIRST))
+    append(sales_file, SECOND)
+
+    sales = IncrementalSales(sales_file)
+    result = sales.refresh()
+
+    assert sales.restart is None
+    assert sales.bytes_read == len(SECOND)
+    assert same(result, aggregate_text(HEADER + FIRST + SECOND))
+
+
+def test_partial_last_row_is_read_again(sales_file):
+    append(sales_file, "2024-01-20, Item 2, 2")
+    sales = IncrementalSales(sales_file)
+    assert sales.refresh()[0] == 102
+
+    append(sales_file, "50\n")
+    assert sales.refresh()[0] == 350
+    assert sales.bytes_read == len("2024-01-20, Item 2, 250\n")
+
+
+@pytest.mark.parametrize("change, reason", [
+    (lambda path: path.write_text(HEADER + "2024-01-05, Item 1, 1\n", encoding="utf-8"), "truncated"),
+    (lambda path: path.write_text(HEADER + FIRST.replace("100", "900") + SECOND, encoding="utf-8"), "rewritten"),
+])
+def test_changed_file_is_aggregated_again(sales_file, change, reason):
+    IncrementalSales(sales_file).refresh()
+    change(sales_file)
+
+    sales = IncrementalSales(sales_file)
+    result = sales.refresh()
+
+    assert sales.restart == reason
+    assert same(result, aggregate_text(sales_file.read_text(encoding="utf-8")))
+
+
+def test_broken_or_moved_state_is_ignored(sales_file, tmp_path):
+    state_path_of(sales_file).write_text("{", encoding="utf-8")
+    sales = IncrementalSales(sales_file)
+    sales.refresh()
+    assert sales.restart == "no state"
+
+    moved = tmp_path / "moved.csv"
+    sales_file.rename(moved)
+    state_path_of(sales_file).rename(state_path_of(moved))
+    sales = IncrementalSales(moved)
+    sales.refresh()
+    assert sales.restart == "no state"
+
+
+def test_blocks_split_inside_rows(sales_file, monkeypatch):
+    append(sales_file, SECOND * 20)
+    monkeypatch.setattr(sales_incremental, "BLOCK_SIZE", 7)
+
+    assert same(IncrementalSales(sales_file).refresh(), aggregate_text(HEADER + FIRST + SECOND * 20))
+
+
+def test_compressed_file_is_read_in_full_without_state(tmp_path):
+    path = tmp_path / "sales.csv.gz"
+    path.write_bytes(gzip.compress((HEADER + FIRST).encode("utf-8")))
+
+    sales = IncrementalSales(path)
+
+    assert same(sales.refresh(), aggregate_text(HEADER + FIRST))
+    assert sales.restart == "compressed"
+    assert not state_path_of(path).exists()
+
+
+def test_header_only_file(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(HEADER, encoding="utf-8")
+
+    assert IncrementalSales(path).refresh()[:4] == (0, {}, {}, 0)
@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import pytest
+
+from common.bad_rows import BadRows
+from common.records import RecordReader
+from schema import MISSING, DuplicateIDError, Field, Schema
+
+
+SALES = Schema([
+    Field("Item"),
+    Field("Sum", int, text=True, invalid="invalid_sum"),
+    Field("Date", format="%Y-%m-%d", convert=datetime.toordinal, invalid="invalid_date"),
+])
+
+
+def reasons_of(result):
+    return [(i, kind) for i, kind, _ in result.reasons]
+
+
+def test_valid_rows_are_parsed():
+    rows = [{"Item": "A", "Sum": "10", "Date": "2024-01-05"}, {"Item": "B", "Sum": " +1_000 ", "Date": "2024-01-05"}]
+
+    result = SALES.compile().validate(rows)
+
+    assert result.valid == [True, True]
+    assert result.columns["Sum"] == [10, 1000]
+    assert result.columns["Date"] == [datetime(2024, 1, 5).toordinal()] * 2
+
+
+def test_a_row_gets_the_kind_of_its_first_bad_field():
+    rows = [
+        {"Sum": "1", "Date": "2024-01-01"},
+        {"Item": "A", "Sum": "x", "Date": "2024-02-30"},
+        {"Item": "A", "Sum": "1", "Date": "2024-02-30"},
+        {"Item": "A", "Sum": ["1"], "Date": ["2024-01-01"]},
+        {"Item": "A", "Sum": "1", "Date": None},
+    ]
+
+    result = SALES.compile().validate(rows)
+
+    assert result.valid == [False] * 5
+    assert reasons_of(result) == [(0, "missing_field"), (1, "invalid_sum"), (2, "invalid_date"),
+                                  (3, "invalid_sum"), (4, "invalid_date")]
+
+
+def test_records_and_dicts_are_checked_alike():
+    text = "Item,Sum,Date\nA,1,2024-01-01\nB,x,2024-01-01\n"
+    records = list(RecordReader(text.splitlines()))
+    dicts = [record.to_dict() for record in records]
+
+    assert reasons_of(SALES.compile().validate(records)) == reasons_of(SALES.compile().validate(dicts)) \
+        == [(1, "invalid_sum")]
+
+
+def test_typed_fields_do_not_accept_text():
+    schema = Schema([Field("age", int, missing="missing_age", invalid="invalid_age")])
+
+    result = schema.compile().validate([{"age": 20}, {"age": "20"}, {}, {"age": True}])
+
+    assert reasons_of(result) == [(1, "invalid_age"), (2, "missing_age")]
+    assert result.columns["age"][2] is MISSING
+
+
+def test_duplicates_are_found_across_batches():
+    schema = Schema([Field("id", int)], unique="id", prefix="employee_")
+    validator = schema.compile()
+    bad_rows = BadRows()
+    rows = [{"id": 1}, {"id": 2}, {"id": 1}, {"id": "3"}, {"id": 2}]
+
+    batches = list(validator.iter_batches(rows, bad_rows, batch_size=2))
+
+    assert [start for start, _, _ in batches] == [0, 2, 4]
+    assert bad_rows.counts == {"employee_duplicate_id": 2, "employee_invalid_value": 1}
+    index, error, row = bad_rows.samples["employee_duplicate_id"][0]
+    assert (index, row) == (2, {"id": 1})
+    assert isinstance(error, DuplicateIDError)
+
+
+def test_errors_explain_the_bad_value():
+    validator = SALES.compile()
+    bad_rows = BadRows()
+    rows = [{"Item": "A", "Sum": "x", "Date": "2024-01-01"}, {"Sum": "1", "Date": "2024-01-01"}]
+
+    list(validator.iter_batches(rows, bad_rows))
+
+    assert isinstance(bad_rows.samples["invalid_sum"][0][1], ValueError)
+    assert isinstance(bad_rows.samples["missing_field"][0][1], KeyError)
+
+
+@pytest.mark.parametrize("value", ["1e3", "\u0661\u0662", "", " ", "1__0", "-5", "0x10"])
+def test_sums_are_read_the_way_int_reads_them(value):
+    try:
+        expected = [int(value)]
+    except ValueError:
+        expected = [None]
+
+    result = SALES.compile().validate([{"Item": "A", "Sum": value, "Date": "2024-01-01"}])
+
+    assert result.columns["Sum"] == expected
+    assert result.valid == [expected != [None]]
+
+
+@pytest.mark.parametrize("others", [[], ["x"], [" 7"]])
+def test_sums_with_more_digits_than_int_reads_are_invalid(others):
+    sums = ["9" * 5000, "5", " 1" + "0" * 5000, *others]
+    rows = [{"Item": "A", "Sum": value, "Date": "2024-01-01"} for value in sums]
+    bad_rows = BadRows()
+
+    [(_, _, result)] = SALES.compile().iter_batches(rows, bad_rows)
+
+    assert result.valid[:3] == [False, True, False]
+    assert result.columns["Sum"][:3] == [None, 5, None]
+    assert bad_rows.counts["invalid_sum"] == 2 + (others == ["x"])
+    assert "Exceeds the limit" in str(bad_rows.samples["invalid_sum"][0][1])
@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+import subject_index
+from subject_index import SubjectIndex, index_path, load_subject_index, query_subjects
+from task1 import task1
+
+
+STUDENTS = [
+    {"name": "Ann", "age": 20, "city": "Kyiv", "subjects": ["Python", "SQL", "python"]},
+    {"name": "Bob", "age": 22, "city": "Lviv", "subjects": ["sql"]},
+    {"name": "Cid", "age": "x", "city": "Odesa", "subjects": []},
+]
+
+
+@pytest.fixture
+def students_file(tmp_path, monkeypatch):
+    path = tmp_path / "students.json"
+    path.write_text(json.dumps(STUDENTS), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return path
+
+
+def test_counts_ignore_case_and_repeated_subjects():
+    index = SubjectIndex.build(STUDENTS)
+
+    assert index.query(["python", "SQL", "go"]) == {"python": 1, "SQL": 2, "go": 0}
+    assert "Python" in index
+
+
+def test_index_is_saved_and_reused(students_file, monkeypatch):
+    assert query_subjects(["sql"]) == {"sql": 2}
+    assert index_path(students_file).exists()
+
+    monkeypatch.setattr(SubjectIndex, "build", classmethod(lambda cls, students: pytest.fail("rebuilt")))
+    assert query_subjects(["sql"]) == {"sql": 2}
+
+
+def test_changed_file_rebuilds_the_index(students_file):
+    load_subject_index(students_file)
+    students_file.write_text(json.dumps(STUDENTS[:1]), encoding="utf-8")
+
+    assert load_subject_index(students_file).count("sql") == 1
+
+
+def test_no_sidecar_without_persist(students_file):
+    assert load_subject_index(students_file, persist=False).count("sql") == 2
+    assert not index_path(students_file).exists()
+
+
+def test_no_sidecar_in_a_read_only_directory(students_file, monkeypatch):
+    monkeypatch.setattr(subject_index.os, "access", lambda path, mode: mode != os.W_OK)
+
+    assert load_subject_index(students_file).count("sql") == 2
+    assert not index_path(students_file).exists()
+    assert load_subject_index(students_file, persist=True).count("sql") == 2
+    assert index_path(students_file).exists()
+
+
+def test_task1_counts_subjects_without_writing_the_index(students_file):
+    metrics = task1(subjects=["Python", "sql"], persist_index=False)
+
+    assert metrics.results["subjects"] == {"python": 1, "sql": 2}
+    assert metrics.results["valid_students"] == 2
+    assert metrics.results["oldest_student"] == {"name": "Bob", "age": 22, "city": "Lviv"}
+    assert not index_path(students_file).exists()
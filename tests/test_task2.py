@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from converter import CsvJsonConverter
+from task2 import task2
+
+
+SALES = """Date, Item, Sum
+2024-01-05, Item 1, 100
+2024-01-20, Item 2, 250
+2024-02-01, Item 1, 50
+2024-02-30, Item 3, 10
+2024-03-03, Item 2, abc
+"""
+
+EXPECTED = {
+    "total_sales": 400,
+    "top_item": {"item": "Item 2", "total": 250},
+    "monthly_total_sales": {"2024-01": 350, "2024-02": 50},
+}
+
+
+@pytest.fixture
+def sales_dir(tmp_path, monkeypatch):
+    (tmp_path / "sales.csv").write_text(SALES, encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_snapshot(directory, skipinitialspace):
+    converter = CsvJsonConverter(directory / "sales.csv", skipinitialspace=skipinitialspace)
+    assert converter.convert_to_columnar(directory / "sales.col", stream=True)
+
+
+@pytest.mark.parametrize("workers, backend", [(1, "python"), (2, "python"), (1, "numpy")])
+def test_results(sales_dir, workers, backend):
+    metrics = task2(workers=workers, backend=backend)
+    assert metrics.results == EXPECTED
+    assert metrics.skipped == {"invalid_date": 1, "invalid_sum": 1}
+
+
+def test_snapshot_written_from_the_file_is_used(sales_dir, caplog):
+    write_snapshot(sales_dir, skipinitialspace=True)
+    with caplog.at_level("INFO"):
+        assert task2().results == EXPECTED
+    assert "Reading columnar snapshot" in caplog.text
+
+
+def test_snapshot_with_other_column_names_is_ignored(sales_dir, caplog):
+    # Without skipinitialspace the columns are ' Item' and ' Sum', every snapshot row would miss them.
+    write_snapshot(sales_dir, skipinitialspace=False)
+    with caplog.at_level("INFO"):
+        assert task2().results == EXPECTED
+    assert "Reading columnar snapshot" not in caplog.text
+
+
+def test_snapshot_of_an_older_file_is_ignored(sales_dir):
+    write_snapshot(sales_dir, skipinitialspace=True)
+    with open(sales_dir / "sales.csv", "a", encoding="utf-8") as file:
+        file.write("2024-03-10, Item 3, 1000\n")
+    stat = (sales_dir / "sales.col").stat()
+    os.utime(sales_dir / "sales.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns))  # the snapshot is not older
+
+    results = task2().results
+    assert results["total_sales"] == 1400
+    assert results["top_item"] == {"item": "Item 3", "total": 1000}
+
+
+def test_snapshot_without_a_source_is_ignored(sales_dir):
+    from common.columnar import write_columnar
+
+    write_columnar([{"Date": "2024-01-01", "Item": "Other", "Sum": 1}], sales_dir / "sales.col")
+    assert task2().results == EXPECTED
+
+
+def test_file_without_valid_rows(sales_dir, capsys):
+    (sales_dir / "sales.csv").write_text("Date, Item, Sum\n2024-13-01, Item 1, 5\n", encoding="utf-8")
+    metrics = task2()
+    assert metrics.results == {}
+    assert metrics.skipped == {"invalid_date": 1}
+    assert "has no valid sales rows" in capsys.readouterr().out
+
+
+def test_missing_file(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert task2().results == {}
+    assert "not found" in capsys.readouterr().out
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from task3 import task3
+
+
+EMPLOYEES = [{"id": i, "name": name, "position": "Developer"}
+             for i, name in [(1, "Ivan"), (2, "Elena"), (3, "Dmitry"), (4, "Olga"), (5, "Petr")]]
+PERFORMANCE = {1: 85, 2: 92, 3: 78, 4: 95, 5: 60}
+
+EXPECTED = {"average_performance": 82.0, "top_employee": {"id": 4, "name": "Olga", "performance": 95}}
+
+
+def write_data(directory, employee_ids=None, performance_ids=None):
+    employees = {employee["id"]: employee for employee in EMPLOYEES}
+    employee_ids = employee_ids or list(employees)
+    performance_ids = performance_ids or list(PERFORMANCE)
+    (directory / "employees.json").write_text(json.dumps([employees[i] for i in employee_ids]), encoding="utf-8")
+    lines = ["employee_id, performance"] + [f"{i}, {PERFORMANCE[i]}" for i in performance_ids]
+    (directory / "performance.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("options", [{}, {"strategy": "merge"}, {"memory_budget": 1}])
+def test_results(data_dir, options):
+    write_data(data_dir)
+    assert task3(**options).results == EXPECTED
+
+
+def test_hash_join_does_not_need_sorted_files(data_dir):
+    write_data(data_dir, employee_ids=[2, 4, 5, 3, 1], performance_ids=[5, 1, 4, 2, 3])
+    assert task3().results == EXPECTED
+
+
+def test_merge_join_of_unsorted_employees_fails(data_dir, capsys):
+    write_data(data_dir, employee_ids=[2, 4, 5, 3, 1])
+    assert task3(strategy="merge").results == {}
+    assert "Files are not sorted by ID" in capsys.readouterr().out
+
+
+def test_merge_join_of_unsorted_performance_fails(data_dir, capsys):
+    write_data(data_dir, performance_ids=[1, 2, 4, 3, 5])
+    assert task3(strategy="merge").results == {}
+    assert "Files are not sorted by ID" in capsys.readouterr().out
+
+
+def test_mismatched_ids_are_reported(data_dir, capsys, caplog):
+    write_data(data_dir, employee_ids=[1, 2, 3, 4], performance_ids=[1, 2, 3, 4, 5])
+    (data_dir / "employees.json").write_text(json.dumps(EMPLOYEES[:4] + [{"id": "5", "name": "Petr"}]),
+                                             encoding="utf-8")
+    assert task3().results == {}
+    assert "Mismatch in valid ID data" in capsys.readouterr().out
+    assert "IDs only in CSV: [5]" in caplog.text
+
+
+def test_performance_snapshot_without_the_columns_is_ignored(data_dir):
+    from converter import CsvJsonConverter
+
+    write_data(data_dir)
+    # Without skipinitialspace the second column is ' performance'.
+    assert CsvJsonConverter(data_dir / "performance.csv").convert_to_columnar(data_dir / "performance.col", stream=True)
+    assert task3().results == EXPECTED
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+
+import CSV
+from CSV import calculate_total_cost, from_txt_to_csv, from_txt_to_total, iter_lines
+from common.metrics import PipelineMetrics
+
+
+PRICES = "Apple\t3\t2\r\nЯблуко\t10\t5\nbroken line\nPear\tx\t4\nPlum\t2\tx\nKiwi\t-1\t-1\n\nMango\t1\t100"
+
+
+@pytest.fixture
+def prices_file(tmp_path, monkeypatch):
+    path = tmp_path / "prices.txt"
+    path.write_bytes(PRICES.encode("utf-8"))
+    monkeypatch.chdir(tmp_path)
+    return path
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 5, 64, CSV.BLOCK_SIZE])
+def test_lines_are_read_like_splitlines(prices_file, block_size):
+    assert list(iter_lines(prices_file, block_size)) == prices_file.read_text(encoding="utf8").splitlines()
+
+
+def test_empty_file_has_no_lines(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+
+    assert list(iter_lines(path)) == []
+
+
+def test_one_pass_matches_the_two_steps(prices_file, capsys):
+    total = calculate_total_cost(from_txt_to_csv(prices_file, "two_steps.csv"))
+    capsys.readouterr()
+
+    metrics = PipelineMetrics("from_txt_to_total")
+    assert from_txt_to_total(prices_file, "one_pass.csv", metrics=metrics) == total == 156
+    assert Path("one_pass.csv").read_bytes() == Path("two_steps.csv").read_bytes()
+    assert metrics.results["total_cost"] == 156
+    assert metrics.skipped == {"wrong_field_count": 2, "not_a_number": 3}
+
+
+def test_non_interactive_run_does_not_wait(prices_file, capsys, monkeypatch):
+    monkeypatch.setattr(CSV, "sleep", lambda seconds: pytest.fail("paced"))
+
+    from_txt_to_total(prices_file)
+    assert capsys.readouterr().out == ""
+
+    calculate_total_cost("output.csv")
+    assert "Apple will cost 6 EUR per 3 items." in capsys.readouterr().out
+
+
+def test_interactive_run_prints_every_item(prices_file, capsys, monkeypatch):
+    waits = []
+    monkeypatch.setattr(CSV, "sleep", waits.append)
+
+    from_txt_to_total(prices_file, interactive=True)
+
+    out = capsys.readouterr().out
+    assert "Apple will cost 6 EUR per 3 items." in out
+    assert "In line 3, the quantity or/and price wasn't/weren't as a number." in out
+    assert waits == [2] * 6
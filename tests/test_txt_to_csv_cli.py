@@ -0,0 +1,34 @@
+import json
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+CLI = ROOT / "txt_to_csv" / "cli.py"
+
+
+def run_cli(tmp_path, *args):
+    result = subprocess.run([sys.executable, str(CLI), *map(str, args), "--log-file", str(tmp_path / "errors.log")],
+                            capture_output=True, text=True, cwd=tmp_path, timeout=30)
+    return result.returncode, json.loads(result.stdout)
+
+
+def test_prices_are_converted_without_pauses(tmp_path):
+    (tmp_path / "prices.txt").write_text("Apple\t3\t2\nbroken\nPear\tx\t4\n", encoding="utf-8")
+
+    code, report = run_cli(tmp_path, "prices.txt", "-o", tmp_path / "out.csv")
+
+    assert code == 0
+    assert report["results"] == {"total_cost": 6}
+    assert report["metrics"]["rows_skipped"] == {"wrong_field_count": 1, "not_a_number": 1}
+    assert (tmp_path / "out.csv").read_text(encoding="utf-8").splitlines() == [
+        "Name,Amount,Price per piece", "Apple,3,2", "Pear,x,4"]
+
+
+def test_missing_input_fails_with_status_1(tmp_path):
+    code, report = run_cli(tmp_path, "missing.txt")
+
+    assert code == 1
+    assert report["ok"] is False
+    assert "missing.txt" in report["error"]
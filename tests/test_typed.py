@@ -0,0 +1,43 @@
+from typed import CONVERTERS, TypedRows, infer_types
+
+
+HUGE = "9" * 5000  # longer than the digit limit of int()
+
+
+def test_types_are_inferred_from_the_sample():
+    rows = [{"id": "1", "price": "2.5", "ok": "true", "code": "007", "note": ""},
+            {"id": "-3", "price": "4", "ok": "False", "code": "12", "note": ""}]
+
+    assert infer_types(rows, list(rows[0])) == {"id": "int", "price": "float", "ok": "bool", "code": "str",
+                                                "note": "str"}
+
+
+def test_values_are_converted_and_mismatches_kept_as_strings():
+    rows = [{"id": "1", "price": "2.5"}, {"id": "2", "price": ""}, {"id": "x", "price": "1e400"}]
+
+    converted = list(TypedRows(sample=2).convert(rows))
+
+    assert converted == [{"id": 1, "price": 2.5}, {"id": 2, "price": None}, {"id": "x", "price": "1e400"}]
+
+
+def test_int_over_the_digit_limit_does_not_fit():
+    assert not CONVERTERS["int"].fits(HUGE)
+    assert infer_types([{"id": HUGE}], ["id"]) == {"id": "str"}
+
+
+def test_int_over_the_digit_limit_is_a_mismatch():
+    rows = [{"id": "1"}, {"id": HUGE}, {"id": "3"}]
+    typed = TypedRows(sample=1)
+
+    converted = list(typed.convert(rows))
+
+    assert [row["id"] for row in converted] == [1, HUGE, 3]
+    assert typed.mismatches.counts == {"id (int)": 1}
+    assert typed.mismatches.samples["id (int)"][0][0] == 1
+
+
+def test_int_over_the_digit_limit_among_other_mismatches():
+    values, bad = CONVERTERS["int"].convert(["1", "a", HUGE, "", "4"])
+
+    assert values == [1, "a", HUGE, None, 4]
+    assert bad == [1, 2]
@@ -1,70 +1,180 @@
 import csv
+import mmap
+import os
+import sys
 from pathlib import Path
 from time import sleep
 import logging
 
-logging.basicConfig(
-    filename="errors.log",
-    level=logging.ERROR,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+if __name__ == '__main__':
+    # Run from its own directory, the common package is in the repository root.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from common.metrics import PipelineMetrics  # noqa: E402
+from common.bad_rows import BadRows, queued_logging  # noqa: E402
 
-class MyError(Exception):
-    def __init__(self, text):
-        super().__init__(text)
+BLOCK_SIZE = 1024 * 1024
 
+LOG_FILE = "errors.log"
 
-def from_txt_to_csv(input_file, output_file='output.csv'):
-    text_file = Path(input_file).read_text(encoding='utf8').splitlines()
 
-    with open(output_file, 'w', newline='', encoding='utf8') as csv_file:
-        csv_writer = csv.writer(csv_file, delimiter=',', quotechar='"')
-        csv_writer.writerow(['Name', 'Amount', 'Price per piece'])
+def configure_logging(filename=LOG_FILE):
+    """Writes the errors to a log file. Called by the entry points (main(), cli.py), importing
+    this module does not configure logging."""
+    logging.basicConfig(
+        filename=filename,
+        level=logging.ERROR,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
 
-        for line in text_file:
-            try:
+
+def from_txt_to_csv(input_file, output_file='output.csv', metrics=None):
+    if metrics is None:
+        metrics = PipelineMetrics("from_txt_to_csv")
+
+    with metrics.stage("read") as stage:
+        text_file = Path(input_file).read_text(encoding='utf8').splitlines()
+        stage.rows = len(text_file)
+        stage.bytes_read = Path(input_file).stat().st_size
+
+    bad_lines = BadRows()
+    with metrics.stage("write") as stage:
+        with open(output_file, 'w', newline='', encoding='utf8') as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=',', quotechar='"')
+            csv_writer.writerow(['Name', 'Amount', 'Price per piece'])
+
+            for index_line, line in enumerate(text_file, 1):
                 items = line.split('\t')
                 if len(items) != 3:
-                    raise MyError(f"The line {line} is an invalid, skipping this line.")
+                    bad_lines.add("wrong_field_count", index_line, "expected 3 tab-separated fields", line)
+                    continue
 
                 item, quantity, price = items
                 csv_writer.writerow([item, quantity, price])
-            except MyError as e:
-                logging.error(e)
+                stage.rows += 1
+
+        stage.bytes_written = Path(output_file).stat().st_size
+
+    bad_lines.log_summary(logging.getLogger(), metrics, what="lines", level=logging.ERROR)
+    return output_file
+
 
-        return output_file
+def line_cost(quantity, price):
+    if not quantity.isdigit() and not price.isdigit():
+        raise ValueError()
+    return int(quantity) * int(price)
 
 
-def calculate_total_cost(input_file):
-    with open(input_file, 'r', encoding='utf8') as csv_file:
+def calculate_total_cost(input_file, metrics=None, interactive=False):
+    if metrics is None:
+        metrics = PipelineMetrics("calculate_total_cost")
+
+    with metrics.stage("aggregate") as stage, open(input_file, 'r', encoding='utf8') as csv_file:
+        stage.bytes_read = Path(input_file).stat().st_size
         csv_file = csv.reader(csv_file, delimiter=',')
         next(csv_file)
         total_cost = 0
 
+        bad_lines = BadRows()
         for index_line, line in enumerate(csv_file, 1):
+            stage.rows += 1
             try:
                 item, quantity, price = line[0], line[1], line[2]
-                if not quantity.isdigit() and not price.isdigit():
-                    raise ValueError()
-
-                item_cost = int(quantity) * int(price)
+                item_cost = line_cost(quantity, price)
                 print(f"{item} will cost {item_cost} EUR per {quantity} items.")
-                sleep(2)
+                if interactive:
+                    sleep(2)
                 total_cost += item_cost
             except ValueError as e:
                 print(f"In line {index_line}, the quantity or/and price wasn't/weren't as a number.")
-                sleep(2)
-                logging.error(f"Invalid line {index_line}: {e}")
+                if interactive:
+                    sleep(2)
+                bad_lines.add("not_a_number", index_line, e, line)
+
+    bad_lines.log_summary(logging.getLogger(), metrics, what="lines", level=logging.ERROR)
+    metrics.results["total_cost"] = total_cost
+    return total_cost
+
+
+def iter_lines(input_file, block_size=BLOCK_SIZE):
+    """Yields the lines of a text file like read_text().splitlines(), reading it through mmap.
+
+    The file is decoded in blocks which end at a newline, so no line (and no UTF-8 character)
+    is cut between two blocks.
+    """
+    with open(input_file, 'rb') as file:
+        size = file.seek(0, 2)
+        if size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                end = mapped.find(b"\n", min(start + block_size, size) - 1) + 1 or size
+                yield from mapped[start:end].decode('utf8').splitlines()
+                start = end
+
+
+def from_txt_to_total(input_file, output_file='output.csv', metrics=None, interactive=False):
+    """Converts the TXT file to CSV and calculates the total cost in one pass.
+
+    The CSV file and the total are the same as with calculate_total_cost(from_txt_to_csv(...)),
+    but the input is read once through mmap and the CSV file is not read back. The cost of
+    every item is printed, one line every 2 seconds, only in the interactive mode.
+    """
+    if metrics is None:
+        metrics = PipelineMetrics("from_txt_to_total")
+
+    bad_lines = BadRows()
+    with metrics.stage("convert") as stage:
+        with open(output_file, 'w', newline='', encoding='utf8') as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=',', quotechar='"')
+            csv_writer.writerow(['Name', 'Amount', 'Price per piece'])
+            total_cost = 0
+            index_row = 0
+
+            for index_line, line in enumerate(iter_lines(input_file), 1):
+                items = line.split('\t')
+                if len(items) != 3:
+                    bad_lines.add("wrong_field_count", index_line, "expected 3 tab-separated fields", line)
+                    continue
+
+                item, quantity, price = items
+                csv_writer.writerow(items)
+                index_row += 1
+                try:
+                    if quantity.isdigit() and price.isdigit():
+                        item_cost = int(quantity) * int(price)
+                    else:
+                        item_cost = line_cost(quantity, price)
+                except ValueError as e:
+                    bad_lines.add("not_a_number", index_line, e, items)
+                    if interactive:
+                        print(f"In line {index_row}, the quantity or/and price wasn't/weren't as a number.")
+                        sleep(2)
+                    continue
+
+                total_cost += item_cost
+                if interactive:
+                    print(f"{item} will cost {item_cost} EUR per {quantity} items.")
+                    sleep(2)
+
+            stage.rows = index_row
+        stage.bytes_read = Path(input_file).stat().st_size
+        stage.bytes_written = Path(output_file).stat().st_size
 
-        return total_cost
+    bad_lines.log_summary(logging.getLogger(), metrics, what="lines", level=logging.ERROR)
+    metrics.results["total_cost"] = total_cost
+    return total_cost
 
 
 def main():
-    csv_file = from_txt_to_csv('prices.txt')
-    total_cost = calculate_total_cost(csv_file)
+    configure_logging()
+    metrics = PipelineMetrics("txt_to_csv")
+    with queued_logging():
+        total_cost = from_txt_to_total('prices.txt', metrics=metrics, interactive=True)
 
     print(f"Cost for all items will be {total_cost} EUR.")
+    return metrics
 
 
 if __name__ == '__main__':
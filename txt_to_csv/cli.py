@@ -0,0 +1,48 @@
+"""Converts a tab-separated price list to CSV and calculates the total cost without prompts or
+pauses, then prints the result as JSON.
+
+Usage:
+    python cli.py prices.txt -o output.csv
+
+The report has the total cost and the metrics of the run (see from_txt_to_total). The exit
+status is 0 if the file was converted and 1 otherwise. CSV.py is imported only after the
+arguments are parsed, so a run starts quickly (see benchmarks/bench_startup.py).
+"""
+import argparse
+import json
+import os
+import sys
+
+# The tool is run from its own directory, the common package is in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Converts a TXT price list to CSV and prints the total cost as JSON.")
+    parser.add_argument("input", nargs="?", default="prices.txt", help="tab-separated file (Name, Amount, Price)")
+    parser.add_argument("-o", "--output", default="output.csv", help="CSV file to write")
+    parser.add_argument("--log-file", default="errors.log", help="log file of the invalid lines")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from CSV import configure_logging, from_txt_to_total
+    from common.metrics import PipelineMetrics
+
+    configure_logging(os.path.abspath(args.log_file))
+    metrics = PipelineMetrics("txt_to_csv")
+    report = {"input": args.input, "output": args.output}
+    try:
+        from_txt_to_total(args.input, args.output, metrics=metrics)
+        report.update(ok=True, results=metrics.results, metrics=metrics.to_dict())
+    except (OSError, ValueError) as e:
+        report.update(ok=False, error=f"{e}")
+
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())